@@ -0,0 +1,189 @@
+"""Efectos de sonido de baja latencia.
+
+Los efectos se sintetizan con NumPy y se convierten a pygame.mixer.Sound una
+sola vez al iniciar, así que disparar un sonido no decodifica ni asigna
+nada: solo manda un buffer ya listo a un canal del grupo reservado. El
+mezclador no se inicia con pygame: lo abre AudioEngine.start(), llamado
+recién con el primer frame en pantalla, pidiendo un buffer chico
+(AUDIO_BUFFER muestras). Sin dispositivo de audio (o con silent=True) el
+motor queda mudo y solo cuenta los disparos, para corridas sin ventana.
+
+La latencia del informe se mide: measure_latency() toca varias veces un
+sonido de una muestra y espera a que el canal se libere, o sea a que el
+mezclador lo haya tomado. La espera más larga es el intervalo real entre
+mezclas, que revela el buffer que SDL concedió (puede no ser el pedido, y
+pygame no lo expone). El resultado no incluye lo que agregue el sistema
+operativo después de SDL, así que es una cota inferior.
+
+Los sonidos no salen de event_hook (eso quedaría grabado en el replay) sino
+de comparar tras cada tick los contadores de la simulación: golpes de
+paleta, rebotes en bordes y puntos.
+"""
+import time
+
+import numpy as np
+import pygame
+
+AUDIO_FREQUENCY = 44100
+AUDIO_BUFFER = 256  # Muestras por buffer del mezclador: ~6 ms a 44,1 kHz
+CHANNEL_POOL = 8    # Canales reservados para los efectos
+LATENCY_PROBES = 20  # Disparos de prueba al medir la latencia
+PROBE_TIMEOUT = 1.0  # Segundos máximos esperando que el mezclador tome un disparo de prueba
+
+# Efecto: (frecuencia inicial, frecuencia final, duración en s, forma de onda, volumen)
+EFFECTS = {
+    'paddle': (440, 440, 0.06, 'square', 0.35),
+    'wall': (220, 220, 0.04, 'sine', 0.4),
+    'score': (660, 220, 0.3, 'square', 0.35),
+}
+
+# Formato de muestra del mezclador -> tipo de NumPy
+SAMPLE_TYPES = {8: np.uint8, -8: np.int8, 16: np.uint16, -16: np.int16, 32: np.float32}
+
+
+def synthesize(start_frequency, end_frequency, duration, shape, volume, rate):
+    """Tono con barrido de frecuencia y caída exponencial, en [-1, 1]"""
+    t = np.arange(int(duration * rate)) / rate
+    frequency = np.linspace(start_frequency, end_frequency, len(t))
+    phase = 2 * np.pi * np.cumsum(frequency) / rate
+    wave = np.sin(phase)
+    if shape == 'square':
+        wave = np.sign(wave)
+    envelope = np.exp(-4 * t / duration)
+    return wave * envelope * volume
+
+
+def to_samples(wave, size, channels):
+    """Convierte una onda en [-1, 1] al formato y canales del mezclador"""
+    dtype = SAMPLE_TYPES[size]
+    if dtype == np.float32:
+        samples = wave.astype(np.float32)
+    else:
+        info = np.iinfo(dtype)
+        middle = (info.max + info.min + 1) // 2
+        samples = (middle + wave * (info.max - middle)).astype(dtype)
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return np.ascontiguousarray(samples)
+
+
+class AudioEngine:
+    """Efectos pre-renderizados tocados por un grupo de canales reservados.
+
+    observe(sim) se llama después de cada tick y dispara como mucho un sonido
+    por efecto, con más volumen si hubo varios golpes (ráfagas de pelotas
+    múltiples). Si los contadores bajan (rebobinado, reinicio) solo se
+    resincroniza, sin sonar.
+    """
+
+    def __init__(self, silent=False):
+        self.silent = silent
+        self.started = False
+        self.sounds = {}
+        self.channels = []
+        self.next_channel = 0
+        self.buffer_ms = 0.0  # Duración del buffer pedido (no necesariamente el concedido)
+        self.probe = None
+        self.mix_wait_ms = 0.0    # Espera media desde play() hasta que el mezclador toma el sonido
+        self.mix_period_ms = 0.0  # Intervalo medido entre mezclas (el buffer concedido)
+        self.last_counts = None
+        self.plays = {name: 0 for name in EFFECTS}
+        self.dispatch_seconds = 0.0  # Desde detectar el evento hasta que el canal lo aceptó
+
+    def start(self):
+        """Inicia el mezclador si hace falta y renderiza todos los efectos (una sola vez)"""
+        if self.started:
+            return
+        self.started = True
+        if self.silent:
+            return
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(AUDIO_FREQUENCY, -16, 1, AUDIO_BUFFER)
+            rate, size, channels = pygame.mixer.get_init()
+        except pygame.error:
+            # Sin dispositivo de audio: seguir mudo
+            self.silent = True
+            return
+
+        for name, (start_frequency, end_frequency, duration, shape, volume) in EFFECTS.items():
+            wave = synthesize(start_frequency, end_frequency, duration, shape, volume, rate)
+            self.sounds[name] = pygame.sndarray.make_sound(to_samples(wave, size, channels))
+        self.probe = pygame.sndarray.make_sound(to_samples(np.zeros(1), size, channels))
+
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), CHANNEL_POOL))
+        pygame.mixer.set_reserved(CHANNEL_POOL)
+        self.channels = [pygame.mixer.Channel(i) for i in range(CHANNEL_POOL)]
+        self.buffer_ms = AUDIO_BUFFER / rate * 1000
+
+    def play(self, name, count=1):
+        """Toca un efecto en el próximo canal del grupo (el más viejo se corta si todos suenan)"""
+        self.plays[name] += 1
+        if self.silent or not self.channels:
+            return
+        start = time.perf_counter()
+        channel = self.channels[self.next_channel]
+        self.next_channel = (self.next_channel + 1) % len(self.channels)
+        channel.set_volume(min(1.0, 0.6 + 0.1 * count))
+        channel.play(self.sounds[name])
+        self.dispatch_seconds += time.perf_counter() - start
+
+    def observe(self, sim):
+        """Dispara los efectos de lo que pasó en el último tick de sim"""
+        counts = (sim.paddle_hits, sim.wall_bounces, sim.player_score + sim.cpu_score)
+        last = self.last_counts
+        self.last_counts = counts
+        if last is None:
+            return
+        for name, now, before in zip(('paddle', 'wall', 'score'), counts, last):
+            if now > before:
+                self.play(name, now - before)
+
+    @property
+    def total_plays(self):
+        return sum(self.plays.values())
+
+    def measure_latency(self, probes=LATENCY_PROBES):
+        """Mide cuánto tarda el mezclador en tomar un sonido y cada cuánto mezcla.
+
+        Entre disparos se espera una fracción distinta del intervalo ya visto,
+        para no caer siempre en la misma fase del ciclo de mezcla.
+        """
+        if self.silent or not self.channels:
+            return
+        channel = self.channels[self.next_channel]
+        waits = []
+        for i in range(probes):
+            start = time.perf_counter()
+            channel.play(self.probe)
+            while channel.get_busy():
+                if time.perf_counter() - start > PROBE_TIMEOUT:
+                    return  # El dispositivo no avanza (driver sin reloj): no hay medición
+                time.sleep(0.0002)
+            waits.append(time.perf_counter() - start)
+            time.sleep((i * 0.618) % 1 * max(waits))
+        self.mix_wait_ms = sum(waits) / len(waits) * 1000
+        self.mix_period_ms = max(waits) * 1000
+
+    @property
+    def latency_ms(self):
+        """Latencia medida del disparo a la salida de SDL: despacho, espera a la mezcla y un buffer concedido"""
+        played = self.total_plays if self.channels else 0
+        dispatch_ms = self.dispatch_seconds / played * 1000 if played else 0.0
+        return dispatch_ms + self.mix_wait_ms + self.mix_period_ms
+
+    def print_report(self):
+        print("Audio:")
+        if self.silent:
+            print(f"  sin sonido (mudo)   {self.total_plays:8d} disparos")
+            return
+        counts = ", ".join(f"{name} {count}" for name, count in self.plays.items())
+        print(f"  disparos            {counts}")
+        print(f"  buffer pedido       {self.buffer_ms:8.2f} ms ({AUDIO_BUFFER} muestras)")
+        self.measure_latency()
+        if not self.mix_period_ms:
+            print("  latencia            sin medir (el mezclador no tomó los disparos de prueba)")
+            return
+        print(f"  buffer concedido    {self.mix_period_ms:8.2f} ms (intervalo medido entre mezclas)")
+        print(f"  espera a la mezcla  {self.mix_wait_ms:8.2f} ms (media de {LATENCY_PROBES} disparos)")
+        print(f"  latencia medida     {self.latency_ms:8.2f} ms (cota inferior: sin el buffer del sistema operativo)")
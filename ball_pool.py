@@ -0,0 +1,234 @@
+import numpy as np
+
+from collision import sweep_circles_aabb, reflect_walls
+
+# La pelota principal ocupa siempre la primera posición del pool
+MAIN_BALL = 0
+
+
+class TrailBuffer:
+    """Estelas de todas las pelotas en un búfer circular compartido (NumPy).
+
+    Cada fila es una pelota y cada columna un tick. Como todas las pelotas
+    vivas agregan un punto por tick, una sola columna de escritura sirve para
+    todas: grabar es una asignación por columna y el largo no agrega costo
+    en Python. Los puntos que una pelota aún no escribió quedan en NaN.
+    """
+
+    def __init__(self, capacity, length):
+        self.length = length
+        self.x = np.full((capacity, length), np.nan)
+        self.y = np.full((capacity, length), np.nan)
+        self.head = 0  # Columna del punto más viejo, donde se escribe el próximo
+
+    def grow(self, capacity):
+        extra = capacity - len(self.x)
+        self.x = np.concatenate([self.x, np.full((extra, self.length), np.nan)])
+        self.y = np.concatenate([self.y, np.full((extra, self.length), np.nan)])
+
+    def clear(self, index):
+        self.x[index] = np.nan
+        self.y[index] = np.nan
+
+    def record(self, indices, x, y):
+        """Agrega un punto a la estela de cada pelota de indices"""
+        self.x[indices, self.head] = x
+        self.y[indices, self.head] = y
+        self.head = (self.head + 1) % self.length
+
+    def columns(self):
+        """Columnas ordenadas del punto más viejo al más nuevo"""
+        return (self.head + np.arange(self.length)) % self.length
+
+    def ordered(self, indices):
+        """Estelas de indices como arreglos (pelotas, largo), del punto más viejo al más nuevo"""
+        rows = np.asarray(indices)[:, None]
+        columns = self.columns()
+        return self.x[rows, columns], self.y[rows, columns]
+
+    def resize(self, length):
+        """Cambia el largo conservando los puntos más recientes"""
+        keep = min(length, self.length)
+        columns = self.columns()[self.length - keep:]
+        x = np.full((len(self.x), length), np.nan)
+        y = np.full((len(self.y), length), np.nan)
+        x[:, length - keep:] = self.x[:, columns]
+        y[:, length - keep:] = self.y[:, columns]
+        self.x = x
+        self.y = y
+        self.length = length
+        self.head = 0
+
+
+class BallPool:
+    """Todas las pelotas del juego en estructura de arreglos (NumPy).
+
+    Posiciones, velocidades, radios y banderas de vida viven en arreglos
+    paralelos, de modo que movimiento, rebotes, golpes de paleta y puntos se
+    calculan en una sola operación para todas las pelotas, sean 3 o 300.
+    Las pelotas muertas quedan con posición NaN: ninguna comparación las
+    selecciona y las pruebas por frame no necesitan consultar alive.
+    """
+
+    def __init__(self, capacity=16, trail_length=10):
+        self.capacity = capacity
+        self.size = 0  # Posiciones en uso (las muertas se reutilizan)
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.radius = np.zeros(capacity)
+        self.max_speed = np.full(capacity, np.inf)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.trails = TrailBuffer(capacity, trail_length)
+
+    def _grow(self, capacity):
+        """Amplía los arreglos conservando las pelotas existentes"""
+        extra = capacity - self.capacity
+        self.x = np.concatenate([self.x, np.zeros(extra)])
+        self.y = np.concatenate([self.y, np.zeros(extra)])
+        self.vx = np.concatenate([self.vx, np.zeros(extra)])
+        self.vy = np.concatenate([self.vy, np.zeros(extra)])
+        self.radius = np.concatenate([self.radius, np.zeros(extra)])
+        self.max_speed = np.concatenate([self.max_speed, np.full(extra, np.inf)])
+        self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+        self.trails.grow(capacity)
+        self.capacity = capacity
+
+    def spawn(self, x, y, vx, vy, radius, max_speed=np.inf):
+        """Crea una pelota y devuelve su índice"""
+        free = np.flatnonzero(~self.alive[:self.size])
+        if len(free):
+            index = int(free[0])
+        else:
+            if self.size == self.capacity:
+                self._grow(self.capacity * 2)
+            index = self.size
+            self.size += 1
+
+        self.x[index] = x
+        self.y[index] = y
+        self.vx[index] = vx
+        self.vy[index] = vy
+        self.radius[index] = radius
+        self.max_speed[index] = max_speed
+        self.alive[index] = True
+        self.trails.clear(index)
+        return index
+
+    def kill(self, mask):
+        """Elimina las pelotas marcadas (máscara booleana sobre las posiciones en uso)"""
+        n = self.size
+        self.alive[:n][mask] = False
+        self.x[:n][mask] = np.nan
+        self.y[:n][mask] = np.nan
+
+    def kill_extras(self):
+        """Elimina todas las pelotas salvo la principal"""
+        self.alive[MAIN_BALL + 1:self.size] = False
+        self.x[MAIN_BALL + 1:self.size] = np.nan
+        self.y[MAIN_BALL + 1:self.size] = np.nan
+        self.size = min(self.size, MAIN_BALL + 1)
+
+    def reserve(self, size):
+        """Amplía los arreglos si hacen falta al menos size posiciones"""
+        if size > self.capacity:
+            capacity = self.capacity
+            while capacity < size:
+                capacity *= 2
+            self._grow(capacity)
+
+    def truncate(self, size):
+        """Deja en uso solo las primeras size posiciones; las demás quedan muertas"""
+        self.alive[size:self.size] = False
+        self.x[size:self.size] = np.nan
+        self.y[size:self.size] = np.nan
+        self.size = size
+
+    def indices(self):
+        """Índices de las pelotas vivas"""
+        return self.alive[:self.size].nonzero()[0]
+
+    def count(self):
+        return int(np.count_nonzero(self.alive[:self.size]))
+
+    def record_trails(self):
+        """Agrega la posición actual a la estela de cada pelota viva"""
+        indices = self.indices()
+        self.trails.record(indices, self.x[indices], self.y[indices])
+
+    def advance(self, paddles, field_height):
+        """Avanza un paso con detección continua de colisiones.
+
+        paddles es una lista de (x, y, ancho, alto, dirección) con dirección +1
+        para la paleta izquierda y -1 para la derecha. Cada golpe se resuelve en
+        su tiempo de impacto exacto y la pelota recorre el resto del paso con la
+        velocidad nueva, así que ninguna velocidad atraviesa la paleta. Devuelve
+        (golpes de paleta, rebotes en los bordes).
+        """
+        n = self.size
+        x = self.x[:n]
+        y = self.y[:n]
+        vx = self.vx[:n]
+        vy = self.vy[:n]
+        radius = self.radius[:n]
+
+        moved = None
+        hits = 0
+        for px, py, width, height, direction in paddles:
+            # Descarte rápido: la franja horizontal barrida no llega a la paleta
+            half_width = width / 2
+            near = np.abs(x + vx * 0.5 - (px + half_width)) < radius + half_width + np.abs(vx) * 0.5
+            if not np.count_nonzero(near):
+                continue
+
+            toi = sweep_circles_aabb(x, y, vx, vy, radius, px, py, width, height)
+            hit = (toi <= 1) & ((vx < 0) if direction > 0 else (vx > 0))
+            if moved is not None:
+                hit &= ~moved
+            count = int(np.count_nonzero(hit))
+            if not count:
+                continue
+
+            # Punto de contacto
+            t = toi[hit]
+            contact_x = x[hit] + vx[hit] * t
+            contact_y = y[hit] + vy[hit] * t
+
+            # Acelerar ligeramente y calcular el ángulo según dónde golpeó
+            max_speed = self.max_speed[:n][hit]
+            new_vx = np.clip(direction * np.abs(vx[hit]) * 1.05, -max_speed, max_speed)
+            new_vy = ((contact_y - py) / height - 0.5) * 10
+
+            # Recorrer lo que queda del paso con la velocidad nueva
+            rest = 1 - t
+            x[hit] = contact_x + new_vx * rest
+            y[hit] = contact_y + new_vy * rest
+            vx[hit] = new_vx
+            vy[hit] = new_vy
+
+            moved = hit if moved is None else moved | hit
+            hits += count
+
+        if moved is None:
+            x += vx
+            y += vy
+        else:
+            free = ~moved
+            x[free] += vx[free]
+            y[free] += vy[free]
+
+        # Rebotes en los bordes superior e inferior
+        bounced = reflect_walls(y, vy, radius, field_height)
+        return hits, int(np.count_nonzero(bounced))
+
+    def out_of_field(self, width):
+        """Máscaras (izquierda, derecha) de pelotas fuera del campo, o None si no hay ninguna"""
+        n = self.size
+        x = self.x[:n]
+        left = x < 0
+        right = x > width
+        if not (np.count_nonzero(left) or np.count_nonzero(right)):
+            return None
+        return left, right
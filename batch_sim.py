@@ -0,0 +1,218 @@
+"""Simulador de partidas en lote para balancear la dificultad.
+
+Juega miles de partidas CPU contra un jugador scriptado repartidas en un pool
+de procesos (uno por núcleo) y agrega tasas de victoria, duración de los
+peloteos, puntos por power-up activo y duración de las partidas.
+
+Uso:
+    python batch_sim.py --matches 10000 --difficulty easy medium hard --powerup-interval 300 600
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from powerups import POWERUP_TYPES
+from simulation import PongSimulation, DIFFICULTIES, INPUT_NONE, track_ball_policy
+
+FPS = 60
+MAX_MATCH_FRAMES = FPS * 60 * 10  # Partidas de más de 10 minutos se cuentan como sin terminar
+
+# Jugadores scriptados disponibles (por nombre, para poder enviarlos a otros procesos)
+POLICIES = {
+    'track': track_ball_policy,
+    'idle': lambda sim: INPUT_NONE,
+}
+
+
+def match_seed(base_seed, scenario_index, match_index):
+    """Semilla determinista de cada partida, independiente del orden de ejecución"""
+    return (base_seed * 1_000_003 + scenario_index) * 1_000_003 + match_index
+
+
+def play_match(task):
+    """Juega una partida completa y devuelve sus estadísticas (se ejecuta en un proceso del pool)"""
+    scenario_index, match_index, scenario, base_seed = task
+    sim = PongSimulation(match_seed(base_seed, scenario_index, match_index))
+    sim.choose_difficulty(scenario['difficulty'])
+    for key, value in scenario.get('cpu', {}).items():
+        setattr(sim.cpu, key, value)
+    if 'powerup_spawn_interval' in scenario:
+        sim.powerup_spawn_interval = scenario['powerup_spawn_interval']
+    sim.cpu_ai.target_all_balls = scenario.get('cpu_target_all_balls', False)
+    policy = POLICIES[scenario.get('policy', 'track')]
+
+    rally_frames = []
+    rally_hits = []
+    powerup_points = dict.fromkeys(list(POWERUP_TYPES) + ['none'], 0)
+    rally_start_frame = 0
+    rally_start_hits = 0
+    score = 0
+
+    sim.toggle_pause()
+    while sim.game_state == "playing" and sim.frame < MAX_MATCH_FRAMES:
+        sim.step(policy(sim))
+
+        new_score = sim.player_score + sim.cpu_score
+        if new_score != score:
+            # Atribuir los puntos a los power-ups activos en ese momento
+            points = new_score - score
+            active = [name for name in POWERUP_TYPES if sim.powerup_active(name)]
+            for name in active or ['none']:
+                powerup_points[name] += points
+            rally_frames.append(sim.frame - rally_start_frame)
+            rally_hits.append(sim.paddle_hits - rally_start_hits)
+            rally_start_frame = sim.frame
+            rally_start_hits = sim.paddle_hits
+            score = new_score
+
+    if sim.game_state != "game_over":
+        winner = None
+    else:
+        winner = 'player' if sim.player_score >= sim.max_score else 'cpu'
+
+    return {
+        'scenario': scenario_index,
+        'winner': winner,
+        'frames': sim.frame,
+        'player_score': sim.player_score,
+        'cpu_score': sim.cpu_score,
+        'rally_frames': rally_frames,
+        'rally_hits': rally_hits,
+        'powerup_points': powerup_points,
+    }
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(values):
+    if not values:
+        return {'mean': 0, 'p50': 0, 'p95': 0, 'max': 0}
+    return {
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'max': max(values),
+    }
+
+
+def aggregate(scenarios, results):
+    """Combina los resultados de cada partida en un reporte por escenario"""
+    report = []
+    for index, scenario in enumerate(scenarios):
+        matches = [r for r in results if r['scenario'] == index]
+        total = len(matches) or 1
+        wins = {'player': 0, 'cpu': 0, None: 0}
+        durations = []
+        rally_frames = []
+        rally_hits = []
+        powerup_points = dict.fromkeys(list(POWERUP_TYPES) + ['none'], 0)
+        for match in matches:
+            wins[match['winner']] += 1
+            durations.append(match['frames'])
+            rally_frames.extend(match['rally_frames'])
+            rally_hits.extend(match['rally_hits'])
+            for name, points in match['powerup_points'].items():
+                powerup_points[name] += points
+
+        report.append({
+            'scenario': scenario,
+            'matches': len(matches),
+            'player_win_rate': wins['player'] / total,
+            'cpu_win_rate': wins['cpu'] / total,
+            'unfinished': wins[None],
+            'match_frames': summarize(durations),
+            'match_seconds_mean': (sum(durations) / total) / FPS,
+            'rally_frames': summarize(rally_frames),
+            'rally_paddle_hits': summarize(rally_hits),
+            'points_by_powerup': powerup_points,
+        })
+    return report
+
+
+def run_batch(scenarios, matches, workers=None, base_seed=0):
+    """Reparte matches partidas por escenario entre los procesos y devuelve el reporte"""
+    tasks = [(s_index, m_index, scenario, base_seed)
+             for s_index, scenario in enumerate(scenarios)
+             for m_index in range(matches)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 8))
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_match(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(play_match, tasks, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'matches': len(tasks),
+        'workers': workers,
+        'base_seed': base_seed,
+        'elapsed_seconds': elapsed,
+        'simulated_frames': sum(r['frames'] for r in results),
+        'scenarios': aggregate(scenarios, results),
+    }
+
+
+def build_scenarios(args):
+    scenarios = []
+    for difficulty, interval in itertools.product(args.difficulty, args.powerup_interval):
+        scenario = {'difficulty': difficulty, 'powerup_spawn_interval': interval, 'policy': args.policy}
+        cpu = {key: value for key, value in (('speed', args.cpu_speed),
+                                              ('reaction_delay', args.cpu_reaction_delay),
+                                              ('prediction', args.cpu_prediction)) if value is not None}
+        if cpu:
+            scenario['cpu'] = cpu
+        if args.cpu_target_all_balls:
+            scenario['cpu_target_all_balls'] = True
+        scenarios.append(scenario)
+    return scenarios
+
+
+def print_report(report):
+    print(f"{report['matches']} partidas en {report['elapsed_seconds']:.1f} s "
+          f"con {report['workers']} procesos ({report['simulated_frames']} frames)")
+    for entry in report['scenarios']:
+        scenario = entry['scenario']
+        print(f"- {scenario['difficulty']:<6} power-up cada {scenario['powerup_spawn_interval']:>4} frames: "
+              f"jugador {entry['player_win_rate']:.1%}  CPU {entry['cpu_win_rate']:.1%}  "
+              f"peloteo p50 {entry['rally_frames']['p50']} frames  "
+              f"partida {entry['match_seconds_mean']:.0f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula partidas en lote para balancear la dificultad")
+    parser.add_argument('--matches', type=int, default=1000, help="partidas por escenario")
+    parser.add_argument('--difficulty', nargs='+', default=DIFFICULTIES, choices=DIFFICULTIES)
+    parser.add_argument('--powerup-interval', nargs='+', type=int, default=[600])
+    parser.add_argument('--cpu-speed', type=float)
+    parser.add_argument('--cpu-reaction-delay', type=float)
+    parser.add_argument('--cpu-prediction', type=float)
+    parser.add_argument('--cpu-target-all-balls', action='store_true',
+                        help="con pelotas múltiples la CPU persigue la que llegará antes")
+    parser.add_argument('--policy', default='track', choices=sorted(POLICIES))
+    parser.add_argument('--workers', type=int, help="procesos (por defecto, todos los núcleos)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="archivo JSON donde guardar el reporte")
+    args = parser.parse_args(argv)
+
+    report = run_batch(build_scenarios(args), args.matches, args.workers, args.seed)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Benchmarks reproducibles de la simulación y el renderizado.
+
+Corre con el driver de video dummy de SDL (no abre ventana) sobre escenarios
+con semilla fija y mide por llamada PongGame.update(), render(),
+render_difficulty_menu(), draw_glow_circle y el dibujo de estelas. Los
+resultados se pueden guardar como línea base en JSON y comparar contra ella
+para detectar regresiones.
+
+Uso:
+    python benchmark.py --save benchmark-baseline.json
+    python benchmark.py --compare benchmark-baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from ball_pool import MAIN_BALL
+from pong_game import PongGame, Colors
+from snapshot import SimSnapshot
+
+FORMAT_VERSION = 1
+LONG_DURATION = 10 ** 9  # Power-ups que no vencen durante la medición
+
+
+def setup_menu(game):
+    """Menú de dificultad sin cambios"""
+
+
+def setup_rally(game):
+    game.sim.choose_difficulty('medium')
+    game.toggle_pause()
+
+
+def setup_multi_ball(game):
+    game.sim.multi_ball_count = 300
+    game.sim.multi_ball_duration = LONG_DURATION
+    setup_rally(game)
+    game.update()
+    game.sim.activate_powerup('multi_ball')
+
+
+def setup_all_powerups(game):
+    sim = game.sim
+    sim.player_frozen_duration = sim.cpu_frozen_duration = sim.multi_ball_duration = LONG_DURATION
+    setup_rally(game)
+    game.update()
+    for powerup in ('freeze_player', 'freeze_cpu', 'multi_ball'):
+        sim.activate_powerup(powerup)
+
+
+# Escenario: (preparación, ticks de calentamiento antes de medir)
+SCENARIOS = {
+    'menu': (setup_menu, 10),
+    'rally': (setup_rally, 120),
+    # Pocos ticks: las pelotas extra que salen del campo no vuelven (la medición restaura este estado)
+    'multi_ball': (setup_multi_ball, 10),
+    'all_powerups': (setup_all_powerups, 120),
+}
+
+
+def build_game(scenario, seed):
+    """PongGame en el estado inicial del escenario, con las capas y caches ya calientes"""
+    game = PongGame(seed)
+    game.replay_dir = None
+    setup, warmup_ticks = SCENARIOS[scenario]
+    setup(game)
+    for _ in range(warmup_ticks):
+        game.update()
+        game.render()
+    return game
+
+
+def time_calls(function, iterations):
+    """Tiempo por llamada de cada iteración, en microsegundos"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        function()
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    return samples
+
+
+def measure(scenario, seed, iterations):
+    """Mide cada función del escenario; devuelve {nombre: [microsegundos, ...]}"""
+    game = build_game(scenario, seed)
+    results = {}
+
+    if scenario == 'menu':
+        results['render_difficulty_menu'] = time_calls(game.render_difficulty_menu, iterations)
+        results['render'] = time_calls(game.render, iterations)
+
+        # Cambiar la opción elegida obliga a reconstruir la capa estática del menú
+        def change_selection():
+            game.selected_difficulty = (game.selected_difficulty + 1) % 3
+            game.render_difficulty_menu()
+        results['render_difficulty_menu_rebuild'] = time_calls(change_selection, iterations // 10 or 1)
+        return results
+
+    # Cada iteración parte del estado tras el calentamiento, así todas miden la misma carga
+    # (sin esto las pelotas extra se pierden y la partida puede terminar durante la medición)
+    sim = game.sim
+    start_state = SimSnapshot(sim.balls.capacity, sim.trail_length).capture(sim)
+
+    # update y render se alternan para que cada render dibuje un tick nuevo
+    update_samples = []
+    render_samples = []
+    for _ in range(iterations):
+        start_state.restore(sim)
+        update_samples.extend(time_calls(game.update, 1))
+        render_samples.extend(time_calls(game.render, 1))
+    results['update'] = update_samples
+    results['render'] = render_samples
+
+    center = (int(sim.balls.x[MAIN_BALL]) % sim.FIELD_WIDTH, int(sim.balls.y[MAIN_BALL]) % sim.FIELD_HEIGHT)
+    results['draw_glow_circle'] = time_calls(
+        lambda: game.draw_glow_circle(game.screen, Colors.WHITE, center, sim.ball_radius), iterations)
+
+    indices = sim.balls.indices()
+    results['draw_trails'] = time_calls(
+        lambda: game.draw_trails(game.screen, Colors.ORANGE, indices, sim.ball_radius), iterations)
+    return results
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'median_us': float(np.median(ordered)),
+        'p95_us': ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        'min_us': ordered[0],
+        'calls': len(ordered),
+    }
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+    }
+
+
+def run_suite(scenarios, seed=0, iterations=300, repeat=3):
+    """Corre los escenarios repeat veces y se queda con la mejor mediana de cada medición"""
+    results = {}
+    for scenario in scenarios:
+        best = {}
+        for _ in range(repeat):
+            for name, samples in measure(scenario, seed, iterations).items():
+                summary = summarize(samples)
+                if name not in best or summary['median_us'] < best[name]['median_us']:
+                    best[name] = summary
+        results[scenario] = best
+    return {
+        'version': FORMAT_VERSION,
+        'seed': seed,
+        'iterations': iterations,
+        'repeat': repeat,
+        'environment': environment(),
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Lista de (escenario, medición, base, actual, cambio) que empeoraron más que threshold"""
+    regressions = []
+    for scenario, measurements in report['results'].items():
+        for name, summary in measurements.items():
+            base = baseline['results'].get(scenario, {}).get(name)
+            if not base:
+                continue
+            change = summary['median_us'] / base['median_us'] - 1
+            if change > threshold:
+                regressions.append((scenario, name, base['median_us'], summary['median_us'], change))
+    return regressions
+
+
+def print_report(report, baseline=None):
+    for scenario, measurements in report['results'].items():
+        print(f"{scenario}:")
+        for name, summary in measurements.items():
+            line = f"  {name:<32} {summary['median_us']:>9.1f} µs  (p95 {summary['p95_us']:.1f})"
+            base = baseline and baseline['results'].get(scenario, {}).get(name)
+            if base:
+                line += f"  {summary['median_us'] / base['median_us'] - 1:+.1%} vs base"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de update() y render() con escenarios fijos")
+    parser.add_argument('--scenario', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument('--iterations', type=int, default=300, help="llamadas medidas por repetición")
+    parser.add_argument('--repeat', type=int, default=3, help="repeticiones (se usa la mejor mediana)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', metavar='ARCHIVO', help="guardar los resultados como línea base JSON")
+    parser.add_argument('--compare', metavar='ARCHIVO', help="comparar contra una línea base guardada")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="empeoramiento relativo de la mediana que cuenta como regresión")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('version') != FORMAT_VERSION:
+            print(f"Versión de línea base no soportada: {baseline.get('version')}")
+            return 2
+        if baseline['environment'] != environment():
+            print("Aviso: la línea base se midió en otro entorno; las diferencias pueden no ser regresiones")
+
+    report = run_suite(args.scenario, args.seed, args.iterations, args.repeat)
+    print_report(report, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if baseline:
+        regressions = compare(report, baseline, args.threshold)
+        for scenario, name, base, current, change in regressions:
+            print(f"REGRESIÓN {scenario}/{name}: {base:.1f} µs -> {current:.1f} µs ({change:+.1%})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Captura de frames a video sin capturas de pantalla.
+
+Cada frame presentado se copia una sola vez, directo desde el buffer de la
+Surface de la pantalla (Surface.get_view, sin pasar por bytes intermedios),
+a una posición libre de un anillo NumPy preasignado. Un hilo escritor vacía
+el anillo hacia ffmpeg por una tubería o hacia un archivo de video crudo, así
+que el bucle del juego nunca espera al disco ni al codificador.
+
+En tiempo real (--grabar en pong_game.py) se graba a tasa fija y, si el
+anillo se llena, el frame se descarta en lugar de frenar el juego. Al
+renderizar un replay sin ventana (driver dummy de SDL) no hay apuro: se
+espera a que se libere una posición y no se pierde ningún frame.
+
+Uso:
+    python capture.py replays/partida.pongreplay partida.mp4     # necesita ffmpeg
+    python capture.py replays/partida.pongreplay partida.raw     # video crudo + partida.raw.json
+"""
+import argparse
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Formato de píxel de ffmpeg según (bytes por píxel, desplazamiento del rojo)
+PIXEL_FORMATS = {
+    (4, 16): 'bgr0',
+    (4, 0): 'rgb0',
+    (3, 16): 'bgr24',
+    (3, 0): 'rgb24',
+}
+
+
+def pixel_format(surface):
+    """Nombre del formato de píxel de ffmpeg que coincide con la memoria de la Surface"""
+    key = (surface.get_bytesize(), surface.get_shifts()[0])
+    if key not in PIXEL_FORMATS:
+        raise ValueError(f"Formato de Surface no soportado para grabar: {surface.get_bitsize()} bits")
+    return PIXEL_FORMATS[key]
+
+
+class RawSink:
+    """Escribe los frames uno tras otro en un archivo crudo, con el formato en un .json al lado"""
+
+    def __init__(self, path, width, height, pix_fmt, fps):
+        self.path = path
+        self.file = open(path, 'wb')
+        with open(path + '.json', 'w') as f:
+            json.dump({'width': width, 'height': height, 'pix_fmt': pix_fmt, 'fps': fps}, f)
+
+    def write(self, frame):
+        self.file.write(frame)
+
+    def close(self):
+        self.file.close()
+
+
+class FfmpegSink:
+    """Codifica los frames con ffmpeg, que los lee crudos por su entrada estándar"""
+
+    def __init__(self, path, width, height, pix_fmt, fps):
+        executable = shutil.which('ffmpeg')
+        if executable is None:
+            raise RuntimeError("No se encontró ffmpeg: instalalo o grabá a un archivo .raw")
+        self.process = subprocess.Popen(
+            [executable, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', pix_fmt,
+             '-s', f'{width}x{height}', '-r', str(fps), '-i', '-', '-pix_fmt', 'yuv420p', path],
+            stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        self.process.stdin.write(frame)
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def open_sink(path, width, height, pix_fmt, fps):
+    sink_class = RawSink if path.endswith('.raw') else FfmpegSink
+    return sink_class(path, width, height, pix_fmt, fps)
+
+
+class FrameCapture:
+    """Anillo de frames preasignado con un hilo que lo vacía hacia un archivo o ffmpeg.
+
+    grab() copia la pantalla a una posición libre y la encola; el hilo
+    escritor pasa la posición al sink sin copiarla de nuevo (memoryview) y la
+    devuelve a las libres. Con realtime=True se graba como mucho a fps frames
+    por segundo y un anillo lleno descarta el frame; con realtime=False cada
+    llamada graba un frame y espera si hace falta.
+    """
+
+    def __init__(self, surface, path, fps=60, slots=8, realtime=True):
+        self.width, self.height = surface.get_size()
+        self.row_bytes = self.width * surface.get_bytesize()
+        self.pitch = surface.get_pitch()
+        self.fps = fps
+        self.realtime = realtime
+        self.frame_interval = 1.0 / fps
+        self.next_due = 0.0
+        self.sink = open_sink(path, self.width, self.height, pixel_format(surface), fps)
+
+        self.ring = np.empty((slots, self.height, self.row_bytes), dtype=np.uint8)
+        self.free = queue.SimpleQueue()
+        self.filled = queue.SimpleQueue()
+        for slot in range(slots):
+            self.free.put(slot)
+
+        self.frames = 0
+        self.dropped = 0
+        self.copy_seconds = 0.0
+        self.write_seconds = 0.0
+        self.error = None
+        self.writer = threading.Thread(target=self.drain, name="grabación", daemon=True)
+        self.writer.start()
+
+    def grab(self, surface):
+        """Copia el frame presentado al anillo; devuelve False si se descartó o no tocaba grabar"""
+        if self.error is not None:
+            raise self.error
+        if self.realtime:
+            now = time.perf_counter()
+            if now < self.next_due:
+                return False
+            # Si el juego se atrasó no se graban frames de más para alcanzar
+            self.next_due = max(self.next_due + self.frame_interval, now)
+            try:
+                slot = self.free.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+                return False
+        else:
+            slot = self.free.get()
+
+        start = time.perf_counter()
+        view = surface.get_view('0')  # Bloquea la Surface mientras exista
+        pixels = np.frombuffer(view, dtype=np.uint8).reshape(self.height, self.pitch)
+        np.copyto(self.ring[slot], pixels[:, :self.row_bytes])
+        del pixels, view
+        self.copy_seconds += time.perf_counter() - start
+
+        self.frames += 1
+        self.filled.put(slot)
+        return True
+
+    def drain(self):
+        """Hilo escritor: pasa cada posición llena al sink y la devuelve a las libres"""
+        try:
+            while True:
+                slot = self.filled.get()
+                if slot is None:
+                    break
+                start = time.perf_counter()
+                self.sink.write(memoryview(self.ring[slot]))
+                self.write_seconds += time.perf_counter() - start
+                self.free.put(slot)
+        except BaseException as exc:
+            self.error = exc
+            # Liberar al productor si está esperando una posición
+            for slot in range(len(self.ring)):
+                self.free.put(slot)
+
+    def close(self):
+        """Espera a que se escriban los frames encolados y cierra el archivo o ffmpeg"""
+        self.filled.put(None)
+        self.writer.join()
+        self.sink.close()
+        if self.error is not None:
+            raise self.error
+
+    def print_report(self):
+        megabytes = self.frames * self.height * self.row_bytes / 2 ** 20
+        print("Grabación:")
+        print(f"  frames grabados     {self.frames:8d}  ({megabytes:.0f} MB crudos)")
+        print(f"  frames descartados  {self.dropped:8d}")
+        if self.frames:
+            print(f"  copia por frame     {self.copy_seconds / self.frames * 1000:8.3f} ms (hilo del juego)")
+            print(f"  escritura por frame {self.write_seconds / self.frames * 1000:8.3f} ms (hilo escritor)")
+
+
+def render_replay(replay, path, speed=1):
+    """Renderiza un replay a video sin ventana, un frame cada speed ticks"""
+    from pong_game import PongGame
+    from replay import ReplayPlayer
+
+    game = PongGame(replay.seed)
+    game.replay_dir = None
+    game.pin_quality('alta')
+    player = ReplayPlayer(replay)
+    game.sim = player.sim
+    capture = game.capture = FrameCapture(game.display, path, fps=game.TICK_RATE, realtime=False)
+    start = time.perf_counter()
+    try:
+        while player.tick < player.length:
+            game.save_previous_state()
+            for _ in range(speed):
+                if not player.step():
+                    break
+            game.render()
+            game.present()
+    finally:
+        game.capture = None
+        capture.close()
+    return capture, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Renderiza un replay de Pong Arcade a video sin ventana")
+    parser.add_argument('replay')
+    parser.add_argument('salida', help="archivo de video (.mp4, .mkv, ... con ffmpeg) o .raw")
+    parser.add_argument('--velocidad', type=int, default=1, help="ticks simulados por frame")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from replay import Replay
+
+    replay = Replay.load(args.replay)
+    capture, elapsed = render_replay(replay, args.salida, max(1, args.velocidad))
+    print(f"{capture.frames} frames en {elapsed:.1f} s ({capture.frames / elapsed:.0f} frames/s) -> {args.salida}")
+    capture.print_report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
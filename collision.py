@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def sweep_circles_aabb(x, y, dx, dy, radius, left, top, width, height):
+    """Tiempo de impacto (0..1) de cada círculo que se desplaza (dx, dy) contra un rectángulo.
+
+    Usa el método de las franjas sobre el rectángulo agrandado por el radio
+    (suma de Minkowski aproximada sin redondear las esquinas). Devuelve 0 si el
+    círculo ya se superpone al empezar el paso y np.inf si no hay impacto. Las
+    pelotas con posición NaN nunca chocan.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tx1 = (left - radius - x) / dx
+        tx2 = (left + width + radius - x) / dx
+        ty1 = (top - radius - y) / dy
+        ty2 = (top + height + radius - y) / dy
+
+    # Sin movimiento en un eje: dentro de la franja siempre, fuera nunca
+    inside_x = (x > left - radius) & (x < left + width + radius)
+    inside_y = (y > top - radius) & (y < top + height + radius)
+    still_x = dx == 0
+    still_y = dy == 0
+    tx_near = np.where(still_x, np.where(inside_x, -np.inf, np.inf), np.minimum(tx1, tx2))
+    tx_far = np.where(still_x, np.where(inside_x, np.inf, -np.inf), np.maximum(tx1, tx2))
+    ty_near = np.where(still_y, np.where(inside_y, -np.inf, np.inf), np.minimum(ty1, ty2))
+    ty_far = np.where(still_y, np.where(inside_y, np.inf, -np.inf), np.maximum(ty1, ty2))
+
+    t_enter = np.maximum(tx_near, ty_near)
+    t_exit = np.minimum(tx_far, ty_far)
+
+    hit = (t_enter < t_exit) & (t_exit > 0) & (t_enter <= 1)
+    return np.where(hit, np.maximum(t_enter, 0.0), np.inf)
+
+
+def reflect_walls(y, vy, radius, height):
+    """Refleja en el lugar las pelotas que cruzan el borde superior o inferior durante el paso.
+
+    La posición se espeja respecto del punto de contacto, así que la pelota
+    nunca queda dentro del borde, y solo rebotan las que se acercan a él (no
+    hay inversiones repetidas de la velocidad). Devuelve la máscara de rebotes.
+    """
+    # Descarte rápido: |y - mitad| > mitad - radio equivale a cruzar algún borde
+    half = height / 2
+    crossing = np.abs(y - half) > half - radius
+    if not np.count_nonzero(crossing):
+        return crossing
+
+    top = crossing & (y < half) & (vy < 0)
+    bottom = crossing & (y > half) & (vy > 0)
+    if np.count_nonzero(top):
+        y[top] = 2 * radius[top] - y[top]
+        vy[top] = -vy[top]
+    if np.count_nonzero(bottom):
+        y[bottom] = 2 * (height - radius[bottom]) - y[bottom]
+        vy[bottom] = -vy[bottom]
+    return top | bottom
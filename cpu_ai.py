@@ -0,0 +1,96 @@
+import math
+
+import numpy as np
+
+from ball_pool import MAIN_BALL
+
+
+def reflect(y, height):
+    """Pliega y dentro de [0, height] como si rebotara en los bordes (forma cerrada)"""
+    period = 2 * height
+    y = y % period
+    return period - y if y > height else y
+
+
+class CpuController:
+    """IA de la CPU con predicción de intercepción en forma cerrada.
+
+    Mientras una pelota no rebota ni cambia de velocidad, su predicción es una
+    función lineal del frame, así que se calcula una vez por trayectoria y en
+    cada frame solo se evalúa y se pliega con reflect(). La trayectoria se
+    recalcula cuando cambia la velocidad (rebote en borde, golpe de paleta o
+    saque) o cuando se invalida explícitamente.
+    """
+
+    def __init__(self, target_all_balls=False):
+        # Con pelotas múltiples, perseguir la que llegará antes en lugar de la principal
+        self.target_all_balls = target_all_balls
+
+        self.trajectory = None  # (pelota, vx, vy, x de la CPU, predicción)
+        self.base_y = 0.0
+        self.drift = 0.0
+        self.start_frame = 0
+        self.recomputes = 0
+
+    def invalidate(self):
+        """Olvida la trayectoria cacheada (por ejemplo, tras un saque)"""
+        self.trajectory = None
+
+    def choose_ball(self, sim):
+        """Índice de la pelota más amenazante: la que llegará antes a la CPU"""
+        balls = sim.balls
+        if not self.target_all_balls or balls.size == 1:
+            return MAIN_BALL
+
+        n = balls.size
+        vx = balls.vx[:n]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            time_to_reach = (sim.cpu.x - balls.x[:n]) / vx
+        # Solo cuentan las pelotas vivas que se acercan y aún no pasaron la paleta
+        time_to_reach[~((vx > 0) & (time_to_reach >= 0))] = np.inf
+        index = int(np.argmin(time_to_reach))
+        return index if math.isfinite(time_to_reach[index]) else MAIN_BALL
+
+    def predicted_y(self, sim, index):
+        """Altura a la que la CPU espera la pelota, plegada por los rebotes"""
+        balls = sim.balls
+        cpu = sim.cpu
+        speed_x = float(balls.vx[index])
+        speed_y = float(balls.vy[index])
+        key = (index, speed_x, speed_y, cpu.x, cpu.prediction)
+
+        if key != self.trajectory:
+            frames_to_reach = (cpu.x - float(balls.x[index])) / speed_x
+            # predicted(f) = y(f) + vy * (T - f) * k = base_y + vy * (1 - k) * f
+            self.base_y = float(balls.y[index]) + speed_y * frames_to_reach * cpu.prediction
+            self.drift = speed_y * (1 - cpu.prediction)
+            self.start_frame = sim.frame
+            self.trajectory = key
+            self.recomputes += 1
+
+        predicted_y = self.base_y + self.drift * (sim.frame - self.start_frame)
+        if not math.isfinite(predicted_y):
+            return sim.FIELD_HEIGHT // 2
+        return reflect(predicted_y, sim.FIELD_HEIGHT)
+
+    def update(self, sim):
+        """Mueve la paleta de la CPU hacia la posición prevista"""
+        cpu = sim.cpu
+        index = self.choose_ball(sim)
+        ball_x = float(sim.balls.x[index])
+        speed_x = float(sim.balls.vx[index])
+        cpu_center = cpu.center
+
+        if speed_x > 0:  # Pelota viene hacia CPU
+            target_y = self.predicted_y(sim, index)
+        else:
+            target_y = sim.FIELD_HEIGHT // 2  # Volver al centro
+
+        # Mover CPU hacia la posición objetivo
+        reaction_distance = cpu.reaction_delay * 15
+        if abs(ball_x - cpu.x) < reaction_distance or speed_x > 0:
+            tolerance = 15
+            if cpu_center < target_y - tolerance:
+                cpu.y += cpu.speed
+            elif cpu_center > target_y + tolerance:
+                cpu.y -= cpu.speed
@@ -0,0 +1,738 @@
+"""Modo versus en red: servidor autoritativo asyncio por UDP y clientes con predicción.
+
+El servidor corre la simulación de todas las partidas en un solo bucle a 60
+ticks por segundo. Los clientes envían solo bits de entrada (todos los aún
+no confirmados en cada paquete, para tolerar pérdidas), que el servidor encola y
+aplica de a una por tick, y reciben instantáneas del
+estado cuantizado a 1/8 de píxel, codificadas como diferencia contra la
+última instantánea que el cliente confirmó. Cada cliente predice su propia
+paleta con las entradas aún no confirmadas e interpola el resto con un
+pequeño retraso.
+
+Uso:
+    python netplay.py servidor --puerto 40404
+    python netplay.py cliente 127.0.0.1:40404
+    python netplay.py prueba --partidas 50 --latencia 0.05 --perdida 0.05 --segundos 10
+"""
+import argparse
+import asyncio
+import collections
+import random
+import struct
+import sys
+import time
+
+from powerups import POWERUP_TYPES
+from simulation import (PongSimulation, GAME_STATES, INPUT_NONE, INPUT_UP, INPUT_DOWN, INPUT_PAUSE, INPUT_RESET,
+                        INPUT_MOVE_MASK, move_paddle_y)
+
+PROTOCOL_VERSION = 1
+TICK_RATE = 60
+DEFAULT_PORT = 40404
+
+PACKET_HELLO = 1     # cliente -> servidor: versión
+PACKET_WELCOME = 2   # servidor -> cliente: id de partida, lado
+PACKET_INPUT = 3     # cliente -> servidor: última instantánea recibida y entradas recientes
+PACKET_SNAPSHOT = 4  # servidor -> cliente: estado como diferencia contra una base
+PACKET_BYE = 5       # cualquiera: fin de la conexión
+
+SIDE_LEFT = 0
+SIDE_RIGHT = 1
+
+MAX_PACKET_INPUTS = 64   # Entradas sin confirmar por paquete (5 bytes cada una; más de un segundo)
+INPUT_BUFFER = 4         # Entradas en cola por jugador antes de aplicar las sobrantes de una vez
+SNAPSHOT_HISTORY = 64    # Instantáneas guardadas para decodificar y usar de base
+INTERPOLATION_TICKS = 6  # Retraso de interpolación (100 ms a 60 Hz)
+CLIENT_TIMEOUT = 5.0     # Segundos sin paquetes antes de cerrar la partida
+
+# Medidas fijas de la simulación que el cliente necesita para predecir
+_REFERENCE = PongSimulation(0)
+FIELD_HEIGHT = _REFERENCE.FIELD_HEIGHT
+PADDLE_HEIGHT = _REFERENCE.player.height
+PADDLE_SPEED = _REFERENCE.player.speed
+del _REFERENCE
+
+POWERUP_NAMES = list(POWERUP_TYPES)
+
+# Cuantización: 1/8 de píxel con un margen para posiciones fuera del campo
+QUANT_SCALE = 8
+QUANT_OFFSET = 1024
+
+# Campos fijos al principio de cada instantánea; después, x e y de cada pelota
+FIELD_STATE, FIELD_PLAYER_SCORE, FIELD_CPU_SCORE, FIELD_LEFT_Y, FIELD_RIGHT_Y, FIELD_POWERUPS, FIELD_BALLS = range(7)
+HEADER_FIELDS = 7
+
+_HEADER = struct.Struct('<BB')
+_INPUT_HEADER = struct.Struct('<BIB')
+_INPUT_ENTRY = struct.Struct('<IB')
+_SNAPSHOT_HEADER = struct.Struct('<BIIIH')
+_WELCOME = struct.Struct('<BIB')
+
+
+def quantize(value):
+    return min(0xFFFF, max(0, int(round((value + QUANT_OFFSET) * QUANT_SCALE))))
+
+
+def dequantize(value):
+    return value / QUANT_SCALE - QUANT_OFFSET
+
+
+def snapshot_values(sim):
+    """Estado visible de la simulación como lista de enteros de 16 bits"""
+    flags = 0
+    for bit, name in enumerate(POWERUP_NAMES):
+        if sim.powerup_active(name):
+            flags |= 1 << bit
+    balls = sim.balls
+    indices = balls.indices()
+    values = [GAME_STATES.index(sim.game_state), sim.player_score, sim.cpu_score,
+              quantize(sim.player.y), quantize(sim.cpu.y), flags, len(indices)]
+    for x, y in zip(balls.x[indices].tolist(), balls.y[indices].tolist()):
+        values.append(quantize(x))
+        values.append(quantize(y))
+    return values
+
+
+def encode_delta(values, base):
+    """Máscara de valores cambiados respecto de base y solo esos valores"""
+    count = len(values)
+    mask = bytearray((count + 7) // 8)
+    changed = []
+    base_count = len(base) if base is not None else 0
+    for i, value in enumerate(values):
+        if i >= base_count or base[i] != value:
+            mask[i >> 3] |= 1 << (i & 7)
+            changed.append(value)
+    return bytes(mask) + struct.pack(f'<{len(changed)}H', *changed)
+
+
+def valid_delta(data, offset, count, base):
+    """True si data tiene la máscara y los valores que anuncia y base cubre los que no cambiaron"""
+    mask_end = offset + (count + 7) // 8
+    if len(data) < mask_end:
+        return False
+    mask = int.from_bytes(data[offset:mask_end], 'little')
+    changed = bin(mask).count('1')
+    if len(data) < mask_end + 2 * changed:
+        return False
+    base_count = len(base) if base is not None else 0
+    return all(mask >> i & 1 for i in range(base_count, count))
+
+
+def decode_delta(data, offset, count, base):
+    mask_length = (count + 7) // 8
+    mask = data[offset:offset + mask_length]
+    offset += mask_length
+    values = []
+    for i in range(count):
+        if mask[i >> 3] & (1 << (i & 7)):
+            (value,) = struct.unpack_from('<H', data, offset)
+            offset += 2
+            values.append(value)
+        else:
+            values.append(base[i])
+    return values
+
+
+class LinkConditioner:
+    """Envoltorio de un transporte de datagramas que agrega latencia, variación y pérdida.
+
+    Sirve para probar por loopback cómo se comporta el juego en una red
+    real. Con todo en cero envía directamente.
+    """
+
+    def __init__(self, transport, latency=0.0, jitter=0.0, loss=0.0, seed=0):
+        self.transport = transport
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.loop = asyncio.get_running_loop()
+        self.sent = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+
+    def sendto(self, data, addr=None):
+        self.sent += 1
+        self.bytes_sent += len(data)
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            self.loop.call_later(delay, self._send, data, addr)
+        else:
+            self._send(data, addr)
+
+    def _send(self, data, addr):
+        if not self.transport.is_closing():
+            self.transport.sendto(data, addr)
+
+    def close(self):
+        self.transport.close()
+
+
+class RemotePlayer:
+    """Estado de un cliente en el servidor"""
+
+    def __init__(self, addr, side):
+        self.addr = addr
+        self.side = side
+        self.last_seq = 0          # Última entrada aplicada (la que confirman las instantáneas)
+        self.received_seq = 0      # Última entrada recibida
+        self.pending = collections.deque()  # (seq, bits) recibidas y aún sin aplicar, en orden
+        self.commands = INPUT_NONE  # Pausa/reinicio de entradas ya aplicadas, para el próximo tick
+        self.ack_snapshot = 0       # Última instantánea que el cliente confirmó
+        self.history = {}           # tick -> valores enviados (posibles bases)
+        self.last_seen = time.monotonic()
+
+    def receive_inputs(self, entries):
+        """Encola las entradas nuevas (ignora las repetidas por redundancia)"""
+        for seq, bits in sorted(entries):
+            if seq <= self.received_seq:
+                continue
+            self.pending.append((seq, bits))
+            self.received_seq = seq
+
+    def take_action(self):
+        """Entrada de este tick: la más vieja de la cola (sin movimiento si no llegó ninguna).
+
+        Una entrada por tick, igual que la predicción del cliente, que mueve su
+        paleta una vez por cada entrada sin confirmar.
+        """
+        action = self.commands
+        self.commands = INPUT_NONE
+        if self.pending:
+            self.last_seq, bits = self.pending.popleft()
+            action |= bits
+        return action
+
+
+class Match:
+    """Una partida versus: simulación autoritativa y sus dos jugadores"""
+
+    def __init__(self, match_id, seed):
+        self.match_id = match_id
+        self.sim = PongSimulation(seed)
+        self.sim.versus = True
+        self.sim.choose_difficulty('medium')
+        self.players = [None, None]
+        self.tick = 0
+
+    @property
+    def full(self):
+        return all(self.players)
+
+    def step(self):
+        sim = self.sim
+        left, right = self.players
+        left_action = left.take_action()
+        right_action = right.take_action()
+        # step() solo aplica los comandos de la primera entrada: se juntan los de ambos lados
+        # (con OR, así dos pulsaciones en el mismo tick cuentan una vez en lugar de anularse)
+        sim.step(left_action | (right_action & ~INPUT_MOVE_MASK), right_action)
+        # Reiniciar vuelve al menú; en versus se pasa directo a esperar el saque
+        if sim.game_state == "difficulty_menu":
+            sim.choose_difficulty('medium')
+        for player in self.players:
+            self.catch_up(player)
+        self.tick += 1
+
+    def catch_up(self, player):
+        """Aplica ya las entradas que exceden INPUT_BUFFER para que la cola no acumule retraso.
+
+        Tras una ráfaga (variación o pérdida) llegan varias entradas juntas; a
+        una por tick la demora quedaría para siempre. Cada sobrante mueve la
+        paleta una vez, como en la predicción del cliente, y sus comandos pasan
+        al próximo tick.
+        """
+        sim = self.sim
+        if player.side == SIDE_LEFT:
+            paddle, frozen = sim.player, sim.player_frozen
+        else:
+            paddle, frozen = sim.cpu, sim.cpu_frozen
+        while len(player.pending) > INPUT_BUFFER:
+            player.last_seq, bits = player.pending.popleft()
+            player.commands |= bits & ~INPUT_MOVE_MASK
+            if sim.game_state == "playing" and not frozen:
+                paddle.y = move_paddle_y(paddle.y, bits, sim.player.speed, paddle.height, sim.FIELD_HEIGHT)
+
+    def snapshot_packet(self, player, values):
+        """Instantánea para player codificada contra la última que confirmó"""
+        base_tick = player.ack_snapshot if player.ack_snapshot in player.history else 0
+        base = player.history.get(base_tick)
+        player.history[self.tick] = values
+        stale = self.tick - SNAPSHOT_HISTORY
+        if stale in player.history:
+            del player.history[stale]
+        header = _SNAPSHOT_HEADER.pack(PACKET_SNAPSHOT, self.tick, base_tick, player.last_seq, len(values))
+        return header + encode_delta(values, base)
+
+
+class MatchServer(asyncio.DatagramProtocol):
+    """Servidor UDP con muchas partidas simultáneas en un solo bucle de ticks"""
+
+    def __init__(self, latency=0.0, jitter=0.0, loss=0.0, seed=0):
+        self.conditions = (latency, jitter, loss)
+        self.seed = seed
+        self.transport = None
+        self.matches = {}
+        self.players = {}  # dirección -> (partida, RemotePlayer)
+        self.waiting = None  # Partida con un lugar libre
+        self.next_match_id = 1
+        self.ticks = 0
+        self.tick_seconds = 0.0  # Tiempo total de CPU de los ticks
+        self.late_ticks = 0
+        self.running = True
+
+    def connection_made(self, transport):
+        latency, jitter, loss = self.conditions
+        self.transport = LinkConditioner(transport, latency, jitter, loss, self.seed)
+
+    def datagram_received(self, data, addr):
+        if not data:
+            return
+        kind = data[0]
+        entry = self.players.get(addr)
+        if entry is not None:
+            match, player = entry
+            player.last_seen = time.monotonic()
+            if kind == PACKET_INPUT:
+                self.receive_input(player, data)
+            elif kind == PACKET_BYE:
+                self.close_match(match)
+            elif kind == PACKET_HELLO:
+                self.send_welcome(match, player)
+        elif kind == PACKET_HELLO and len(data) >= _HEADER.size:
+            _, version = _HEADER.unpack_from(data)
+            if version == PROTOCOL_VERSION:
+                self.join(addr)
+
+    def receive_input(self, player, data):
+        """Encola las entradas del paquete; los cortos o malformados se descartan en silencio"""
+        if len(data) < _INPUT_HEADER.size:
+            return
+        _, ack_snapshot, count = _INPUT_HEADER.unpack_from(data)
+        if count > MAX_PACKET_INPUTS or len(data) < _INPUT_HEADER.size + count * _INPUT_ENTRY.size:
+            return
+        player.ack_snapshot = max(player.ack_snapshot, ack_snapshot)
+        entries = [_INPUT_ENTRY.unpack_from(data, _INPUT_HEADER.size + i * _INPUT_ENTRY.size)
+                   for i in range(count)]
+        player.receive_inputs(entries)
+
+    def join(self, addr):
+        """Ubica al cliente en la partida que espera rival o en una nueva"""
+        if self.waiting is None:
+            match_id = self.next_match_id
+            self.next_match_id += 1
+            self.waiting = Match(match_id, seed=self.seed * 1_000_003 + match_id)
+            self.matches[match_id] = self.waiting
+        match = self.waiting
+        side = match.players.index(None)
+        player = RemotePlayer(addr, side)
+        match.players[side] = player
+        self.players[addr] = (match, player)
+        if match.full:
+            self.waiting = None
+        self.send_welcome(match, player)
+
+    def send_welcome(self, match, player):
+        self.transport.sendto(_WELCOME.pack(PACKET_WELCOME, match.match_id, player.side), player.addr)
+
+    def close_match(self, match):
+        for player in match.players:
+            if player is not None:
+                self.players.pop(player.addr, None)
+                self.transport.sendto(bytes((PACKET_BYE,)), player.addr)
+        self.matches.pop(match.match_id, None)
+        if self.waiting is match:
+            self.waiting = None
+
+    def tick(self):
+        """Avanza todas las partidas completas y envía sus instantáneas"""
+        start = time.perf_counter()
+        now = time.monotonic()
+        for match in list(self.matches.values()):
+            if any(player is not None and now - player.last_seen > CLIENT_TIMEOUT
+                   for player in match.players):
+                self.close_match(match)
+                continue
+            if not match.full:
+                continue
+            match.step()
+            values = snapshot_values(match.sim)
+            for player in match.players:
+                self.transport.sendto(match.snapshot_packet(player, values), player.addr)
+        self.ticks += 1
+        self.tick_seconds += time.perf_counter() - start
+
+    async def run(self):
+        """Bucle de ticks a paso fijo; si se atrasa, no intenta recuperar ticks perdidos"""
+        loop = asyncio.get_running_loop()
+        interval = 1 / TICK_RATE
+        next_tick = loop.time()
+        while self.running:
+            self.tick()
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                self.late_ticks += 1
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+
+class NetClient(asyncio.DatagramProtocol):
+    """Cliente UDP: envía entradas, decodifica instantáneas y arma la vista a dibujar"""
+
+    def __init__(self, latency=0.0, jitter=0.0, loss=0.0, seed=0):
+        self.conditions = (latency, jitter, loss)
+        self.seed = seed
+        self.transport = None
+        self.match_id = None
+        self.side = None
+        self.seq = 0
+        self.recent_inputs = []   # [(seq, bits), ...] más nuevas al final
+        self.snapshots = {}       # tick -> valores decodificados
+        self.latest_tick = 0
+        self.latest_received_at = 0.0
+        self.ack_input = 0        # Última entrada que el servidor aplicó
+        self.closed = False
+        self.welcome = None
+        self.snapshot_bytes = 0
+        self.full_snapshot_bytes = 0  # Lo que habrían ocupado sin codificar como diferencia
+        self.snapshot_count = 0
+        self.prediction_error = 0.0  # Corrección acumulada de la paleta propia
+        self.predicted_y = None
+
+    def connection_made(self, transport):
+        latency, jitter, loss = self.conditions
+        self.transport = LinkConditioner(transport, latency, jitter, loss, self.seed)
+        self.welcome = asyncio.get_running_loop().create_future()
+        self.transport.sendto(_HEADER.pack(PACKET_HELLO, PROTOCOL_VERSION))
+
+    def datagram_received(self, data, addr):
+        if not data:
+            return
+        kind = data[0]
+        if kind == PACKET_SNAPSHOT:
+            self.receive_snapshot(data)
+        elif kind == PACKET_WELCOME and len(data) == _WELCOME.size:
+            _, self.match_id, self.side = _WELCOME.unpack(data)
+            if not self.welcome.done():
+                self.welcome.set_result(self.side)
+        elif kind == PACKET_BYE:
+            self.closed = True
+
+    def connection_lost(self, exc):
+        self.closed = True
+
+    def receive_snapshot(self, data):
+        if len(data) < _SNAPSHOT_HEADER.size:
+            return
+        _, tick, base_tick, ack_input, count = _SNAPSHOT_HEADER.unpack_from(data)
+        if tick <= self.latest_tick:
+            return  # Llegó tarde o repetida
+        base = self.snapshots.get(base_tick) if base_tick else None
+        if base_tick and base is None:
+            return  # Ya no tenemos la base: esperar la próxima
+        if not valid_delta(data, _SNAPSHOT_HEADER.size, count, base):
+            return
+        values = decode_delta(data, _SNAPSHOT_HEADER.size, count, base)
+
+        self.snapshot_bytes += len(data)
+        self.full_snapshot_bytes += _SNAPSHOT_HEADER.size + (count + 7) // 8 + 2 * count
+        self.snapshot_count += 1
+        self.snapshots[tick] = values
+        for old in [t for t in self.snapshots if t < tick - SNAPSHOT_HISTORY]:
+            del self.snapshots[old]
+        self.latest_tick = tick
+        self.latest_received_at = time.perf_counter()
+        self.ack_input = ack_input
+        self.recent_inputs = [entry for entry in self.recent_inputs if entry[0] > ack_input]
+
+        # Cuánto se corrigió la predicción de la paleta propia
+        if self.predicted_y is not None:
+            self.prediction_error += abs(self.predict_own_paddle() - self.predicted_y)
+
+    async def connect(self, timeout=5.0):
+        """Espera a que el servidor asigne lado (reintenta el saludo)"""
+        deadline = time.monotonic() + timeout
+        while not self.welcome.done():
+            if time.monotonic() > deadline:
+                raise TimeoutError("El servidor no respondió")
+            try:
+                await asyncio.wait_for(asyncio.shield(self.welcome), 0.25)
+            except asyncio.TimeoutError:
+                self.transport.sendto(_HEADER.pack(PACKET_HELLO, PROTOCOL_VERSION))
+        return self.welcome.result()
+
+    def send_input(self, bits):
+        """Envía la entrada de este tick junto con las anteriores aún no confirmadas.
+
+        Se reenvían todas desde la más vieja, así ninguna (ni una pausa o un
+        reinicio) se pierde aunque la ida y vuelta dure muchos ticks; si no
+        entran en un paquete, el servidor igual las aplica en orden y las más
+        nuevas salen en los siguientes.
+        """
+        self.seq += 1
+        self.recent_inputs.append((self.seq, bits))
+        entries = self.recent_inputs[:MAX_PACKET_INPUTS]
+        packet = bytearray(_INPUT_HEADER.pack(PACKET_INPUT, self.latest_tick, len(entries)))
+        for seq, entry_bits in entries:
+            packet += _INPUT_ENTRY.pack(seq, entry_bits)
+        self.transport.sendto(bytes(packet))
+        self.predicted_y = self.predict_own_paddle()
+
+    def predict_own_paddle(self):
+        """Paleta propia: la del servidor más las entradas que aún no aplicó"""
+        values = self.snapshots.get(self.latest_tick)
+        if values is None:
+            return None
+        field = FIELD_LEFT_Y if self.side == SIDE_LEFT else FIELD_RIGHT_Y
+        y = dequantize(values[field])
+        if GAME_STATES[values[FIELD_STATE]] != "playing" or values[FIELD_POWERUPS] & (1 << self.frozen_bit()):
+            return y
+        for _, bits in self.recent_inputs:
+            y = move_paddle_y(y, bits, PADDLE_SPEED, PADDLE_HEIGHT, FIELD_HEIGHT)
+        return y
+
+    def frozen_bit(self):
+        return POWERUP_NAMES.index('freeze_player' if self.side == SIDE_LEFT else 'freeze_cpu')
+
+    def view(self):
+        """Estado a dibujar: interpolado INTERPOLATION_TICKS atrás, con la paleta propia predicha"""
+        if not self.latest_tick:
+            return None
+        elapsed_ticks = (time.perf_counter() - self.latest_received_at) * TICK_RATE
+        target = self.latest_tick + min(elapsed_ticks, 1.0) - INTERPOLATION_TICKS
+
+        older = max((t for t in self.snapshots if t <= target), default=None)
+        newer = min((t for t in self.snapshots if t > target), default=None)
+        if older is None:
+            older = newer = min(self.snapshots)
+        if newer is None:
+            newer = older
+        a = self.snapshots[older]
+        b = self.snapshots[newer]
+        alpha = 0.0 if newer == older else (target - older) / (newer - older)
+
+        def lerp(i):
+            return dequantize(a[i] + (b[i] - a[i]) * alpha)
+
+        # Los valores discretos salen de la instantánea más nueva de las dos
+        view = {
+            'game_state': GAME_STATES[b[FIELD_STATE]],
+            'player_score': b[FIELD_PLAYER_SCORE],
+            'cpu_score': b[FIELD_CPU_SCORE],
+            'left_y': lerp(FIELD_LEFT_Y),
+            'right_y': lerp(FIELD_RIGHT_Y),
+            'powerups': [name for bit, name in enumerate(POWERUP_NAMES) if b[FIELD_POWERUPS] & (1 << bit)],
+        }
+        count = b[FIELD_BALLS]
+        if a[FIELD_BALLS] == count:
+            view['balls'] = [(lerp(HEADER_FIELDS + 2 * i), lerp(HEADER_FIELDS + 2 * i + 1)) for i in range(count)]
+        else:
+            view['balls'] = [(dequantize(b[HEADER_FIELDS + 2 * i]), dequantize(b[HEADER_FIELDS + 2 * i + 1]))
+                             for i in range(count)]
+
+        own = self.predict_own_paddle()
+        view['left_y' if self.side == SIDE_LEFT else 'right_y'] = own
+        return view
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.sendto(bytes((PACKET_BYE,)))
+            self.transport.close()
+
+
+def apply_view(sim, view):
+    """Copia la vista de red en una PongSimulation local para que PongGame la dibuje"""
+    sim.game_state = view['game_state']
+    sim.player_score = view['player_score']
+    sim.cpu_score = view['cpu_score']
+    sim.player.y = round(view['left_y'])
+    sim.cpu.y = round(view['right_y'])
+    for name in POWERUP_NAMES:
+        if name in view['powerups']:
+            if name not in sim.scheduler:
+                sim.scheduler.schedule(name, float('inf'))
+        else:
+            sim.scheduler.cancel(name)
+
+    balls = sim.balls
+    positions = view['balls']
+    if balls.count() != len(positions):
+        balls.kill_extras()
+        for x, y in positions[1:]:
+            balls.spawn(x, y, 0, 0, sim.ball_radius)
+    for index, (x, y) in zip(balls.indices().tolist(), positions):
+        balls.x[index] = x
+        balls.y[index] = y
+    balls.record_trails()
+
+
+async def play_window(address, latency=0.0, jitter=0.0, loss=0.0):
+    """Cliente con ventana: teclado para la paleta propia y PongGame para dibujar"""
+    import pygame
+    from pong_game import PongGame
+
+    loop = asyncio.get_running_loop()
+    host, port = address
+    _, client = await loop.create_datagram_endpoint(
+        lambda: NetClient(latency, jitter, loss), remote_addr=(host, port))
+    side = await client.connect()
+
+    game = PongGame()
+    game.replay_dir = None
+    game.sim.versus = True
+    game.sim.game_state = "waiting"
+    pygame.display.set_caption(f"Pong Arcade - Versus ({'izquierda' if side == SIDE_LEFT else 'derecha'})")
+
+    tick_time = 1 / TICK_RATE
+    try:
+        while not client.closed:
+            start = time.perf_counter()
+            if not game.handle_events():
+                break
+            action = game.pending_commands | game.read_player_input()
+            game.pending_commands = INPUT_NONE
+            game.selected_difficulty = 0
+            client.send_input(action)
+
+            view = client.view()
+            if view is not None:
+                apply_view(game.sim, view)
+            game.render()
+            game.present()
+            await asyncio.sleep(max(0.0, tick_time - (time.perf_counter() - start)))
+    finally:
+        client.close()
+        pygame.quit()
+
+
+def track_view_policy(client):
+    """Bot de prueba: sigue la pelota principal con su paleta (según su vista predicha)"""
+    view = client.view()
+    if view is None:
+        return INPUT_NONE
+    if view['game_state'] in ("waiting", "paused"):
+        return INPUT_PAUSE if client.seq % 30 == 0 else INPUT_NONE
+    if view['game_state'] == "game_over":
+        return INPUT_RESET if client.seq % 30 == 0 else INPUT_NONE
+    if not view['balls']:
+        return INPUT_NONE
+    own_y = view['left_y'] if client.side == SIDE_LEFT else view['right_y']
+    center = own_y + PADDLE_HEIGHT / 2
+    ball_y = view['balls'][0][1]
+    if ball_y < center - 10:
+        return INPUT_UP
+    if ball_y > center + 10:
+        return INPUT_DOWN
+    return INPUT_NONE
+
+
+async def run_bot(client, stop_at):
+    await client.connect()
+    interval = 1 / TICK_RATE
+    next_send = time.perf_counter()
+    while time.perf_counter() < stop_at and not client.closed:
+        client.send_input(track_view_policy(client))
+        next_send += interval
+        await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+
+
+async def loopback_test(matches, seconds, latency=0.0, jitter=0.0, loss=0.0, seed=0):
+    """Servidor y 2*matches bots en este proceso, comunicados por 127.0.0.1"""
+    loop = asyncio.get_running_loop()
+    server_transport, server = await loop.create_datagram_endpoint(
+        lambda: MatchServer(latency, jitter, loss, seed), local_addr=('127.0.0.1', 0))
+    port = server_transport.get_extra_info('sockname')[1]
+    server_task = asyncio.create_task(server.run())
+
+    clients = []
+    for i in range(matches * 2):
+        _, client = await loop.create_datagram_endpoint(
+            lambda i=i: NetClient(latency, jitter, loss, seed + i + 1), remote_addr=('127.0.0.1', port))
+        clients.append(client)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_bot(client, start + seconds) for client in clients))
+    elapsed = time.perf_counter() - start
+
+    server.running = False
+    await server_task
+    report = {
+        'matches': len(server.matches),
+        'seconds': elapsed,
+        'server_ticks_per_second': server.ticks / elapsed,
+        'server_tick_ms': server.tick_seconds / max(1, server.ticks) * 1000,
+        'late_ticks': server.late_ticks,
+        'snapshot_bytes_mean': sum(c.snapshot_bytes for c in clients) / max(1, sum(c.snapshot_count for c in clients)),
+        'full_snapshot_bytes_mean':
+            sum(c.full_snapshot_bytes for c in clients) / max(1, sum(c.snapshot_count for c in clients)),
+        'snapshots_per_client_per_second': sum(c.snapshot_count for c in clients) / len(clients) / elapsed,
+        'sent_packets': server.transport.sent + sum(c.transport.sent for c in clients),
+        'dropped_packets': server.transport.dropped + sum(c.transport.dropped for c in clients),
+        'prediction_correction_px_per_snapshot':
+            sum(c.prediction_error for c in clients) / max(1, sum(c.snapshot_count for c in clients)),
+    }
+    for client in clients:
+        client.close()
+    server_transport.close()
+    return report
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(':')
+    return (host or '127.0.0.1', int(port))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pong Arcade versus en red")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    server_parser = commands.add_parser('servidor', help="servidor autoritativo")
+    server_parser.add_argument('--host', default='0.0.0.0')
+    server_parser.add_argument('--puerto', type=int, default=DEFAULT_PORT)
+
+    client_parser = commands.add_parser('cliente', help="jugar contra otro cliente")
+    client_parser.add_argument('address', metavar='HOST:PUERTO')
+
+    test_parser = commands.add_parser('prueba', help="servidor y bots por loopback con red simulada")
+    test_parser.add_argument('--partidas', type=int, default=10)
+    test_parser.add_argument('--segundos', type=float, default=5.0)
+    test_parser.add_argument('--seed', type=int, default=0)
+
+    for sub in (client_parser, test_parser):
+        sub.add_argument('--latencia', type=float, default=0.0, help="segundos agregados a cada envío")
+        sub.add_argument('--variacion', type=float, default=0.0, help="variación aleatoria de la latencia")
+        sub.add_argument('--perdida', type=float, default=0.0, help="probabilidad de perder cada paquete")
+    args = parser.parse_args(argv)
+
+    if args.command == 'servidor':
+        async def serve():
+            loop = asyncio.get_running_loop()
+            _, server = await loop.create_datagram_endpoint(
+                MatchServer, local_addr=(args.host, args.puerto))
+            print(f"Servidor escuchando en {args.host}:{args.puerto}")
+            await server.run()
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == 'cliente':
+        asyncio.run(play_window(parse_address(args.address), args.latencia, args.variacion, args.perdida))
+        return 0
+
+    report = asyncio.run(loopback_test(args.partidas, args.segundos, args.latencia,
+                                       args.variacion, args.perdida, args.seed))
+    for key, value in report.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+class Paddle:
+    """Paleta con atributos fijos (__slots__) en lugar de un dict con claves de texto.
+
+    La caja de colisión (x, y, ancho, alto, dirección) y el pygame.Rect del
+    dibujo se guardan y solo se actualizan cuando la paleta se movió desde la
+    última consulta, así que en los frames quietos no se crea ningún objeto.
+    direction es +1 para la paleta izquierda (rebota hacia la derecha) y -1
+    para la derecha. Las pelotas no tienen clase propia: viven en BallPool.
+    """
+
+    __slots__ = ('x', 'y', 'width', 'height', 'speed', 'direction',
+                 'reaction_delay', 'prediction', '_box', '_rect')
+
+    def __init__(self, x, y, width, height, speed, direction, reaction_delay=0, prediction=0):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.direction = direction
+        # Solo la CPU: distancia de reacción (en unidades de 15 px) y cuánto anticipa la pelota
+        self.reaction_delay = reaction_delay
+        self.prediction = prediction
+        self._box = None
+        self._rect = None
+
+    @property
+    def center(self):
+        return self.y + self.height // 2
+
+    @property
+    def box(self):
+        """(x, y, ancho, alto, dirección) para BallPool.advance"""
+        box = self._box
+        if box is None or box[1] != self.y:
+            box = self._box = (self.x, self.y, self.width, self.height, self.direction)
+        return box
+
+    def rect_at(self, y):
+        """pygame.Rect de la paleta a la altura y (la interpolada al dibujar), movido en el lugar"""
+        rect = self._rect
+        if rect is None:
+            # pygame solo hace falta si se dibuja: la simulación corre sin él
+            import pygame
+            rect = self._rect = pygame.Rect(self.x, y, self.width, self.height)
+        elif rect.y != y:
+            rect.y = y
+        return rect
+
+    @property
+    def rect(self):
+        return self.rect_at(self.y)
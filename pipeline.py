@@ -0,0 +1,242 @@
+"""Bucle en paralelo: la simulación corre en su propio hilo y el dibujo en el principal.
+
+El hilo de simulación avanza a paso fijo y, después de cada tanda de ticks,
+captura el estado en la instantánea de atrás (ver snapshot.py) y la
+intercambia con la de adelante. El hilo principal lee eventos y teclado,
+restaura la instantánea de adelante en view_sim (una simulación que nunca
+avanza, solo se dibuja) y dibuja mientras el tick siguiente ya se simula.
+Así dibujar el frame N y simular el N+1 se solapan, y el dibujo nunca ve un
+estado a medio actualizar.
+
+Los dos hilos comparten el GIL: la ganancia depende de cuánto tiempo pasan
+SDL y NumPy sin él y de que haya más de un núcleo.
+
+Uso:
+    python pipeline.py                        # compara bucle serie contra paralelo
+    python pipeline.py --segundos 5 --fps 0 --escenario multi_ball
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pygame
+
+from replay import create_simulation, simulation_config
+from simulation import INPUT_NONE
+from snapshot import SimSnapshot
+
+# Evento que despierta al hilo principal si duerme en reposo y llega un tick nuevo fuera de la partida
+TICK_PUBLISHED = pygame.event.custom_type()
+
+
+class PipelinedLoop:
+    """Corre un PongGame con la simulación y el dibujo en hilos separados.
+
+    input_lock protege lo que comparten eventos y ticks (comandos pendientes y
+    teclas mantenidas); swap_lock protege el intercambio de instantáneas.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        sim = game.sim
+        self.view_sim = create_simulation(sim.seed, simulation_config(sim))
+        self.view_sim.trail_length = sim.trail_length
+
+        # Doble buffer: la simulación escribe en back y publica intercambiando con front
+        self.front = SimSnapshot(sim.balls.capacity, sim.trail_length).capture(sim)
+        self.back = SimSnapshot(sim.balls.capacity, sim.trail_length)
+        self.published = 0          # Instantáneas publicadas
+        self.published_at = time.perf_counter()
+        self.shown = 0              # Última instantánea restaurada en view_sim
+        self.arrived_at = self.published_at
+
+        self.input_lock = threading.Lock()
+        self.swap_lock = threading.Lock()
+        self.wake = threading.Event()  # El hilo de simulación duerme en él mientras no hay nada que simular
+        self.stopping = False
+        self.error = None
+        self.thread = threading.Thread(target=self.simulate, name="simulación", daemon=True)
+
+    def needs_ticks(self):
+        """True si el próximo tick puede cambiar algo (como can_idle, pero del lado de la simulación)"""
+        game = self.game
+        return (not game.idle_enabled or game.sim.game_state == "playing" or game.rewinding
+                or game.rewind_held or game.pending_commands != INPUT_NONE)
+
+    def simulate(self):
+        """Hilo de simulación: ticks a paso fijo y publicación del estado"""
+        try:
+            self.simulate_ticks()
+        except BaseException as exc:
+            self.error = exc
+
+    def simulate_ticks(self):
+        game = self.game
+        tick_time = 1.0 / game.TICK_RATE
+        accumulator = 0.0
+        previous_time = time.perf_counter()
+        while not self.stopping:
+            if not self.needs_ticks():
+                self.wake.wait(game.IDLE_TIMEOUT_MS / 1000)
+                self.wake.clear()
+                # El tiempo dormido no se simula: al despertar corre un solo tick
+                accumulator = 0.0
+                previous_time = time.perf_counter() - tick_time
+                continue
+
+            now = time.perf_counter()
+            accumulator += min(now - previous_time, game.MAX_FRAME_TIME)
+            previous_time = now
+            if accumulator < tick_time:
+                time.sleep(tick_time - accumulator)
+                continue
+
+            with self.input_lock:
+                while accumulator >= tick_time:
+                    game.update()
+                    accumulator -= tick_time
+            self.publish()
+
+    def publish(self):
+        """Captura el estado en back y lo intercambia con front"""
+        self.back.capture(self.game.sim)
+        with self.swap_lock:
+            self.front, self.back = self.back, self.front
+            self.published += 1
+            self.published_at = time.perf_counter()
+        if self.game.idle_enabled and self.back.game_state != "playing":
+            pygame.event.post(pygame.event.Event(TICK_PUBLISHED))
+
+    def receive(self):
+        """Restaura en view_sim la última instantánea publicada, si hay una nueva"""
+        game = self.game
+        with self.swap_lock:
+            if self.published == self.shown:
+                return
+            game.save_previous_state()
+            self.front.restore(self.view_sim)
+            self.shown = self.published
+            self.arrived_at = game.shown_tick_time = self.published_at
+        if self.view_sim.game_state != "playing":
+            game.full_redraw = True
+
+    def can_idle(self):
+        with self.swap_lock:
+            current = self.published == self.shown
+        return current and self.game.can_idle()
+
+    def run(self):
+        """Bucle del hilo principal: eventos, dibujo y envío a pantalla hasta cerrar la ventana"""
+        game = self.game
+        profiler = game.profiler
+        tick_time = 1.0 / game.TICK_RATE
+        first_frame = True
+        game.quality.budget_ms = 1000 / (game.FPS or game.TICK_RATE)
+
+        self.front.restore(self.view_sim)
+        game.view_sim = self.view_sim
+        game.full_redraw = True
+        self.thread.start()
+        try:
+            running = True
+            while running:
+                if self.error is not None:
+                    raise self.error
+                profiler.begin_frame()
+
+                with self.input_lock:
+                    running = game.handle_events()
+                    game.sample_keys()
+                    if game.pending_commands != INPUT_NONE or game.rewind_held:
+                        self.wake.set()
+                profiler.mark('events')
+
+                self.receive()
+                profiler.mark('update')
+
+                playing = self.view_sim.game_state == "playing"
+                game.render_alpha = min(1.0, (time.perf_counter() - self.arrived_at) / tick_time) if playing else 1.0
+                game.render()
+                profiler.mark('render')
+
+                game.present()
+                game.record_latency()
+                profiler.mark('present')
+
+                if first_frame:
+                    first_frame = False
+                    game.finish_first_frame()
+
+                idle_frame = game.dirty_rects == [] and not playing
+                if self.can_idle():
+                    game.wait_for_event()
+                else:
+                    game.clock.tick(game.FPS)
+                game.end_frame(idle_frame)
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Detiene el hilo de simulación y vuelve a dibujar directamente game.sim"""
+        self.stopping = True
+        self.wake.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.game.view_sim = None
+
+
+def measure(pipelined, scenario, seconds, fps, seed):
+    """Corre el bucle durante seconds en el escenario; devuelve frames/s, ticks/s y latencias en ms"""
+    from benchmark import build_game, LONG_DURATION
+
+    game = build_game(scenario, seed)
+    game.sim.max_score = LONG_DURATION  # La partida no termina durante la medición
+    game.FPS = fps
+    game.latency_samples = []
+    game.profiler.keep_history()
+    start_tick = game.recorder.tick
+
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), 1)
+    start = time.perf_counter()
+    if pipelined:
+        PipelinedLoop(game).run()
+    else:
+        game.run_serial()
+    elapsed = time.perf_counter() - start
+
+    latency = np.array(game.latency_samples) * 1000
+    return {
+        'frames_per_second': len(latency) / elapsed,
+        'ticks_per_second': (game.recorder.tick - start_tick) / elapsed,
+        'latency_mean_ms': float(latency.mean()),
+        'latency_p95_ms': float(np.percentile(latency, 95)),
+    }
+
+
+def main(argv=None):
+    from benchmark import SCENARIOS
+
+    parser = argparse.ArgumentParser(description="Compara el bucle en serie con el bucle en paralelo")
+    parser.add_argument('--escenario', default='all_powerups', choices=[name for name in SCENARIOS if name != 'menu'])
+    parser.add_argument('--segundos', type=float, default=3.0, help="duración de cada medición")
+    parser.add_argument('--fps', type=int, default=60, help="límite de frames por segundo (0 = sin límite)")
+    parser.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    limit = f"límite de {args.fps} FPS" if args.fps else "sin límite de FPS"
+    print(f"Escenario {args.escenario}, {args.segundos:g} s por bucle, {limit}, {os.cpu_count()} núcleos")
+    print(f"{'bucle':<10}{'frames/s':>10}{'ticks/s':>10}{'latencia media':>16}{'latencia p95':>14}")
+    for name, pipelined in (('serie', False), ('paralelo', True)):
+        result = measure(pipelined, args.escenario, args.segundos, args.fps, args.semilla)
+        print(f"{name:<10}{result['frames_per_second']:>10.1f}{result['ticks_per_second']:>10.1f}"
+              f"{result['latency_mean_ms']:>13.2f} ms{result['latency_p95_ms']:>11.2f} ms")
+    print("Latencia: desde que termina el tick mostrado hasta que el frame se envía a pantalla")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,37 @@
+import time
+
+# Inicio del arranque, antes de importar pygame y numpy (desglose de --tiempos-inicio)
+IMPORT_START = time.perf_counter()
+
 import pygame
+import argparse
 import sys
 import os
-import math
-import random
 
-# Inicializar Pygame
-pygame.init()
+import numpy as np
+
+from render_cache import SpriteCache, TextCache
+from profiler import FrameProfiler, StartupTimer, IdleMeter
+from quality import QualityGovernor, TIER_NAMES
+from ball_pool import MAIN_BALL
+from replay import ReplayRecorder
+from snapshot import SnapshotRing
+from pipeline import PipelinedLoop
+from capture import FrameCapture
+from audio import AudioEngine
+from simulation import (PongSimulation, INPUT_NONE, INPUT_UP, INPUT_DOWN, INPUT_PAUSE,
+                        INPUT_RESET, select_difficulty_input)
+
+def init_pygame(fast=False):
+    """Inicializa video (con eventos) y fuentes; en modo rápido el joystick queda para después.
+
+    El mezclador nunca se inicia acá (pygame.init() abriría el dispositivo de
+    audio antes del primer frame): lo abre AudioEngine.start() con el menú ya visible.
+    """
+    pygame.display.init()
+    pygame.font.init()
+    if not fast:
+        pygame.joystick.init()
 
 # Configuración de colores (RGB)
 class Colors:
@@ -19,202 +45,220 @@ class Colors:
     GREEN = (50, 205, 50)
     ORANGE = (255, 165, 0)
 
+# Color de cada power-up colocado en el campo
+POWERUP_COLORS = {
+    'freeze_player': Colors.CYAN,
+    'freeze_cpu': Colors.RED,
+    'multi_ball': Colors.ORANGE,
+}
+
+# Sin consola (ejecutable empaquetado con ventana) el desglose de --tiempos-inicio va a este archivo
+STARTUP_REPORT_FILE = 'tiempos-inicio.txt'
+
 class PongGame:
-    def __init__(self):
-        # Configuración de pantalla
-        self.SCREEN_WIDTH = 800
-        self.SCREEN_HEIGHT = 400
-        self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
+    """Frontend de pygame: ventana, teclado y dibujo sobre una PongSimulation"""
+    
+    def __init__(self, seed=None, fast_start=False, startup=None):
+        # Desglose del tiempo de arranque hasta el primer frame
+        self.startup = startup or StartupTimer()
+        
+        # Modo de inicio rápido: el joystick se inicia después del primer frame
+        self.fast_start = fast_start
+        self.deferred_init = fast_start
+        init_pygame(fast_start)
+        self.startup.mark("inicializar pygame")
+        
+        # Simulación sin ventana que contiene todo el estado del juego
+        self.sim = PongSimulation(seed)
+        
+        # Configuración de pantalla. El diseño usa coordenadas lógicas (las del campo); se dibuja
+        # en un lienzo de resolución interna (lógica * render_scale) que present() escala a la
+        # ventana. Con escala 1 y ventana del tamaño lógico el lienzo es la propia pantalla.
+        self.LOGICAL_WIDTH = self.sim.FIELD_WIDTH
+        self.LOGICAL_HEIGHT = self.sim.FIELD_HEIGHT
+        self.base_render_scale = 1.0  # Escala interna pedida; el nivel de calidad puede reducirla
+        self.render_scale = 1.0
+        self.smooth_scaling = False   # smoothscale en lugar de escalado por vecino más cercano
+        self.display = pygame.display.set_mode((self.LOGICAL_WIDTH, self.LOGICAL_HEIGHT))
+        self.canvas = self.display
+        self.screen = self.canvas     # Donde se dibuja (el perfilador puede envolverla)
+        self.SCREEN_WIDTH, self.SCREEN_HEIGHT = self.canvas.get_size()  # Tamaño del lienzo en píxeles
+        self.output_rect = self.display.get_rect()  # Zona de la ventana donde se muestra el lienzo
+        self.integer_scale = 1        # Factor entero lienzo -> ventana (None si no es entero)
         pygame.display.set_caption("Pong Arcade - Pong Kenny")
+        self.startup.mark("abrir ventana")
         
         # Reloj para controlar FPS
         self.clock = pygame.time.Clock()
-        self.FPS = 60
+        self.FPS = 60  # Límite de frames dibujados (0 = sin límite; 120, 144, 240...)
         
-        # Configuración de fuentes - Compatible con PyInstaller
-        try:
-            # Determinar la ruta base (funciona tanto en desarrollo como en ejecutable)
-            if hasattr(sys, '_MEIPASS'):
-                # Ruta cuando está empaquetado con PyInstaller
-                base_path = sys._MEIPASS
-            else:
-                # Ruta cuando se ejecuta como script normal
-                base_path = os.path.dirname(os.path.abspath(__file__))
-            
-            # Intentar cargar una fuente personalizada (opcional)
-            font_path = os.path.join(base_path, 'assets', 'font.ttf')
-            if os.path.exists(font_path):
-                self.font_large = pygame.font.Font(font_path, 36)
-                self.font_medium = pygame.font.Font(font_path, 24)
-                self.font_small = pygame.font.Font(font_path, 18)
-            else:
-                # Usar fuente por defecto del sistema
-                self.font_large = pygame.font.Font(None, 36)
-                self.font_medium = pygame.font.Font(None, 24)
-                self.font_small = pygame.font.Font(None, 18)
-        except Exception:
-            # Si hay algún error, usar fuente por defecto
-            self.font_large = pygame.font.Font(None, 36)
-            self.font_medium = pygame.font.Font(None, 24)
-            self.font_small = pygame.font.Font(None, 18)
+        # Paso fijo de la simulación: la jugabilidad no depende de los FPS de dibujo
+        self.TICK_RATE = 60
+        self.MAX_FRAME_TIME = 0.25  # Evita la espiral de ticks tras una pausa larga
+        self.MAX_INTERPOLATION_JUMP = 50  # Saltos mayores (saque, pelotas nuevas) no se interpolan
+        self.render_alpha = 1.0  # Fracción entre el tick anterior y el actual
+        self.prev_ball_x = None
+        self.prev_ball_y = None
+        self.prev_player_y = None
+        self.prev_cpu_y = None
         
-        # Estado del juego
-        self.game_state = "difficulty_menu"  # difficulty_menu, waiting, playing, paused, game_over
-        self.player_score = 0
-        self.cpu_score = 0
-        self.max_score = 5
+        # Fuentes: se cargan la primera vez que se usan (ver load_font)
+        self.font_path = None
+        self.fonts = {}
         
-        # Dificultad
-        self.difficulty = None  # 'easy', 'medium', 'hard'
+        # Menú de dificultad
         self.selected_difficulty = 0  # 0: Fácil, 1: Medio, 2: Difícil
         
-        # Controles
-        self.keys = pygame.key.get_pressed()
-        
-        # Inicializar objetos del juego
-        self.init_game_objects()
-        
-        # Sonidos (placeholder)
-        self.sounds = {
-            'paddle': None,
-            'wall': None,
-            'score': None
-        }
-        
-        # Power-ups
-        self.powerups = []
-        self.powerup_spawn_timer = 0
-        self.powerup_spawn_interval = 600  # MODIFICAR AQUÍ: Cada cuántos frames aparece un power-up (600 = 10 segundos a 60 FPS)
-        
-        # Estados de power-ups activos
-        self.player_frozen = False
-        self.player_frozen_timer = 0
-        self.player_frozen_duration = 180  # MODIFICAR AQUÍ: Duración del congelamiento en frames (180 = 3 segundos a 60 FPS)
-        
-        self.cpu_frozen = False
-        self.cpu_frozen_timer = 0
-        self.cpu_frozen_duration = 180  # MODIFICAR AQUÍ: Duración del congelamiento en frames (180 = 3 segundos a 60 FPS)
-        
-        self.multi_ball_active = False
-        self.multi_ball_timer = 0
-        self.multi_ball_duration = 600  # MODIFICAR AQUÍ: Duración de pelotas múltiples en frames (600 = 10 segundos a 60 FPS)
-        self.extra_balls = []  # Lista de pelotas adicionales
-        self.multi_ball_count = 2  # MODIFICAR AQUÍ: Número de pelotas adicionales (2 o 3)
-        
-    def set_difficulty(self, difficulty):
-        """Configura la dificultad del juego"""
-        self.difficulty = difficulty
-        
-        if difficulty == 'easy':
-            self.cpu['speed'] = 6
-            self.cpu['reaction_delay'] = 10
-            self.cpu['prediction'] = 1
-        elif difficulty == 'medium':
-            self.cpu['speed'] = 9
-            self.cpu['reaction_delay'] = 5
-            self.cpu['prediction'] = 2
-        elif difficulty == 'hard':
-            self.cpu['speed'] = 12
-            self.cpu['reaction_delay'] = 1
-            self.cpu['prediction'] = 4
-        
-    def init_game_objects(self):
-        # Paleta del jugador
-        self.player = {
-            'x': 20,
-            'y': self.SCREEN_HEIGHT // 2 - 50,
-            'width': 10,
-            'height': 100,
-            'speed': 5,
-            'color': Colors.CYAN
-        }
-        
-        # Paleta de la CPU
-        self.cpu = {
-            'x': self.SCREEN_WIDTH - 30,
-            'y': self.SCREEN_HEIGHT // 2 - 50,
-            'width': 10,
-            'height': 100,
-            'speed': 3,
-            'color': Colors.RED,
-            'reaction_delay': 10,
-            'prediction': 0.5
-        }
-        
-        # Pelota
-        self.ball = {
-            'x': self.SCREEN_WIDTH // 2,
-            'y': self.SCREEN_HEIGHT // 2,
-            'radius': 8,
-            'speed_x': 5,
-            'speed_y': 4,
-            'color': Colors.WHITE,
-            'trail': [],
-            'max_speed': 12
-        }
-        
-        self.reset_ball()
-        
-    def reset_ball(self):
-        self.ball['x'] = self.SCREEN_WIDTH // 2
-        self.ball['y'] = self.SCREEN_HEIGHT // 2
-        self.ball['speed_x'] = random.choice([5, -5])
-        self.ball['speed_y'] = random.uniform(-4, 4)
-        self.ball['trail'] = []
-    
-    def spawn_powerup(self):
-        """Activa un power-up aleatorio automáticamente"""
-        powerup_types = ['freeze_player', 'freeze_cpu', 'multi_ball']
-        
-        # Seleccionar y activar un power-up aleatorio
-        selected_powerup = random.choice(powerup_types)
-        self.activate_powerup(selected_powerup)
-    
-    def activate_powerup(self, powerup_type):
-        """Activa un power-up específico"""
-        if powerup_type == 'freeze_player':
-            self.player_frozen = True
-            self.player_frozen_timer = self.player_frozen_duration
-        elif powerup_type == 'freeze_cpu':
-            self.cpu_frozen = True
-            self.cpu_frozen_timer = self.cpu_frozen_duration
-        elif powerup_type == 'multi_ball':
-            if not self.multi_ball_active:
-                self.multi_ball_active = True
-                self.multi_ball_timer = self.multi_ball_duration
-                # Crear pelotas adicionales
-                self.extra_balls = []
-                for i in range(self.multi_ball_count):
-                    new_ball = self.ball.copy()
-                    new_ball['speed_x'] = random.choice([5, -5]) * random.uniform(0.8, 1.2)
-                    new_ball['speed_y'] = random.uniform(-5, 5)
-                    new_ball['trail'] = []
-                    self.extra_balls.append(new_ball)
-    
-    def check_powerup_collision(self):
-        """Verifica si la pelota toca un power-up"""
-        for powerup in self.powerups[:]:
-            distance = math.sqrt((self.ball['x'] - powerup['x'])**2 + (self.ball['y'] - powerup['y'])**2)
-            if distance < self.ball['radius'] + powerup['radius']:
-                self.activate_powerup(powerup['type'])
-                self.powerups.remove(powerup)
+        # Comandos del teclado (pausa, reinicio, dificultad) pendientes para el próximo tick
+        self.pending_commands = INPUT_NONE
+        
+        # Grabación de replays siempre activa (semilla + entradas por tick)
+        self.recorder = ReplayRecorder(self.sim)
+        self.replay_dir = 'replays'  # None = no guardar el replay al salir
+        
+        # Rebobinado: instantáneas de los últimos segundos, una por tick grabado
+        self.REWIND_SECONDS = 3
+        # Sin estelas: con --caos y --estela largas ocuparían cientos de MB; se rearman al rebobinar
+        self.rewind_buffer = SnapshotRing(self.REWIND_SECONDS * self.TICK_RATE, trails=False)
+        self.rewind_buffer.save(self.recorder.tick, self.sim)
+        self.rewinding = False  # Retrocediendo en este tick (BACKSPACE)
+        
+        # Efectos de sonido: se renderizan tras el primer frame y suenan según lo que pasó en cada tick
+        self.audio = AudioEngine()
+        self.audio_report = False  # Imprimir los disparos y la latencia medida al salir
+        
+        # Capas estáticas y rectángulos sucios del renderizador
+        self.gradient_layer = None   # Gradiente de fondo (solo cambia con el tamaño)
+        self.static_layer = None     # Gradiente + elementos fijos del estado actual
+        self.static_layer_key = None
+        self.full_redraw = True      # Forzar redibujado y flip completos
+        self.prev_dirty_rects = []   # Regiones dinámicas del frame anterior
+        self.prev_hud_rects = []     # Regiones del HUD del frame anterior
+        self.hud_key = None
+        self.rendered_state = None
+        self.dirty_rects = None      # None = actualizar pantalla completa
+        self.max_dirty_rects = 64    # Por encima de esto se hace un flip completo
+        
+        # Sprites de resplandor y estela pre-renderizados
+        self.sprite_cache = SpriteCache(max_entries=256)
+        
+        # Textos y paneles renderizados (evita font.render en cada frame)
+        self.text_cache = TextCache(max_entries=128)
         
+        # Perfilador de frames (F3 muestra el overlay de rendimiento)
+        self.profiler = FrameProfiler()
+        self.profiler.watch_cache("sprites", self.sprite_cache)
+        self.profiler.watch_cache("textos", self.text_cache)
+        self.profile_path = None  # Archivo .json o .csv donde exportar al salir
+        # Calidad gráfica: automática según el tiempo de frame, o fija con pin_quality
+        self.quality = QualityGovernor()
+        self.profiler.labels['calidad'] = self.quality.settings['name']
+        
+        self.startup_report = False  # Imprimir el desglose del arranque tras el primer frame
+        
+        # Teclas mantenidas (flechas y rebobinado), leídas una vez por frame en sample_keys
+        self.held_input = INPUT_NONE
+        self.rewind_held = False
+        
+        # Modo en paralelo (pipeline.py): la simulación corre en otro hilo y se dibuja view_sim,
+        # una copia restaurada de la última instantánea publicada. None = se dibuja self.sim
+        self.view_sim = None
+        self.pipelined = False
+        self.shown_tick_time = time.perf_counter()  # Cuándo terminó el último tick que se dibuja
+        self.latency_samples = None  # Lista para medir la latencia de cada frame (pipeline.py)
+        self.capture = None  # FrameCapture que graba cada frame presentado (capture.py)
+        
+        # Modo reposo: fuera de la partida, si nada cambia, el bucle duerme hasta el próximo evento
+        self.idle_enabled = True
+        self.IDLE_TIMEOUT_MS = 500  # Despierta igual cada tanto (refresco del overlay de rendimiento)
+        self.idle_meter = IdleMeter()
+        self.idle_report = False  # Imprimir el tiempo dormido y la CPU ahorrada al salir
+        self.idle_event = None    # Evento que despertó al bucle, para handle_events
+        
+        self.startup.mark("simulación y caches")
+        
+    @property
+    def scene(self):
+        """Simulación que se dibuja"""
+        return self.sim if self.view_sim is None else self.view_sim
+    
+    @property
+    def font_large(self):
+        return self.load_font(36)
+    
+    @property
+    def font_medium(self):
+        return self.load_font(24)
+    
+    @property
+    def font_small(self):
+        return self.load_font(18)
+    
+    def load_font(self, size):
+        """Fuente del tamaño lógico pedido a la escala interna, cargada solo la primera vez - Compatible con PyInstaller"""
+        size = max(1, round(size * self.render_scale))
+        font = self.fonts.get(size)
+        if font is not None:
+            return font
+        
+        start = time.perf_counter()
+        try:
+            if self.font_path is None:
+                # Determinar la ruta base (funciona tanto en desarrollo como en ejecutable)
+                if hasattr(sys, '_MEIPASS'):
+                    # Ruta cuando está empaquetado con PyInstaller
+                    base_path = sys._MEIPASS
+                else:
+                    # Ruta cuando se ejecuta como script normal
+                    base_path = os.path.dirname(os.path.abspath(__file__))
+                
+                # Intentar cargar una fuente personalizada (opcional)
+                font_path = os.path.join(base_path, 'assets', 'font.ttf')
+                self.font_path = font_path if os.path.exists(font_path) else ''
+            
+            # Sin fuente personalizada se usa la fuente por defecto del sistema
+            font = pygame.font.Font(self.font_path or None, size)
+        except Exception:
+            # Si hay algún error, usar fuente por defecto
+            font = pygame.font.Font(None, size)
+        
+        self.fonts[size] = font
+        self.startup.add("cargar fuentes", time.perf_counter() - start)
+        return font
+    
+    def finish_deferred_init(self):
+        """Inicia lo que el modo rápido dejó para después del primer frame"""
+        self.deferred_init = False
+        pygame.joystick.init()
+        self.font_medium  # Se usa recién al empezar la partida
+        self.startup.mark("subsistemas diferidos")
+    
     def handle_events(self):
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if self.idle_event is not None:
+            events.insert(0, self.idle_event)
+            self.idle_event = None
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
+            
+            # La ventana cambió de tamaño o se volvió a mostrar: reconstruir capas
+            if event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE):
+                self.invalidate_static_layers()
                 
             if event.type == pygame.KEYDOWN:
+                # Overlay de rendimiento (en cualquier estado)
+                if event.key == pygame.K_F3:
+                    self.toggle_profiler_overlay()
+                
                 # Menú de dificultad
-                if self.game_state == "difficulty_menu":
+                elif self.scene.game_state == "difficulty_menu":
                     if event.key == pygame.K_UP:
                         self.selected_difficulty = (self.selected_difficulty - 1) % 3
                     elif event.key == pygame.K_DOWN:
                         self.selected_difficulty = (self.selected_difficulty + 1) % 3
                     elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-                        difficulties = ['easy', 'medium', 'hard']
-                        self.set_difficulty(difficulties[self.selected_difficulty])
-                        self.game_state = "waiting"
+                        self.pending_commands |= select_difficulty_input(self.selected_difficulty)
                 
                 # Juego normal
                 elif event.key == pygame.K_SPACE:
@@ -223,255 +267,241 @@ class PongGame:
                     self.reset_game()
                     
         return True
+    
+    def sample_keys(self):
+        """Lee una vez por frame las teclas mantenidas que usan los ticks siguientes"""
+        self.held_input = self.read_player_input()
+        self.rewind_held = bool(pygame.key.get_pressed()[pygame.K_BACKSPACE])
+    
+    def read_player_input(self):
+        """Traduce el teclado a los bits de entrada de la simulación"""
+        keys = pygame.key.get_pressed()
+        action = INPUT_NONE
+        if keys[pygame.K_UP]:
+            action |= INPUT_UP
+        if keys[pygame.K_DOWN]:
+            action |= INPUT_DOWN
+        return action
         
     def update(self):
-        if self.game_state != "playing":
+        """Simula un tick con el teclado y los comandos pendientes, grabándolo en el replay"""
+        # Con BACKSPACE apretado el tiempo corre hacia atrás (o se detiene si no queda historia)
+        rewinding = (self.sim.game_state != "difficulty_menu" and self.pending_commands == INPUT_NONE
+                     and self.rewind_held)
+        if rewinding != self.rewinding:
+            self.rewinding = rewinding
+            self.request_redraw()
+        if rewinding:
+            self.rewind()
             return
-            
-        # Actualizar controles
-        self.keys = pygame.key.get_pressed()
-        
-        # Actualizar timers de power-ups
-        if self.player_frozen:
-            self.player_frozen_timer -= 1
-            if self.player_frozen_timer <= 0:
-                self.player_frozen = False
-        
-        if self.cpu_frozen:
-            self.cpu_frozen_timer -= 1
-            if self.cpu_frozen_timer <= 0:
-                self.cpu_frozen = False
-        
-        if self.multi_ball_active:
-            self.multi_ball_timer -= 1
-            if self.multi_ball_timer <= 0:
-                self.multi_ball_active = False
-                self.extra_balls = []
-        
-        # Spawn de power-ups automático cada 10 segundos
-        self.powerup_spawn_timer += 1
-        if self.powerup_spawn_timer >= self.powerup_spawn_interval:
-            self.spawn_powerup()
-            self.powerup_spawn_timer = 0
-        
-        # Movimiento del jugador (solo si no está congelado)
-        if not self.player_frozen:
-            if self.keys[pygame.K_UP] and self.player['y'] > 0:
-                self.player['y'] -= self.player['speed']
-            if self.keys[pygame.K_DOWN] and self.player['y'] < self.SCREEN_HEIGHT - self.player['height']:
-                self.player['y'] += self.player['speed']
-            
-        # IA de la CPU mejorada con predicción (solo si no está congelado)
-        if not self.cpu_frozen:
-            cpu_center = self.cpu['y'] + self.cpu['height'] // 2
-            
-            # Predecir posición futura de la pelota
-            if self.ball['speed_x'] > 0:  # Pelota viene hacia CPU
-                frames_to_reach = (self.cpu['x'] - self.ball['x']) / self.ball['speed_x']
-                predicted_y = self.ball['y'] + (self.ball['speed_y'] * frames_to_reach * self.cpu['prediction'])
-                
-                # Ajustar predicción por rebotes en bordes
-                while predicted_y < 0 or predicted_y > self.SCREEN_HEIGHT:
-                    if predicted_y < 0:
-                        predicted_y = abs(predicted_y)
-                    elif predicted_y > self.SCREEN_HEIGHT:
-                        predicted_y = self.SCREEN_HEIGHT - (predicted_y - self.SCREEN_HEIGHT)
-                
-                target_y = predicted_y
-            else:
-                target_y = self.SCREEN_HEIGHT // 2  # Volver al centro
-            
-            # Mover CPU hacia la posición objetivo
-            reaction_distance = self.cpu['reaction_delay'] * 15
-            if abs(self.ball['x'] - self.cpu['x']) < reaction_distance or self.ball['speed_x'] > 0:
-                tolerance = 15
-                if cpu_center < target_y - tolerance:
-                    self.cpu['y'] += self.cpu['speed']
-                elif cpu_center > target_y + tolerance:
-                    self.cpu['y'] -= self.cpu['speed']
-            
-        # Mantener CPU en pantalla
-        if self.cpu['y'] < 0:
-            self.cpu['y'] = 0
-        if self.cpu['y'] > self.SCREEN_HEIGHT - self.cpu['height']:
-            self.cpu['y'] = self.SCREEN_HEIGHT - self.cpu['height']
-            
-        # Movimiento de la pelota principal
-        self.ball['x'] += self.ball['speed_x']
-        self.ball['y'] += self.ball['speed_y']
-        
-        # Agregar trail a la pelota
-        self.ball['trail'].append((self.ball['x'], self.ball['y']))
-        if len(self.ball['trail']) > 10:
-            self.ball['trail'].pop(0)
-            
-        # Colisiones con bordes superior e inferior
-        if (self.ball['y'] - self.ball['radius'] <= 0 or 
-            self.ball['y'] + self.ball['radius'] >= self.SCREEN_HEIGHT):
-            self.ball['speed_y'] = -self.ball['speed_y']
-            
-        # Colisiones con paletas
-        self.check_paddle_collisions()
         
-        # Actualizar pelotas adicionales
-        for extra_ball in self.extra_balls[:]:
-            extra_ball['x'] += extra_ball['speed_x']
-            extra_ball['y'] += extra_ball['speed_y']
-            
-            # Trail de pelotas extras
-            extra_ball['trail'].append((extra_ball['x'], extra_ball['y']))
-            if len(extra_ball['trail']) > 10:
-                extra_ball['trail'].pop(0)
-            
-            # Colisiones con bordes
-            if (extra_ball['y'] - extra_ball['radius'] <= 0 or 
-                extra_ball['y'] + extra_ball['radius'] >= extra_ball['radius']):
-                extra_ball['speed_y'] = -extra_ball['speed_y']
-            
-            # Colisiones con paletas para pelotas extras
-            self.check_paddle_collisions_extra(extra_ball)
-            
-            # Verificar puntos con pelotas extras
-            if extra_ball['x'] < 0:
-                self.cpu_score += 1
-                self.extra_balls.remove(extra_ball)
-            elif extra_ball['x'] > self.SCREEN_WIDTH:
-                self.player_score += 1
-                self.extra_balls.remove(extra_ball)
-        
-        # Verificar puntos
-        if self.ball['x'] < 0:
-            self.cpu_score += 1
-            self.reset_ball()
-            
-        if self.ball['x'] > self.SCREEN_WIDTH:
-            self.player_score += 1
-            self.reset_ball()
-            
-        # Verificar fin de juego
-        if self.player_score >= self.max_score or self.cpu_score >= self.max_score:
-            self.game_state = "game_over"
-            
-    def check_paddle_collisions(self):
-        ball_rect = pygame.Rect(
-            self.ball['x'] - self.ball['radius'],
-            self.ball['y'] - self.ball['radius'],
-            self.ball['radius'] * 2,
-            self.ball['radius'] * 2
-        )
-        
-        player_rect = pygame.Rect(
-            self.player['x'],
-            self.player['y'],
-            self.player['width'],
-            self.player['height']
-        )
-        
-        cpu_rect = pygame.Rect(
-            self.cpu['x'],
-            self.cpu['y'],
-            self.cpu['width'],
-            self.cpu['height']
-        )
-        
-        # Colisión con paleta del jugador
-        if ball_rect.colliderect(player_rect) and self.ball['speed_x'] < 0:
-            self.ball['speed_x'] = abs(self.ball['speed_x']) * 1.05  # Acelerar ligeramente
-            
-            # Calcular ángulo basado en dónde golpeó
-            hit_pos = (self.ball['y'] - self.player['y']) / self.player['height']
-            self.ball['speed_y'] = (hit_pos - 0.5) * 10
-            
-            # Limitar velocidad máxima
-            if abs(self.ball['speed_x']) > self.ball['max_speed']:
-                self.ball['speed_x'] = self.ball['max_speed'] if self.ball['speed_x'] > 0 else -self.ball['max_speed']
-            
-        # Colisión con paleta de la CPU
-        if ball_rect.colliderect(cpu_rect) and self.ball['speed_x'] > 0:
-            self.ball['speed_x'] = -abs(self.ball['speed_x']) * 1.05  # Acelerar ligeramente
-            
-            # Calcular ángulo basado en dónde golpeó
-            hit_pos = (self.ball['y'] - self.cpu['y']) / self.cpu['height']
-            self.ball['speed_y'] = (hit_pos - 0.5) * 10
-            
-            # Limitar velocidad máxima
-            if abs(self.ball['speed_x']) > self.ball['max_speed']:
-                self.ball['speed_x'] = self.ball['max_speed'] if self.ball['speed_x'] > 0 else -self.ball['max_speed']
-    
-    def check_paddle_collisions_extra(self, ball):
-        """Verifica colisiones para pelotas adicionales"""
-        ball_rect = pygame.Rect(
-            ball['x'] - ball['radius'],
-            ball['y'] - ball['radius'],
-            ball['radius'] * 2,
-            ball['radius'] * 2
-        )
-        
-        player_rect = pygame.Rect(
-            self.player['x'],
-            self.player['y'],
-            self.player['width'],
-            self.player['height']
-        )
-        
-        cpu_rect = pygame.Rect(
-            self.cpu['x'],
-            self.cpu['y'],
-            self.cpu['width'],
-            self.cpu['height']
-        )
-        
-        if ball_rect.colliderect(player_rect) and ball['speed_x'] < 0:
-            ball['speed_x'] = abs(ball['speed_x']) * 1.05
-            hit_pos = (ball['y'] - self.player['y']) / self.player['height']
-            ball['speed_y'] = (hit_pos - 0.5) * 10
-            
-        if ball_rect.colliderect(cpu_rect) and ball['speed_x'] > 0:
-            ball['speed_x'] = -abs(ball['speed_x']) * 1.05
-            hit_pos = (ball['y'] - self.cpu['y']) / self.cpu['height']
-            ball['speed_y'] = (hit_pos - 0.5) * 10
-            
-    def draw_glow_rect(self, surface, color, rect, glow_size=5):
-        """Dibuja un rectángulo con efecto de resplandor"""
-        # Crear superficie para el resplandor
-        glow_surf = pygame.Surface((rect.width + glow_size * 2, rect.height + glow_size * 2))
-        glow_surf.set_alpha(50)
-        glow_surf.fill(color)
-        
-        # Dibujar el resplandor
-        surface.blit(glow_surf, (rect.x - glow_size, rect.y - glow_size))
-        
-        # Dibujar el rectángulo principal
-        pygame.draw.rect(surface, color, rect)
-        
-    def draw_glow_circle(self, surface, color, center, radius, glow_size=10):
-        """Dibuja un círculo con efecto de resplandor"""
-        # Dibujar círculos concéntricos para el efecto de resplandor
-        for i in range(glow_size, 0, -1):
-            alpha = 20 - (i * 2)
-            if alpha > 0:
-                glow_surf = pygame.Surface((radius * 2 + i * 2, radius * 2 + i * 2))
-                glow_surf.set_alpha(alpha)
-                pygame.draw.circle(glow_surf, color, (radius + i, radius + i), radius + i)
-                surface.blit(glow_surf, (center[0] - radius - i, center[1] - radius - i))
-        
-        # Dibujar el círculo principal
-        pygame.draw.circle(surface, color, center, radius)
+        action = self.pending_commands
+        self.pending_commands = INPUT_NONE
+        if self.sim.game_state == "playing":
+            action |= self.held_input
+            if self.view_sim is None:
+                self.save_previous_state()
+        
+        self.recorder.record(action)
+        self.sim.step(action)
+        self.audio.observe(self.sim)
+        self.rewind_buffer.save(self.recorder.tick, self.sim)
     
-    def render_difficulty_menu(self):
-        """Renderiza el menú de selección de dificultad"""
-        # Fondo con gradiente
-        for y in range(self.SCREEN_HEIGHT):
-            color_ratio = y / self.SCREEN_HEIGHT
+    def rewind(self):
+        """Vuelve un tick atrás con el buffer de rebobinado; False si no queda historia"""
+        if self.view_sim is None:
+            self.save_previous_state()
+        tick = self.recorder.tick - 1
+        snapshot = self.rewind_buffer.get(tick)
+        if snapshot is None or snapshot.game_state == "difficulty_menu":
+            return False
+        
+        self.rewind_buffer.restore(tick, self.sim)
+        self.audio.observe(self.sim)  # Solo resincroniza: retroceder no suena
+        # El replay queda como si los ticks deshechos nunca se hubieran jugado
+        self.recorder.truncate(tick)
+        if self.sim.game_state != "playing":
+            self.request_redraw()
+        return True
+    
+    def request_redraw(self):
+        """Pide un redibujado completo (en modo en paralelo lo decide el hilo que dibuja)"""
+        if self.view_sim is None:
+            self.full_redraw = True
+    
+    def can_idle(self):
+        """True si hasta el próximo evento no cambia nada: no se juega ni hay comandos o redibujados pendientes"""
+        # Grabando no se duerme: el video necesita un frame por intervalo o menús y pausas se verían acelerados
+        return (self.idle_enabled and self.capture is None and self.scene.game_state != "playing"
+                and not self.full_redraw and self.pending_commands == INPUT_NONE and not self.rewinding)
+    
+    def wait_for_event(self):
+        """Bloquea hasta el próximo evento o IDLE_TIMEOUT_MS; el evento queda para handle_events"""
+        self.idle_meter.begin_wait()
+        event = pygame.event.wait(self.IDLE_TIMEOUT_MS)
+        self.idle_meter.end_wait()
+        if event.type != pygame.NOEVENT:
+            self.idle_event = event
+    
+    def save_previous_state(self):
+        """Guarda las posiciones antes del tick para interpolar el dibujo"""
+        balls = self.scene.balls
+        self.prev_ball_x = balls.x[:balls.size].copy()
+        self.prev_ball_y = balls.y[:balls.size].copy()
+        self.prev_player_y = self.scene.player.y
+        self.prev_cpu_y = self.scene.cpu.y
+    
+    def interpolate_paddle(self, previous, current):
+        if previous is None or self.render_alpha >= 1:
+            return current
+        return round(previous + (current - previous) * self.render_alpha)
+    
+    def interpolate_balls(self):
+        """Posiciones de las pelotas entre el tick anterior y el actual"""
+        balls = self.scene.balls
+        n = balls.size
+        x = balls.x[:n]
+        y = balls.y[:n]
+        if self.prev_ball_x is None or self.render_alpha >= 1:
+            return x, y
+        
+        # Las pelotas creadas en este tick no tienen posición anterior
+        m = min(n, len(self.prev_ball_x))
+        alpha = self.render_alpha
+        ix = x.copy()
+        iy = y.copy()
+        prev_x = self.prev_ball_x[:m]
+        prev_y = self.prev_ball_y[:m]
+        smooth = ((np.abs(x[:m] - prev_x) <= self.MAX_INTERPOLATION_JUMP) &
+                  (np.abs(y[:m] - prev_y) <= self.MAX_INTERPOLATION_JUMP))
+        ix[:m] = np.where(smooth, prev_x + (x[:m] - prev_x) * alpha, x[:m])
+        iy[:m] = np.where(smooth, prev_y + (y[:m] - prev_y) * alpha, y[:m])
+        return ix, iy
+        
+    def px(self, value):
+        """Distancia o coordenada lógica en píxeles del lienzo"""
+        return int(value * self.render_scale)
+    
+    def draw_glow_rect(self, surface, color, rect, glow_size=None):
+        """Dibuja un rectángulo (en coordenadas lógicas) con resplandor y devuelve el área afectada"""
+        quality = self.quality.settings
+        if glow_size is None:
+            glow_size = quality['rect_glow']
+        if self.render_scale != 1:
+            px = self.px
+            rect = pygame.Rect(px(rect.x), px(rect.y), max(1, px(rect.width)), max(1, px(rect.height)))
+            glow_size = px(glow_size)
+        sprite = self.sprite_cache.glow_rect(color, rect.size, glow_size,
+                                             per_pixel_alpha=quality['per_pixel_alpha'])
+        return surface.blit(sprite, (rect.x - glow_size, rect.y - glow_size))
+        
+    def draw_glow_circle(self, surface, color, center, radius, glow_size=None):
+        """Dibuja un círculo (en coordenadas lógicas) con resplandor y devuelve el área afectada"""
+        quality = self.quality.settings
+        if glow_size is None:
+            glow_size = quality['circle_glow']
+        if self.render_scale != 1:
+            px = self.px
+            center = (px(center[0]), px(center[1]))
+            radius = max(1, px(radius))
+            glow_size = px(glow_size)
+        sprite = self.sprite_cache.glow_circle(color, radius, glow_size,
+                                               per_pixel_alpha=quality['per_pixel_alpha'])
+        extent = radius + glow_size
+        return surface.blit(sprite, (center[0] - extent, center[1] - extent))
+    
+    def draw_trails(self, surface, color, indices, radius):
+        """Dibuja en un solo blits las estelas de las pelotas indicadas (radio lógico); devuelve sus áreas"""
+        if not len(indices):
+            return []
+        trails = self.scene.balls.trails
+        xs = trails.x[indices]
+        rows, columns = (xs == xs).nonzero()  # Puntos ya escritos (no NaN)
+        steps = (columns - trails.head) % trails.length
+        
+        # En calidad reducida solo se dibujan los puntos más recientes
+        quality = self.quality.settings
+        visible = max(1, int(trails.length * quality['trail_fraction']))
+        if visible < trails.length:
+            recent = steps >= trails.length - visible
+            rows = rows[recent]
+            columns = columns[recent]
+            steps = steps[recent]
+        if not len(rows):
+            return []
+        scale = self.render_scale
+        if scale != 1:
+            radius = max(1, self.px(radius))
+        left = (xs[rows, columns] * scale - radius).astype(int)
+        top = (trails.y[indices][rows, columns] * scale - radius).astype(int)
+        
+        # Cada punto usa el sprite de su antigüedad: el más viejo es el más tenue
+        sprites = self.sprite_cache.trail(color, radius, trails.length,
+                                          per_pixel_alpha=quality['per_pixel_alpha'])
+        surface.blits(list(zip(map(sprites.__getitem__, steps.tolist()),
+                               zip(left.tolist(), top.tolist()))), False)
+        
+        # Área de cada estela: la caja que contiene todos sus puntos (nonzero los agrupa por fila)
+        starts = np.concatenate(([0], (rows[1:] != rows[:-1]).nonzero()[0] + 1))
+        bounds = zip(np.minimum.reduceat(left, starts).tolist(), np.minimum.reduceat(top, starts).tolist(),
+                     np.maximum.reduceat(left, starts).tolist(), np.maximum.reduceat(top, starts).tolist())
+        size = 2 * radius
+        screen_rect = surface.get_rect()
+        return [pygame.Rect(x0, y0, x1 - x0 + size, y1 - y0 + size).clip(screen_rect)
+                for x0, y0, x1, y1 in bounds]
+    
+    def build_gradient_layer(self):
+        """Genera el gradiente de fondo (solo se repite si cambia el tamaño de pantalla)"""
+        width, height = self.screen.get_size()
+        layer = pygame.Surface((width, height)).convert()
+        for y in range(height):
+            color_ratio = y / height
             r = int(Colors.DARK_BLUE[0] * (1 - color_ratio) + Colors.BLUE_GRAY[0] * color_ratio)
             g = int(Colors.DARK_BLUE[1] * (1 - color_ratio) + Colors.BLUE_GRAY[1] * color_ratio)
             b = int(Colors.DARK_BLUE[2] * (1 - color_ratio) + Colors.BLUE_GRAY[2] * color_ratio)
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (self.SCREEN_WIDTH, y))
+            pygame.draw.line(layer, (r, g, b), (0, y), (width, y))
+        return layer
+    
+    def get_static_layer_key(self):
+        """Clave que identifica el contenido de la capa estática actual"""
+        size = self.screen.get_size()
+        if self.scene.game_state == "difficulty_menu":
+            return ("menu", self.selected_difficulty, size)
+        return ("game", self.scene.difficulty, size)
+    
+    def invalidate_static_layers(self):
+        """Obliga a reconstruir las capas estáticas en el próximo frame"""
+        self.gradient_layer = None
+        self.static_layer_key = None
+        self.full_redraw = True
+    
+    def ensure_static_layers(self):
+        """Reconstruye las capas estáticas solo cuando cambia el estado o el tamaño"""
+        key = self.get_static_layer_key()
+        if key == self.static_layer_key:
+            return
         
+        if self.gradient_layer is None or self.gradient_layer.get_size() != self.screen.get_size():
+            self.gradient_layer = self.build_gradient_layer()
+            self.profiler.count_allocation()
+        
+        self.static_layer = self.gradient_layer.copy()
+        self.profiler.count_allocation()
+        if key[0] == "menu":
+            self.draw_difficulty_menu(self.static_layer)
+        else:
+            self.draw_game_static(self.static_layer)
+        
+        self.static_layer_key = key
+        self.full_redraw = True
+    
+    def draw_difficulty_menu(self, surface):
+        """Dibuja el contenido del menú de dificultad sobre una superficie"""
         # Título
-        title = self.font_large.render("SELECCIONA DIFICULTAD", True, Colors.CYAN)
+        title = self.text_cache.text(self.font_large, "SELECCIONA DIFICULTAD", True, Colors.CYAN)
+        px = self.px
         title_x = (self.SCREEN_WIDTH - title.get_width()) // 2
-        self.screen.blit(title, (title_x, 50))
+        surface.blit(title, (title_x, px(50)))
         
         # Opciones de dificultad
         difficulties = [
@@ -490,23 +520,23 @@ class PongGame:
             if i == self.selected_difficulty:
                 # Rectángulo de selección con resplandor
                 rect = pygame.Rect(
-                    self.SCREEN_WIDTH // 2 - 200,
+                    self.LOGICAL_WIDTH // 2 - 200,
                     y_pos - 10,
                     400,
                     60
                 )
-                self.draw_glow_rect(self.screen, diff["color"], rect, glow_size=8)
+                self.draw_glow_rect(surface, diff["color"], rect, glow_size=8)
             
             # Nombre de la dificultad
-            text = self.font_large.render(diff["name"], True, 
+            text = self.text_cache.text(self.font_large, diff["name"], True, 
                                          Colors.WHITE if i == self.selected_difficulty else diff["color"])
             text_x = (self.SCREEN_WIDTH - text.get_width()) // 2
-            self.screen.blit(text, (text_x, y_pos))
+            surface.blit(text, (text_x, px(y_pos)))
             
             # Descripción
-            desc = self.font_small.render(diff["desc"], True, Colors.GRAY)
+            desc = self.text_cache.text(self.font_small, diff["desc"], True, Colors.GRAY)
             desc_x = (self.SCREEN_WIDTH - desc.get_width()) // 2
-            self.screen.blit(desc, (desc_x, y_pos + 30))
+            surface.blit(desc, (desc_x, px(y_pos + 30)))
         
         # Instrucciones
         instructions = [
@@ -515,207 +545,550 @@ class PongGame:
         ]
         
         for i, instruction in enumerate(instructions):
-            text = self.font_small.render(instruction, True, Colors.GRAY)
+            text = self.text_cache.text(self.font_small, instruction, True, Colors.GRAY)
             text_x = (self.SCREEN_WIDTH - text.get_width()) // 2
-            self.screen.blit(text, (text_x, self.SCREEN_HEIGHT - 50 + (i * 20)))
+            surface.blit(text, (text_x, px(self.LOGICAL_HEIGHT - 50 + (i * 20))))
+    
+    def draw_game_static(self, surface):
+        """Dibuja los elementos fijos de la partida (línea central, dificultad, controles)"""
+        px = self.px
+        # Línea central punteada
+        for y in range(0, self.LOGICAL_HEIGHT, 20):
+            pygame.draw.rect(surface, Colors.GRAY, 
+                           (px(self.LOGICAL_WIDTH // 2 - 2), px(y), max(1, px(4)), px(10)))
         
-    def render(self):
-        # Menú de dificultad
-        if self.game_state == "difficulty_menu":
-            self.render_difficulty_menu()
-            return
+        # Mostrar dificultad actual
+        diff_names = {"easy": "FÁCIL", "medium": "MEDIO", "hard": "DIFÍCIL"}
+        diff_colors = {"easy": Colors.GREEN, "medium": Colors.ORANGE, "hard": Colors.RED}
+        if self.scene.difficulty:
+            diff_text = self.text_cache.text(self.font_small, f"Dificultad: {diff_names[self.scene.difficulty]}", 
+                                              True, diff_colors[self.scene.difficulty])
+            diff_x = (self.SCREEN_WIDTH - diff_text.get_width()) // 2
+            surface.blit(diff_text, (diff_x, px(20)))
+        
+        # Controles
+        controls = [
+            "Controles:",
+            "↑ ↓ - Mover paleta",
+            "ESPACIO - Pausar/Reanudar",
+            "R - Reiniciar"
+        ]
+        
+        for i, control in enumerate(controls):
+            text = self.text_cache.text(self.font_small, control, True, Colors.GRAY)
+            surface.blit(text, (px(20), px(self.LOGICAL_HEIGHT - 80 + i * 15)))
+    
+    def render_difficulty_menu(self):
+        """Renderiza el menú de selección de dificultad"""
+        self.ensure_static_layers()
+        
+        # El menú es completamente estático: solo se copia cuando cambia
+        if self.full_redraw:
+            self.screen.blit(self.static_layer, (0, 0))
+            self.full_redraw = False
+            self.dirty_rects = None
+        else:
+            self.dirty_rects = []
+        self.prev_dirty_rects = []
+        self.prev_hud_rects = []
+        
+    def draw_dynamic_objects(self):
+        """Dibuja pelotas, estelas y paletas; devuelve las áreas modificadas"""
+        rects = []
+        balls = self.scene.balls
+        radius = self.scene.ball_radius
+        ball_x, ball_y = self.interpolate_balls()
         
-        # Fondo con gradiente
-        for y in range(self.SCREEN_HEIGHT):
-            color_ratio = y / self.SCREEN_HEIGHT
-            r = int(Colors.DARK_BLUE[0] * (1 - color_ratio) + Colors.BLUE_GRAY[0] * color_ratio)
-            g = int(Colors.DARK_BLUE[1] * (1 - color_ratio) + Colors.BLUE_GRAY[1] * color_ratio)
-            b = int(Colors.DARK_BLUE[2] * (1 - color_ratio) + Colors.BLUE_GRAY[2] * color_ratio)
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (self.SCREEN_WIDTH, y))
-            
-        # Línea central punteada
-        for y in range(0, self.SCREEN_HEIGHT, 20):
-            pygame.draw.rect(self.screen, Colors.GRAY, 
-                           (self.SCREEN_WIDTH // 2 - 2, y, 4, 10))
-            
         # Trail de la pelota
-        for i, (x, y) in enumerate(self.ball['trail']):
-            alpha = (i + 1) / len(self.ball['trail']) * 100
-            if alpha > 0:
-                trail_surf = pygame.Surface((self.ball['radius'] * 2, self.ball['radius'] * 2))
-                trail_surf.set_alpha(int(alpha))
-                pygame.draw.circle(trail_surf, Colors.WHITE, 
-                                 (self.ball['radius'], self.ball['radius']), 
-                                 int(self.ball['radius'] * ((i + 1) / len(self.ball['trail']))))
-                self.screen.blit(trail_surf, (x - self.ball['radius'], y - self.ball['radius']))
+        rects.extend(self.draw_trails(self.screen, Colors.WHITE, [MAIN_BALL], radius))
         
         # Paletas con resplandor
-        player_rect = pygame.Rect(self.player['x'], self.player['y'], 
-                                 self.player['width'], self.player['height'])
-        self.draw_glow_rect(self.screen, self.player['color'], player_rect)
+        player = self.scene.player
+        player_rect = player.rect_at(self.interpolate_paddle(self.prev_player_y, player.y))
+        rects.append(self.draw_glow_rect(self.screen, Colors.CYAN, player_rect))
         
-        cpu_rect = pygame.Rect(self.cpu['x'], self.cpu['y'], 
-                              self.cpu['width'], self.cpu['height'])
-        self.draw_glow_rect(self.screen, self.cpu['color'], cpu_rect)
+        cpu = self.scene.cpu
+        cpu_rect = cpu.rect_at(self.interpolate_paddle(self.prev_cpu_y, cpu.y))
+        rects.append(self.draw_glow_rect(self.screen, Colors.RED, cpu_rect))
         
         # Pelota con resplandor
-        self.draw_glow_circle(self.screen, self.ball['color'], 
-                             (int(self.ball['x']), int(self.ball['y'])), 
-                             self.ball['radius'])
-        
-        # Pelotas adicionales
-        for extra_ball in self.extra_balls:
-            # Trail de pelota extra
-            for i, (x, y) in enumerate(extra_ball['trail']):
-                alpha = (i + 1) / len(extra_ball['trail']) * 100
-                if alpha > 0:
-                    trail_surf = pygame.Surface((extra_ball['radius'] * 2, extra_ball['radius'] * 2))
-                    trail_surf.set_alpha(int(alpha))
-                    pygame.draw.circle(trail_surf, Colors.ORANGE, 
-                                     (extra_ball['radius'], extra_ball['radius']), 
-                                     int(extra_ball['radius'] * ((i + 1) / len(extra_ball['trail']))))
-                    self.screen.blit(trail_surf, (x - extra_ball['radius'], y - extra_ball['radius']))
-            
-            self.draw_glow_circle(self.screen, Colors.ORANGE, 
-                                 (int(extra_ball['x']), int(extra_ball['y'])), 
-                                 extra_ball['radius'])
+        rects.append(self.draw_glow_circle(self.screen, Colors.WHITE, 
+                                           (int(ball_x[MAIN_BALL]), int(ball_y[MAIN_BALL])), 
+                                           radius))
         
-        # Marcador
-        player_text = self.font_large.render(f"Jugador: {self.player_score}", True, Colors.CYAN)
-        cpu_text = self.font_large.render(f"CPU: {self.cpu_score}", True, Colors.RED)
+        # Power-ups colocados en el campo
+        for x, y, pickup_radius, powerup_type in self.scene.pickups.objects.values():
+            rects.append(self.draw_glow_circle(self.screen, POWERUP_COLORS.get(powerup_type, Colors.GREEN),
+                                               (int(x), int(y)), pickup_radius))
         
-        self.screen.blit(player_text, (20, 20))
-        self.screen.blit(cpu_text, (self.SCREEN_WIDTH - cpu_text.get_width() - 20, 20))
+        # Pelotas adicionales: primero todas las estelas juntas, después las pelotas
+        indices = balls.indices()
+        indices = indices[indices != MAIN_BALL]
+        rects.extend(self.draw_trails(self.screen, Colors.ORANGE, indices, radius))
+        positions = zip(ball_x[indices].astype(int).tolist(), ball_y[indices].astype(int).tolist())
+        for x, y in positions:
+            rects.append(self.draw_glow_circle(self.screen, Colors.ORANGE, (x, y), radius))
         
-        # Mostrar dificultad actual
-        diff_names = {"easy": "FÁCIL", "medium": "MEDIO", "hard": "DIFÍCIL"}
-        diff_colors = {"easy": Colors.GREEN, "medium": Colors.ORANGE, "hard": Colors.RED}
-        if self.difficulty:
-            diff_text = self.font_small.render(f"Dificultad: {diff_names[self.difficulty]}", 
-                                              True, diff_colors[self.difficulty])
-            diff_x = (self.SCREEN_WIDTH - diff_text.get_width()) // 2
-            self.screen.blit(diff_text, (diff_x, 20))
+        return rects
+    
+    def draw_hud(self):
+        """Dibuja marcador y notificaciones; devuelve sus áreas y si cambiaron"""
+        rects = []
+        
+        # Marcador
+        player_text = self.text_cache.text(self.font_large, f"Jugador: {self.scene.player_score}", True, Colors.CYAN)
+        cpu_text = self.text_cache.text(self.font_large, f"CPU: {self.scene.cpu_score}", True, Colors.RED)
+        
+        px = self.px
+        rects.append(self.screen.blit(player_text, (px(20), px(20))))
+        rects.append(self.screen.blit(cpu_text, (self.SCREEN_WIDTH - cpu_text.get_width() - px(20), px(20))))
         
         # Notificaciones de power-ups activos
-        notification_y = 60
-        if self.player_frozen:
-            freeze_text = self.font_medium.render("⚡ JUGADOR CONGELADO ⚡", True, Colors.CYAN)
-            freeze_x = (self.SCREEN_WIDTH - freeze_text.get_width()) // 2
+        notifications = []
+        if self.scene.player_frozen:
+            notifications.append(("⚡ JUGADOR CONGELADO ⚡", Colors.CYAN))
+        if self.scene.cpu_frozen:
+            notifications.append(("⚡ CPU CONGELADO ⚡", Colors.RED))
+        if self.scene.multi_ball_active:
+            notifications.append(("🔥 PELOTAS MÚLTIPLES 🔥", Colors.ORANGE))
+        if self.rewinding:
+            notifications.append(("⏪ REBOBINANDO ⏪", Colors.GREEN))
+        
+        notification_y = px(60)
+        for message, color in notifications:
+            text = self.text_cache.text(self.font_medium, message, True, color)
+            text_x = (self.SCREEN_WIDTH - text.get_width()) // 2
             # Fondo semi-transparente
-            freeze_bg = pygame.Surface((freeze_text.get_width() + 20, freeze_text.get_height() + 10))
-            freeze_bg.set_alpha(180)
-            freeze_bg.fill(Colors.DARK_BLUE)
-            self.screen.blit(freeze_bg, (freeze_x - 10, notification_y - 5))
-            self.screen.blit(freeze_text, (freeze_x, notification_y))
-            notification_y += 35
-        
-        if self.cpu_frozen:
-            freeze_text = self.font_medium.render("⚡ CPU CONGELADO ⚡", True, Colors.RED)
-            freeze_x = (self.SCREEN_WIDTH - freeze_text.get_width()) // 2
-            freeze_bg = pygame.Surface((freeze_text.get_width() + 20, freeze_text.get_height() + 10))
-            freeze_bg.set_alpha(180)
-            freeze_bg.fill(Colors.DARK_BLUE)
-            self.screen.blit(freeze_bg, (freeze_x - 10, notification_y - 5))
-            self.screen.blit(freeze_text, (freeze_x, notification_y))
-            notification_y += 35
-        
-        if self.multi_ball_active:
-            multi_text = self.font_medium.render("🔥 PELOTAS MÚLTIPLES 🔥", True, Colors.ORANGE)
-            multi_x = (self.SCREEN_WIDTH - multi_text.get_width()) // 2
-            multi_bg = pygame.Surface((multi_text.get_width() + 20, multi_text.get_height() + 10))
-            multi_bg.set_alpha(180)
-            multi_bg.fill(Colors.DARK_BLUE)
-            self.screen.blit(multi_bg, (multi_x - 10, notification_y - 5))
-            self.screen.blit(multi_text, (multi_x, notification_y))
-            notification_y += 35
+            text_bg = self.text_cache.panel((text.get_width() + px(20), text.get_height() + px(10)), 
+                                            Colors.DARK_BLUE, 180)
+            rects.append(self.screen.blit(text_bg, (text_x - px(10), notification_y - px(5))))
+            self.screen.blit(text, (text_x, notification_y))
+            notification_y += px(35)
         
+        hud_key = (self.scene.player_score, self.scene.cpu_score,
+                   self.scene.player_frozen, self.scene.cpu_frozen, self.scene.multi_ball_active, self.rewinding)
+        changed = hud_key != self.hud_key
+        self.hud_key = hud_key
+        return rects, changed
+    
+    def draw_status_overlay(self):
+        """Dibuja el texto de estado y el overlay de pausa"""
         # Estado del juego
         status_text = ""
-        if self.game_state == "waiting":
+        if self.scene.game_state == "waiting":
             status_text = "Presiona ESPACIO para comenzar"
-        elif self.game_state == "paused":
+        elif self.scene.game_state == "paused":
             status_text = "PAUSADO - Presiona ESPACIO para continuar"
-        elif self.game_state == "game_over":
-            winner = "Jugador" if self.player_score >= self.max_score else "CPU"
+        elif self.scene.game_state == "game_over":
+            winner = "Jugador" if self.scene.player_score >= self.scene.max_score else "CPU"
             status_text = f"¡{winner} gana! Presiona R para jugar de nuevo"
             
         if status_text:
-            text_surface = self.font_medium.render(status_text, True, Colors.CYAN)
+            text_surface = self.text_cache.text(self.font_medium, status_text, True, Colors.CYAN)
             text_x = (self.SCREEN_WIDTH - text_surface.get_width()) // 2
-            self.screen.blit(text_surface, (text_x, 60))
-            
-        # Controles
-        controls = [
-            "Controles:",
-            "↑ ↓ - Mover paleta",
-            "ESPACIO - Pausar/Reanudar",
-            "R - Reiniciar"
-        ]
-        
-        for i, control in enumerate(controls):
-            text = self.font_small.render(control, True, Colors.GRAY)
-            self.screen.blit(text, (20, self.SCREEN_HEIGHT - 80 + i * 15))
+            self.screen.blit(text_surface, (text_x, self.px(60)))
             
         # Overlay de pausa
-        if self.game_state == "paused":
-            pause_surf = pygame.Surface((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
-            pause_surf.set_alpha(128)
-            pause_surf.fill(Colors.BLACK)
+        if self.scene.game_state == "paused":
+            pause_surf = self.text_cache.panel((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), Colors.BLACK, 128)
             self.screen.blit(pause_surf, (0, 0))
             
-            pause_text = self.font_large.render("PAUSADO", True, Colors.CYAN)
+            pause_text = self.text_cache.text(self.font_large, "PAUSADO", True, Colors.CYAN)
             text_x = (self.SCREEN_WIDTH - pause_text.get_width()) // 2
             text_y = (self.SCREEN_HEIGHT - pause_text.get_height()) // 2
             self.screen.blit(pause_text, (text_x, text_y))
+        
+    def render(self):
+        """Dibuja la escena y, encima, el overlay de rendimiento si está visible"""
+        profiler = self.profiler
+        hidden_rect = profiler.hide_overlay(self.screen)
+        self.render_scene()
+        if profiler.overlay_visible:
+            overlay_rect = profiler.draw_overlay(self.screen)
+            if self.dirty_rects is not None:
+                self.dirty_rects.append(overlay_rect)
+        if hidden_rect and self.dirty_rects is not None:
+            self.dirty_rects.append(hidden_rect)
+    
+    def render_scene(self):
+        # Cualquier cambio de estado obliga a un redibujado completo
+        if self.scene.game_state != self.rendered_state:
+            self.rendered_state = self.scene.game_state
+            self.full_redraw = True
+        
+        # Menú de dificultad
+        if self.scene.game_state == "difficulty_menu":
+            self.render_difficulty_menu()
+            return
+        
+        self.ensure_static_layers()
+        
+        if self.full_redraw:
+            self.screen.blit(self.static_layer, (0, 0))
+        elif self.scene.game_state != "playing":
+            # Fuera de la partida nada se mueve: no hay nada que actualizar
+            self.dirty_rects = []
+            return
+        else:
+            # Restaurar el fondo solo donde hubo objetos en el frame anterior
+            for rect in self.prev_dirty_rects + self.prev_hud_rects:
+                self.screen.blit(self.static_layer, rect, rect)
+        
+        moving_rects = self.draw_dynamic_objects()
+        hud_rects, hud_changed = self.draw_hud()
+        
+        if self.full_redraw:
+            self.draw_status_overlay()
+            self.dirty_rects = None
+            self.full_redraw = False
+        else:
+            self.dirty_rects = self.prev_dirty_rects + moving_rects
+            if hud_changed:
+                self.dirty_rects += self.prev_hud_rects + hud_rects
+        
+        self.prev_dirty_rects = moving_rects
+        self.prev_hud_rects = hud_rects
+    
+    def present(self):
+        """Envía a la pantalla solo las regiones que cambiaron"""
+        rects = self.dirty_rects
+        # Con muchas regiones (modo caos) es más barato enviar la pantalla entera
+        if rects is not None and len(rects) > self.max_dirty_rects:
+            rects = None
+        if self.canvas is not self.display and rects != []:
+            rects = self.upscale(rects)
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            screen_rect = self.display.get_rect()
+            pygame.display.update([rect.clip(screen_rect) for rect in rects])
+        if self.capture is not None:
+            self.capture.grab(self.display)
+    
+    def upscale(self, rects):
+        """Escala el lienzo a la ventana; devuelve las regiones de la ventana que cambiaron (None = todas).
+        
+        Con un factor entero el vecino más cercano es replicar píxeles, así que
+        cada región sucia se escala por separado sin costuras y el costo sigue
+        al área que cambió. Con otro factor (o suavizado) se escala el lienzo entero.
+        """
+        canvas = self.canvas
+        factor = self.integer_scale
+        if rects is None or factor is None:
+            target = self.display.subsurface(self.output_rect)
+            if self.smooth_scaling:
+                pygame.transform.smoothscale(canvas, self.output_rect.size, target)
+            else:
+                pygame.transform.scale(canvas, self.output_rect.size, target)
+            return None
+        
+        canvas_rect = canvas.get_rect()
+        left, top = self.output_rect.topleft
+        updated = []
+        for rect in rects:
+            rect = rect.clip(canvas_rect)
+            if not rect.width or not rect.height:
+                continue
+            output = pygame.Rect(left + rect.x * factor, top + rect.y * factor,
+                                 rect.width * factor, rect.height * factor)
+            pygame.transform.scale(canvas.subsurface(rect), output.size, self.display.subsurface(output))
+            updated.append(output)
+        return updated
+    
+    def open_display(self, size=None, fullscreen=False):
+        """Abre la ventana del tamaño pedido (por defecto el lógico) o la pantalla completa"""
+        logical_size = (self.LOGICAL_WIDTH, self.LOGICAL_HEIGHT)
+        if fullscreen:
+            # SDL escala en la GPU a la resolución del monitor: el costo por frame no cambia
+            if self.smooth_scaling:
+                os.environ['SDL_RENDER_SCALE_QUALITY'] = 'linear'
+            try:
+                self.display = pygame.display.set_mode(logical_size, pygame.SCALED | pygame.FULLSCREEN)
+            except pygame.error:
+                # Sin renderer acelerado (driver dummy, algunos framebuffers): escalar en present()
+                self.display = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.display = pygame.display.set_mode(size or logical_size)
+        self.display.fill(Colors.BLACK)
+        self.canvas = None
+        self.update_canvas()
+    
+    def set_render_scale(self, scale):
+        """Fija la escala interna de dibujo (0.5 = la mitad de píxeles por lado)"""
+        self.base_render_scale = scale
+        self.update_canvas()
+    
+    def update_canvas(self):
+        """Crea el lienzo de la resolución interna que piden la escala y el nivel de calidad"""
+        scale = self.base_render_scale * self.quality.settings['render_scale']
+        if self.canvas is not None and scale == self.render_scale:
+            return
+        self.render_scale = scale
+        size = (max(1, int(self.LOGICAL_WIDTH * scale)), max(1, int(self.LOGICAL_HEIGHT * scale)))
+        
+        # Mayor zona de la ventana con la proporción del lienzo, centrada (bandas negras al costado)
+        display_width, display_height = self.display.get_size()
+        fit = min(display_width / size[0], display_height / size[1])
+        self.output_rect = pygame.Rect(0, 0, int(size[0] * fit), int(size[1] * fit))
+        self.output_rect.center = (display_width // 2, display_height // 2)
+        
+        if self.output_rect.size == size:
+            self.canvas = self.display
+            self.integer_scale = 1
+        else:
+            self.canvas = pygame.Surface(size).convert()
+            self.integer_scale = (int(fit) if fit == int(fit) and not self.smooth_scaling else None)
+            self.display.fill(Colors.BLACK)
+        self.SCREEN_WIDTH, self.SCREEN_HEIGHT = size
+        self.screen = self.profiler.start_counting(self.canvas) if self.profiler.counting else self.canvas
+        self.invalidate_static_layers()
             
+    def toggle_profiler_overlay(self):
+        """Muestra u oculta el overlay de rendimiento (con el conteo de Surface y blits mientras se ve)"""
+        profiler = self.profiler
+        profiler.toggle_overlay(self.font_small)
+        if profiler.overlay_visible:
+            self.screen = profiler.start_counting(self.canvas)
+        elif self.profile_path is None:
+            # Sin exportación nadie más usa el conteo: volver a la Surface real y dibujar sin envoltorio
+            profiler.stop_counting()
+            self.screen = self.canvas
+    
+    def enable_profile_export(self, path):
+        """Guarda cada frame perfilado para exportarlo a path (.json o .csv) al salir"""
+        self.profile_path = path
+        self.profiler.keep_history()
+        self.screen = self.profiler.start_counting(self.screen)
+    
+    def pin_quality(self, name):
+        """Fija el nivel de calidad ('alta', 'media', 'baja') o vuelve al automático con 'auto'"""
+        self.quality.pinned = None if name == 'auto' else TIER_NAMES.index(name)
+        if self.quality.pinned is not None:
+            self.quality.tier = self.quality.pinned
+        self.on_quality_change()
+    
+    def on_quality_change(self):
+        """Redibuja todo con los sprites (y la resolución interna) del nivel de calidad nuevo"""
+        self.profiler.labels['calidad'] = self.quality.settings['name']
+        self.update_canvas()
+        self.invalidate_static_layers()
+    
     def toggle_pause(self):
-        if self.game_state == "waiting":
-            self.game_state = "playing"
-        elif self.game_state == "playing":
-            self.game_state = "paused"
-        elif self.game_state == "paused":
-            self.game_state = "playing"
+        # Dos pulsaciones antes del mismo tick se anulan
+        self.pending_commands ^= INPUT_PAUSE
             
     def reset_game(self):
-        self.player_score = 0
-        self.cpu_score = 0
-        self.init_game_objects()
-        if self.difficulty:
-            self.set_difficulty(self.difficulty)
-        self.game_state = "difficulty_menu"
+        self.pending_commands |= INPUT_RESET
         self.selected_difficulty = 0
-        # Resetear power-ups
-        self.powerups = []
-        self.powerup_spawn_timer = 0
-        self.player_frozen = False
-        self.player_frozen_timer = 0
-        self.cpu_frozen = False
-        self.cpu_frozen_timer = 0
-        self.multi_ball_active = False
-        self.multi_ball_timer = 0
-        self.extra_balls = []
+    
+    def save_replay(self):
+        """Guarda el replay de la sesión en replay_dir; devuelve la ruta o None"""
+        if not self.replay_dir or not self.recorder.tick:
+            return None
+        os.makedirs(self.replay_dir, exist_ok=True)
+        path = os.path.join(self.replay_dir, time.strftime("partida-%Y%m%d-%H%M%S.pongreplay"))
+        self.recorder.to_replay().save(path)
+        return path
         
+    def finish_first_frame(self):
+        """El menú ya está en pantalla: iniciar lo que quedó diferido"""
+        self.startup.mark("primer frame")
+        if self.deferred_init:
+            self.finish_deferred_init()
+        self.audio.start()
+        self.startup.mark("audio")
+        if self.startup_report:
+            self.write_startup_report()
+    
+    def write_startup_report(self):
+        """Imprime el desglose del arranque, o lo agrega a STARTUP_REPORT_FILE junto al ejecutable si no hay consola"""
+        # Con console=False, stdout es None (Windows) o no llega a ninguna terminal
+        no_console = sys.stdout is None or (getattr(sys, 'frozen', False) and not sys.stdout.isatty())
+        if not no_console:
+            self.startup.print_report()
+            return
+        # Si la carpeta del ejecutable no admite escritura, la del usuario
+        for folder in (os.path.dirname(sys.executable), os.path.expanduser('~')):
+            try:
+                with open(os.path.join(folder, STARTUP_REPORT_FILE), 'a', encoding='utf-8') as f:
+                    print(time.strftime('%Y-%m-%d %H:%M:%S'), file=f)
+                    self.startup.print_report(file=f)
+                return
+            except OSError:
+                continue
+    
+    def end_frame(self, idle_frame):
+        """Cierra el frame en el perfilador y ajusta la calidad si el trabajo no entra en el presupuesto"""
+        profiler = self.profiler
+        profiler.mark('sleep')
+        profiler.end_frame()
+        if idle_frame:
+            self.idle_meter.observe_frame(profiler.last_work_ms)
+        if self.quality.observe(profiler.last_work_ms):
+            self.on_quality_change()
+    
+    def record_latency(self):
+        """Antigüedad del último tick mostrado al terminar de enviarlo a pantalla (si se mide)"""
+        if self.latency_samples is not None:
+            self.latency_samples.append(time.perf_counter() - self.shown_tick_time)
+    
     def run(self):
+        if self.pipelined:
+            PipelinedLoop(self).run()
+        else:
+            self.run_serial()
+        self.shutdown()
+    
+    def run_serial(self):
+        """Bucle en un solo hilo: eventos, ticks a paso fijo, dibujo y envío a pantalla"""
         running = True
+        tick_time = 1.0 / self.TICK_RATE
+        accumulator = 0.0
+        previous_time = time.perf_counter()
+        
+        profiler = self.profiler
+        first_frame = True
+        self.quality.budget_ms = 1000 / (self.FPS or self.TICK_RATE)
         
         while running:
+            profiler.begin_frame()
+            
+            # Tiempo real transcurrido desde el frame anterior
+            now = time.perf_counter()
+            accumulator += min(now - previous_time, self.MAX_FRAME_TIME)
+            previous_time = now
+            
             # Manejar eventos
             running = self.handle_events()
+            self.sample_keys()
+            profiler.mark('events')
             
-            # Actualizar juego
-            self.update()
+            # Actualizar juego a paso fijo, tantos ticks como correspondan
+            if accumulator >= tick_time:
+                while accumulator >= tick_time:
+                    self.update()
+                    accumulator -= tick_time
+                self.shown_tick_time = time.perf_counter()
+            profiler.mark('update')
             
-            # Renderizar
+            # Renderizar interpolando entre el último tick y el siguiente
+            self.render_alpha = accumulator / tick_time if self.scene.game_state == "playing" else 1.0
             self.render()
+            profiler.mark('render')
             
-            # Actualizar pantalla
-            pygame.display.flip()
-            self.clock.tick(self.FPS)
+            # Actualizar pantalla (solo regiones sucias)
+            self.present()
+            self.record_latency()
+            profiler.mark('present')
             
-        # Salir
+            if first_frame:
+                first_frame = False
+                self.finish_first_frame()
+            
+            # Fuera de la partida un frame que no dibujó nada es puro costo: dormir hasta un evento
+            idle_frame = self.dirty_rects == [] and self.scene.game_state != "playing"
+            if self.can_idle():
+                self.wait_for_event()
+                # El tiempo dormido no se simula (el estado no cambiaba): al despertar corre un
+                # solo tick, que aplica el comando recibido. Así tampoco se graban en el replay
+                # miles de ticks idénticos.
+                previous_time = time.perf_counter() - tick_time
+            else:
+                # Tiempo que el reloj duerme para respetar el límite de FPS
+                self.clock.tick(self.FPS)
+            self.end_frame(idle_frame)
+    
+    def start_capture(self, path):
+        """Graba a path lo que se muestra, a la tasa de FPS (o de ticks si no hay límite)"""
+        self.capture = FrameCapture(self.display, path, fps=self.FPS or self.TICK_RATE)
+    
+    def shutdown(self):
+        if self.capture is not None:
+            self.capture.close()
+            self.capture.print_report()
+        if self.idle_report:
+            self.idle_meter.print_report()
+        if self.audio_report:
+            self.audio.print_report()
+        self.save_replay()
+        if self.profile_path:
+            self.profiler.export(self.profile_path)
         pygame.quit()
         sys.exit()
 
+def window_size(text):
+    """'ANCHOxALTO' -> (ancho, alto), para argparse"""
+    try:
+        width, height = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamaño inválido: {text} (se espera ANCHOxALTO, por ejemplo 1600x800)")
+    return width, height
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pong Arcade")
+    parser.add_argument('--caos', action='store_true',
+                        help="el power-up de pelotas múltiples lanza cientos de pelotas")
+    parser.add_argument('--fps', type=int, default=60,
+                        help="límite de frames dibujados por segundo (0 = sin límite)")
+    parser.add_argument('--estela', type=int, default=10, metavar='N',
+                        help="puntos de la estela de cada pelota (admite cientos)")
+    parser.add_argument('--calidad', default='auto', choices=['auto'] + TIER_NAMES,
+                        help="nivel de calidad gráfica (auto se adapta al tiempo de frame)")
+    parser.add_argument('--escala-interna', type=float, default=1.0, metavar='ESCALA',
+                        help="resolución interna relativa a 800x400 (0.5 = mitad; el resultado se escala a la ventana)")
+    parser.add_argument('--ventana', type=window_size, metavar='ANCHOxALTO',
+                        help="tamaño de la ventana (el campo se escala y centra)")
+    parser.add_argument('--pantalla-completa', action='store_true',
+                        help="pantalla completa a la resolución del monitor (escalado en la GPU)")
+    parser.add_argument('--suavizado', action='store_true',
+                        help="escalar con filtrado lineal en lugar de píxeles nítidos")
+    parser.add_argument('--replays', default='replays', metavar='DIR',
+                        help="carpeta donde guardar el replay de la sesión")
+    parser.add_argument('--sin-replay', action='store_true', help="no guardar el replay al salir")
+    parser.add_argument('--inicio-rapido', action='store_true',
+                        help="iniciar solo video y fuentes; el resto después de mostrar el menú")
+    parser.add_argument('--tiempos-inicio', action='store_true',
+                        help="imprimir en qué se fue el tiempo de arranque hasta el primer frame")
+    parser.add_argument('--sin-reposo', action='store_true',
+                        help="dibujar a tasa fija también en menús y pausa (sin dormir esperando eventos)")
+    parser.add_argument('--tiempos-reposo', action='store_true',
+                        help="imprimir al salir el tiempo dormido en reposo y la CPU ahorrada")
+    parser.add_argument('--paralelo', action='store_true',
+                        help="simular en un hilo aparte mientras se dibuja el frame anterior (ver pipeline.py)")
+    parser.add_argument('--grabar', metavar='ARCHIVO',
+                        help="grabar la sesión a video (.mp4 con ffmpeg, o .raw crudo) sin frenar el juego")
+    parser.add_argument('--sin-sonido', action='store_true', help="jugar sin efectos de sonido")
+    parser.add_argument('--tiempos-audio', action='store_true',
+                        help="imprimir al salir los sonidos tocados y la latencia medida")
+    parser.add_argument('--perfil', metavar='ARCHIVO',
+                        help="exportar los tiempos por frame al salir (.json resumen, .csv por frame)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    game = PongGame()
-    game.run()
\ No newline at end of file
+    startup = StartupTimer(IMPORT_START)
+    startup.mark("importar módulos")
+    args = parse_args()
+    game = PongGame(fast_start=args.inicio_rapido, startup=startup)
+    game.startup_report = args.tiempos_inicio
+    game.FPS = args.fps
+    game.idle_enabled = not args.sin_reposo
+    game.idle_report = args.tiempos_reposo
+    game.pipelined = args.paralelo
+    game.audio.silent = args.sin_sonido
+    game.audio_report = args.tiempos_audio
+    game.idle_meter.frame_rate = args.fps or game.TICK_RATE
+    game.sim.trail_length = max(1, args.estela)
+    game.pin_quality(args.calidad)
+    game.smooth_scaling = args.suavizado
+    if args.ventana or args.pantalla_completa or args.suavizado:
+        game.open_display(args.ventana, args.pantalla_completa)
+    game.set_render_scale(args.escala_interna)
+    game.replay_dir = None if args.sin_replay else args.replays
+    if args.perfil:
+        game.enable_profile_export(args.perfil)
+    if args.grabar:
+        game.start_capture(args.grabar)
+    # Modo caos: el power-up de pelotas múltiples lanza cientos de pelotas
+    if args.caos:
+        game.sim.multi_ball_count = 300
+    game.run()
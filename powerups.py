@@ -0,0 +1,85 @@
+import heapq
+
+# Regla al activar un power-up que ya está activo
+REFRESH = 'refresh'  # La duración vuelve a empezar
+STACK = 'stack'      # La duración se suma a lo que quedaba
+IGNORE = 'ignore'    # No tiene efecto hasta que venza el actual
+
+# Dentro de un mismo tick los vencimientos se procesan antes que los spawns
+EXPIRE_PRIORITY = 0
+SPAWN_PRIORITY = 1
+
+
+class PowerUpType:
+    """Definición de un power-up: duración, regla de reactivación y acciones al empezar y vencer.
+
+    duration es el nombre del atributo de la simulación con la duración en
+    frames (así sigue siendo configurable y se graba en los replays); on_start
+    y on_end son nombres de métodos de la simulación, o None.
+    """
+
+    def __init__(self, duration, rule=REFRESH, on_start=None, on_end=None):
+        self.duration = duration
+        self.rule = rule
+        self.on_start = on_start
+        self.on_end = on_end
+
+
+# Registro de power-ups. El orden importa: spawn_powerup elige al azar sobre
+# esta lista, así que los tipos nuevos van al final para no cambiar los replays
+POWERUP_TYPES = {
+    'freeze_player': PowerUpType('player_frozen_duration', REFRESH),
+    'freeze_cpu': PowerUpType('cpu_frozen_duration', REFRESH),
+    'multi_ball': PowerUpType('multi_ball_duration', IGNORE,
+                              on_start='start_multi_ball', on_end='end_multi_ball'),
+}
+
+
+class Scheduler:
+    """Vencimientos por tick en un min-heap, con claves que se pueden reprogramar.
+
+    Reprogramar o cancelar una clave no busca su entrada en el heap: la
+    entrada vieja queda marcada como obsoleta y se descarta al salir. Mientras
+    no vence nada, consultar el tick cuesta una sola comparación.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.deadlines = {}  # clave -> (tick, número de entrada vigente)
+        self.counter = 0
+
+    def schedule(self, key, tick, priority=EXPIRE_PRIORITY):
+        """Programa (o reprograma) key para vencer en tick"""
+        self.counter += 1
+        self.deadlines[key] = (tick, self.counter)
+        heapq.heappush(self.heap, (tick, priority, self.counter, key))
+
+    def cancel(self, key):
+        self.deadlines.pop(key, None)
+
+    def deadline(self, key):
+        """Tick en que vence key, o None si no está programada"""
+        entry = self.deadlines.get(key)
+        return entry[0] if entry is not None else None
+
+    def __contains__(self, key):
+        return key in self.deadlines
+
+    def pop_due(self, tick):
+        """Claves vencidas hasta tick inclusive, en orden de tick y prioridad"""
+        heap = self.heap
+        if not heap or heap[0][0] > tick:
+            return ()
+
+        due = []
+        while heap and heap[0][0] <= tick:
+            _, _, number, key = heapq.heappop(heap)
+            entry = self.deadlines.get(key)
+            if entry is not None and entry[1] == number:
+                del self.deadlines[key]
+                due.append(key)
+        return due
+
+    def clear(self):
+        self.heap.clear()
+        self.deadlines.clear()
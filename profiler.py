@@ -0,0 +1,363 @@
+"""Perfilador de frames integrado en el juego.
+
+Mide con perf_counter cada fase del bucle principal (eventos, ticks de la
+simulación, dibujo, envío a pantalla y la espera de clock.tick), guarda una
+ventana móvil para calcular p50/p95/p99 y, si se pide, el historial completo
+para exportarlo a JSON o CSV al salir. Opcionalmente cuenta las Surface
+construidas (sprites y textos de los caches vigilados, más las capas que
+avisa el juego) y los blits sobre la pantalla, y dibuja un overlay con los
+números. El conteo no toca pygame.Surface: solo envuelve la pantalla.
+"""
+import csv
+import json
+import sys
+import time
+from array import array
+from collections import deque
+
+import pygame
+
+PHASES = ('events', 'update', 'render', 'present', 'sleep')
+PHASE_LABELS = {'events': 'eventos', 'update': 'update', 'render': 'render',
+                'present': 'present', 'sleep': 'espera'}
+
+# Histograma del tiempo de frame exportado: cubetas de 1 ms hasta 100 ms
+HISTOGRAM_BUCKET_MS = 1.0
+HISTOGRAM_BUCKETS = 100
+
+class BlitCounter:
+    """Envoltorio de la superficie de dibujo que cuenta los blits que recibe"""
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.count = 0
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        self.count += 1
+        return self.surface.blit(source, dest, area, special_flags)
+
+    def blits(self, blit_sequence, doreturn=1):
+        blit_sequence = list(blit_sequence)
+        self.count += len(blit_sequence)
+        return self.surface.blits(blit_sequence, doreturn)
+
+    def __getattr__(self, name):
+        return getattr(self.surface, name)
+
+
+def unwrap(surface):
+    """Superficie real detrás de un BlitCounter"""
+    return surface.surface if isinstance(surface, BlitCounter) else surface
+
+
+def summarize(values):
+    """Media, percentiles y máximo de una lista de tiempos en milisegundos"""
+    if not values:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {
+        'mean': sum(ordered) / len(ordered),
+        'p50': ordered[min(last, int(0.50 * len(ordered)))],
+        'p95': ordered[min(last, int(0.95 * len(ordered)))],
+        'p99': ordered[min(last, int(0.99 * len(ordered)))],
+        'max': ordered[last],
+    }
+
+
+class FrameProfiler:
+    """Temporizadores por fase con percentiles móviles y overlay en pantalla.
+
+    Uso por frame: begin_frame(), mark(fase) al terminar cada fase y
+    end_frame(). Cada mark cuesta una llamada a perf_counter, así que el
+    perfilador puede quedar siempre activo; los contadores de Surface y
+    blits y el historial completo solo se activan cuando se piden.
+    """
+
+    def __init__(self, window=600):
+        self.window = window
+        self.samples = {phase: deque(maxlen=window) for phase in PHASES}
+        self.frame_times = deque(maxlen=window)
+        self.surface_counts = deque(maxlen=window)
+        self.blit_counts = deque(maxlen=window)
+        self.frames = 0
+
+        # Historial completo (solo si se va a exportar): un arreglo por columna
+        self.history = None
+
+        # Contadores de asignaciones y blits
+        self.blit_counter = None
+        self.counting = False
+        self.allocations = 0  # Superficies construidas fuera de los caches vigilados (capas)
+
+        # Overlay
+        self.overlay_visible = False
+        self.font = None
+        self.overlay = None
+        self.overlay_rect = None
+        self.saved_under = None
+        self.overlay_covered = False
+        self.caches = {}
+        self.labels = {}  # Textos extra para el overlay (nivel de calidad...)
+        self.refresh_interval = 0.5
+        self.next_refresh = 0.0
+
+        # Frame en curso
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.surfaces_at_start = 0
+        self.blits_at_start = 0
+        self.last_work_ms = 0.0  # Tiempo del último frame sin contar la espera
+
+    def keep_history(self):
+        """Guarda cada frame para poder exportarlo al salir"""
+        columns = PHASES + ('frame', 'surfaces', 'blits')
+        self.history = {column: array('d') for column in columns}
+
+    def start_counting(self, surface):
+        """Cuenta Surface construidas y blits sobre surface; devuelve la superficie a usar para dibujar"""
+        self.counting = True
+        if self.blit_counter is None or self.blit_counter.surface is not unwrap(surface):
+            self.blit_counter = BlitCounter(unwrap(surface))
+        return self.blit_counter
+
+    def stop_counting(self):
+        self.counting = False
+        self.blit_counter = None
+
+    def count_allocation(self, count=1):
+        """Anota Surface construidas fuera de los caches vigilados (capas estáticas, lienzo)"""
+        self.allocations += count
+
+    def surfaces_built(self):
+        """Surface construidas hasta ahora: fallos de los caches vigilados más las anotadas"""
+        return self.allocations + sum(cache.misses for cache in self.caches.values())
+
+    def watch_cache(self, name, cache):
+        """Muestra la tasa de aciertos de un SpriteCache en el overlay"""
+        self.caches[name] = cache
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        self.frame_start = now
+        self.last_mark = now
+        for phase in PHASES:
+            self.current[phase] = 0.0
+        if self.counting:
+            self.surfaces_at_start = self.surfaces_built()
+            self.blits_at_start = self.blit_counter.count
+
+    def mark(self, phase):
+        """Asigna a phase el tiempo transcurrido desde la marca anterior"""
+        now = time.perf_counter()
+        self.current[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self):
+        frame_ms = (self.last_mark - self.frame_start) * 1000
+        self.last_work_ms = frame_ms - self.current['sleep'] * 1000
+        self.frame_times.append(frame_ms)
+        for phase in PHASES:
+            self.samples[phase].append(self.current[phase] * 1000)
+
+        surfaces = blits = 0
+        if self.counting:
+            surfaces = self.surfaces_built() - self.surfaces_at_start
+            blits = self.blit_counter.count - self.blits_at_start
+        self.surface_counts.append(surfaces)
+        self.blit_counts.append(blits)
+        self.frames += 1
+
+        if self.history is not None:
+            history = self.history
+            for phase in PHASES:
+                history[phase].append(self.current[phase] * 1000)
+            history['frame'].append(frame_ms)
+            history['surfaces'].append(surfaces)
+            history['blits'].append(blits)
+
+        if self.overlay_visible and self.last_mark >= self.next_refresh:
+            self.overlay = None
+            self.next_refresh = self.last_mark + self.refresh_interval
+
+    def summary(self):
+        """Percentiles de la ventana móvil (milisegundos)"""
+        report = {'frames': len(self.frame_times), 'frame': summarize(self.frame_times)}
+        for phase in PHASES:
+            report[phase] = summarize(self.samples[phase])
+        return report
+
+    def toggle_overlay(self, font):
+        self.overlay_visible = not self.overlay_visible
+        self.font = font
+        self.overlay = None
+
+    def overlay_lines(self):
+        frame = summarize(self.frame_times)
+        means = {phase: summarize(self.samples[phase])['mean'] for phase in PHASES}
+        fps = 1000 / frame['mean'] if frame['mean'] else 0.0
+        work = frame['mean'] - means['sleep']
+        lines = [
+            f"FPS {fps:.0f}  frame {frame['mean']:.1f} ms (trabajo {work:.1f})",
+            f"p50 {frame['p50']:.1f}  p95 {frame['p95']:.1f}  p99 {frame['p99']:.1f} ms",
+            "  ".join(f"{PHASE_LABELS[phase]} {means[phase]:.2f}" for phase in PHASES[:3]),
+            "  ".join(f"{PHASE_LABELS[phase]} {means[phase]:.2f}" for phase in PHASES[3:]),
+        ]
+        if self.counting and self.frame_times:
+            frames = len(self.frame_times)
+            lines.append(f"surfaces {sum(self.surface_counts) / frames:.1f}/frame  "
+                         f"blits {sum(self.blit_counts) / frames:.0f}/frame")
+        if self.caches:
+            lines.append("  ".join(f"{name} {cache.stats()['hit_rate']:.0%}"
+                                   for name, cache in self.caches.items()))
+        if self.labels:
+            lines.append("  ".join(f"{name} {value}" for name, value in self.labels.items()))
+        return lines
+
+    def build_overlay(self):
+        lines = [self.font.render(line, True, (255, 255, 255)) for line in self.overlay_lines()]
+        line_height = self.font.get_linesize()
+        width = max(line.get_width() for line in lines) + 16
+        height = line_height * len(lines) + 12
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        for i, line in enumerate(lines):
+            overlay.blit(line, (8, 6 + i * line_height))
+        self.overlay = overlay
+
+    def hide_overlay(self, surface):
+        """Restaura lo que había debajo del overlay; devuelve el área restaurada o None"""
+        if not self.overlay_covered:
+            return None
+        unwrap(surface).blit(self.saved_under, self.overlay_rect)
+        self.overlay_covered = False
+        return self.overlay_rect
+
+    def draw_overlay(self, surface, margin=10):
+        """Dibuja el overlay en la esquina inferior derecha y devuelve su área"""
+        target = unwrap(surface)
+        if self.overlay is None:
+            self.build_overlay()
+        width, height = target.get_size()
+        rect = self.overlay.get_rect(bottomright=(width - margin, height - margin))
+        if self.saved_under is None or self.saved_under.get_size() != rect.size:
+            self.saved_under = pygame.Surface(rect.size).convert(target)
+        # Guardar lo que queda debajo para quitarlo en el próximo frame
+        self.saved_under.blit(target, (0, 0), rect)
+        target.blit(self.overlay, rect)
+        self.overlay_rect = rect
+        self.overlay_covered = True
+        return rect
+
+    def export(self, path):
+        """Escribe el historial en CSV (un frame por fila) o un resumen en JSON"""
+        history = self.history
+        if history is None:
+            raise ValueError("El historial no está activo: llama a keep_history() antes de perfilar")
+        columns = ('frame',) + PHASES + ('surfaces', 'blits')
+
+        if path.lower().endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow([f"{column}_ms" if column not in ('surfaces', 'blits') else column
+                                 for column in columns])
+                for row in zip(*(history[column] for column in columns)):
+                    writer.writerow([f"{value:.4f}" for value in row[:-2]] + [int(row[-2]), int(row[-1])])
+            return
+
+        histogram = [0] * (HISTOGRAM_BUCKETS + 1)
+        for frame_ms in history['frame']:
+            histogram[min(HISTOGRAM_BUCKETS, int(frame_ms / HISTOGRAM_BUCKET_MS))] += 1
+        frames = len(history['frame'])
+        report = {
+            'frames': frames,
+            'counting': self.counting,
+            'phases_ms': {column: summarize(history[column]) for column in ('frame',) + PHASES},
+            'surfaces_per_frame': sum(history['surfaces']) / frames if frames else 0.0,
+            'blits_per_frame': sum(history['blits']) / frames if frames else 0.0,
+            'frame_histogram': {'bucket_ms': HISTOGRAM_BUCKET_MS, 'counts': histogram},
+            'caches': {name: cache.stats() for name, cache in self.caches.items()},
+        }
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+class StartupTimer:
+    """Desglose del tiempo de arranque: fases consecutivas y detalles acumulados"""
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.phases = []   # [(nombre, segundos), ...] en orden
+        self.details = {}  # nombre -> segundos repartidos dentro de otras fases (fuentes...)
+
+    def mark(self, name):
+        """Cierra la fase name con el tiempo transcurrido desde la marca anterior"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def add(self, name, seconds):
+        self.details[name] = self.details.get(name, 0.0) + seconds
+
+    def print_report(self, file=sys.stdout):
+        print("Tiempo de arranque:", file=file)
+        for name, seconds in self.phases:
+            print(f"  {name:<24} {seconds * 1000:8.1f} ms", file=file)
+        for name, seconds in self.details.items():
+            print(f"  (de ello, {name}: {seconds * 1000:.1f} ms)", file=file)
+        print(f"  {'total':<24} {(self.last - self.start) * 1000:8.1f} ms", file=file)
+
+
+class IdleMeter:
+    """Tiempo que el bucle pasó dormido esperando eventos y CPU que se ahorró así.
+
+    Lo ahorrado se estima con los frames que no se dibujaron mientras dormía
+    (tiempo dormido por la tasa de frames) por el costo medio medido de un
+    frame fuera de la partida que no cambió nada en pantalla.
+    """
+
+    def __init__(self, frame_rate=60):
+        self.frame_rate = frame_rate
+        self.start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.idle_seconds = 0.0
+        self.waits = 0
+        self.frames_avoided = 0.0
+        self.idle_frame_ms = 0.0  # Suma del trabajo de los frames medidos
+        self.idle_frames = 0
+        self.wait_start = None
+
+    def begin_wait(self):
+        self.wait_start = time.perf_counter()
+
+    def end_wait(self):
+        seconds = time.perf_counter() - self.wait_start
+        self.idle_seconds += seconds
+        self.waits += 1
+        # El frame que despierta se dibuja igual: solo cuentan los que se evitaron
+        self.frames_avoided += max(0.0, seconds * self.frame_rate - 1)
+
+    def observe_frame(self, work_ms):
+        """Registra el trabajo de un frame fuera de la partida que no dibujó nada"""
+        self.idle_frame_ms += work_ms
+        self.idle_frames += 1
+
+    @property
+    def saved_seconds(self):
+        if not self.idle_frames:
+            return 0.0
+        return self.frames_avoided * self.idle_frame_ms / self.idle_frames / 1000
+
+    def print_report(self, file=sys.stdout):
+        elapsed = time.perf_counter() - self.start
+        cpu = time.process_time() - self.cpu_start
+        frame_ms = self.idle_frame_ms / self.idle_frames if self.idle_frames else 0.0
+        print("Modo reposo:", file=file)
+        print(f"  dormido                 {self.idle_seconds:8.1f} s de {elapsed:.1f} s "
+              f"({self.idle_seconds / elapsed if elapsed else 0:.0%}, {self.waits} esperas)", file=file)
+        print(f"  frames no dibujados     {self.frames_avoided:8.0f}  ({frame_ms:.2f} ms de CPU c/u)", file=file)
+        print(f"  CPU ahorrada (estimada) {self.saved_seconds:8.2f} s", file=file)
+        print(f"  CPU usada               {cpu:8.2f} s ({cpu / elapsed if elapsed else 0:.1%} de un núcleo)",
+              file=file)
@@ -0,0 +1,76 @@
+"""Niveles de calidad gráfica y gobernador automático por tiempo de frame."""
+
+# Del más caro al más barato. circle_glow y rect_glow son los anillos de
+# resplandor, trail_fraction la parte visible de cada estela,
+# per_pixel_alpha si los sprites usan alfa por píxel (sin él se usan
+# colorkey y alfa de superficie, que SDL copia mucho más rápido) y
+# render_scale la resolución interna relativa (el lienzo se escala a la ventana).
+QUALITY_TIERS = [
+    {'name': 'alta', 'circle_glow': 10, 'rect_glow': 5, 'trail_fraction': 1.0, 'per_pixel_alpha': True,
+     'render_scale': 1.0},
+    {'name': 'media', 'circle_glow': 5, 'rect_glow': 3, 'trail_fraction': 0.5, 'per_pixel_alpha': True,
+     'render_scale': 1.0},
+    {'name': 'baja', 'circle_glow': 0, 'rect_glow': 0, 'trail_fraction': 0.25, 'per_pixel_alpha': False,
+     'render_scale': 1.0},
+    {'name': 'mínima', 'circle_glow': 0, 'rect_glow': 0, 'trail_fraction': 0.25, 'per_pixel_alpha': False,
+     'render_scale': 0.5},
+]
+
+TIER_NAMES = [tier['name'] for tier in QUALITY_TIERS]
+
+
+class QualityGovernor:
+    """Baja o sube el nivel de calidad según el tiempo de trabajo de cada frame.
+
+    Junta una ventana de frames y mira su p90: si pasa de downgrade_ratio
+    del presupuesto baja un nivel; si queda por debajo de upgrade_ratio
+    durante upgrade_windows ventanas seguidas sube uno. Los umbrales
+    separados y la ventana que se descarta tras cada cambio evitan que la
+    calidad oscile. Con pinned el nivel queda fijo.
+    """
+
+    def __init__(self, budget_ms=1000 / 60, pinned=None, window=60,
+                 downgrade_ratio=0.9, upgrade_ratio=0.5, upgrade_windows=3):
+        self.budget_ms = budget_ms
+        self.pinned = pinned
+        self.tier = pinned if pinned is not None else 0
+        self.window = window
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.upgrade_windows = upgrade_windows
+        self.samples = []
+        self.calm_windows = 0
+        self.changes = 0
+
+    @property
+    def settings(self):
+        return QUALITY_TIERS[self.tier]
+
+    def observe(self, work_ms):
+        """Registra el tiempo de trabajo de un frame; devuelve True si cambió el nivel"""
+        if self.pinned is not None:
+            return False
+        self.samples.append(work_ms)
+        if len(self.samples) < self.window:
+            return False
+
+        ordered = sorted(self.samples)
+        p90 = ordered[int(0.9 * (len(ordered) - 1))]
+        self.samples.clear()
+
+        if p90 > self.budget_ms * self.downgrade_ratio:
+            self.calm_windows = 0
+            if self.tier < len(QUALITY_TIERS) - 1:
+                self.tier += 1
+                self.changes += 1
+                return True
+        elif p90 < self.budget_ms * self.upgrade_ratio:
+            self.calm_windows += 1
+            if self.calm_windows >= self.upgrade_windows and self.tier > 0:
+                self.tier -= 1
+                self.calm_windows = 0
+                self.changes += 1
+                return True
+        else:
+            self.calm_windows = 0
+        return False
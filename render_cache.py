@@ -0,0 +1,178 @@
+import pygame
+from collections import OrderedDict
+
+
+def _prepare(surface):
+    """Convierte la superficie (o tupla de superficies) al formato de pantalla si ya existe una ventana"""
+    if isinstance(surface, tuple):
+        return tuple(_prepare(sprite) for sprite in surface)
+    if pygame.display.get_surface() is not None:
+        # Los sprites sin alfa por píxel conservan su colorkey y alfa de superficie
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+    return surface
+
+
+class SpriteCache:
+    """Atlas de sprites de resplandor y estela pre-renderizados con alfa por píxel.
+
+    Cada sprite se construye una sola vez por clave (color, radio, resplandor,
+    paso de alfa) y se reutiliza en cada frame. Cuando se supera el límite de
+    entradas se descarta la menos usada recientemente (LRU).
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, builder):
+        """Devuelve el sprite de la clave, construyéndolo con builder() si no existe"""
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = _prepare(builder())
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_entries:
+            self.sprites.popitem(last=False)
+            self.evictions += 1
+        return sprite
+
+    def glow_circle(self, color, radius, glow_size=10, alpha_step=2, per_pixel_alpha=True):
+        """Sprite de círculo con anillos de resplandor concéntricos ya compuestos"""
+        key = ('glow_circle', tuple(color), radius, glow_size, alpha_step, per_pixel_alpha)
+        if not per_pixel_alpha:
+            return self.get(key, lambda: self._build_flat_circle(color, radius, glow_size))
+        return self.get(key, lambda: self._build_glow_circle(color, radius, glow_size, alpha_step))
+
+    def glow_rect(self, color, size, glow_size=5, alpha=50, per_pixel_alpha=True):
+        """Sprite de rectángulo con un halo semi-transparente alrededor"""
+        key = ('glow_rect', tuple(color), tuple(size), glow_size, alpha, per_pixel_alpha)
+        if not per_pixel_alpha:
+            return self.get(key, lambda: self._build_flat_rect(color, size, glow_size))
+        return self.get(key, lambda: self._build_glow_rect(color, size, glow_size, alpha))
+
+    def trail(self, color, radius, length, max_alpha=100, per_pixel_alpha=True):
+        """Tupla con los sprites ya desvanecidos de cada punto de una estela, del más viejo al más nuevo.
+
+        Toda la tupla ocupa una sola entrada del cache, así que estelas de
+        cientos de puntos no desalojan al resto de los sprites.
+        """
+        key = ('trail', tuple(color), radius, length, max_alpha, per_pixel_alpha)
+        build = self._build_trail if per_pixel_alpha else self._build_flat_trail
+        return self.get(key, lambda: tuple(build(color, radius, step, length, max_alpha)
+                                           for step in range(length)))
+
+    def stats(self):
+        """Contadores de uso del cache"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.sprites),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+    def clear(self):
+        self.sprites.clear()
+
+    @staticmethod
+    def _build_glow_circle(color, radius, glow_size, alpha_step):
+        extent = radius + glow_size
+        sprite = pygame.Surface((extent * 2, extent * 2), pygame.SRCALPHA)
+        sprite.fill((*color[:3], 0))
+
+        # Componer los anillos del más externo al más interno, igual que el dibujo original
+        for i in range(glow_size, 0, -1):
+            alpha = 20 - (i * alpha_step)
+            if alpha > 0:
+                ring = pygame.Surface((extent * 2, extent * 2), pygame.SRCALPHA)
+                pygame.draw.circle(ring, (*color[:3], alpha), (extent, extent), radius + i)
+                sprite.blit(ring, (0, 0))
+
+        # Círculo principal opaco
+        pygame.draw.circle(sprite, (*color[:3], 255), (extent, extent), radius)
+        return sprite
+
+    @staticmethod
+    def _build_glow_rect(color, size, glow_size, alpha):
+        width, height = size
+        sprite = pygame.Surface((width + glow_size * 2, height + glow_size * 2), pygame.SRCALPHA)
+        sprite.fill((*color[:3], alpha))
+        sprite.fill((*color[:3], 255), (glow_size, glow_size, width, height))
+        return sprite
+
+    @staticmethod
+    def _build_trail(color, radius, step, steps, max_alpha):
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        fraction = (step + 1) / steps
+        pygame.draw.circle(sprite, (*color[:3], int(fraction * max_alpha)),
+                           (radius, radius), int(radius * fraction))
+        return sprite
+
+
+    # Variantes sin alfa por píxel (calidad baja): sin halo, fondo por colorkey
+    FLAT_COLORKEY = (0, 0, 0)
+
+    @staticmethod
+    def _build_flat_circle(color, radius, glow_size=0, circle_radius=None):
+        # Mismo tamaño que la versión con halo para que el dibujo no se desplace
+        extent = radius + glow_size
+        sprite = pygame.Surface((extent * 2, extent * 2))
+        sprite.fill(SpriteCache.FLAT_COLORKEY)
+        sprite.set_colorkey(SpriteCache.FLAT_COLORKEY)
+        pygame.draw.circle(sprite, color[:3], (extent, extent), radius if circle_radius is None else circle_radius)
+        return sprite
+
+    @staticmethod
+    def _build_flat_rect(color, size, glow_size):
+        width, height = size
+        sprite = pygame.Surface((width + glow_size * 2, height + glow_size * 2))
+        sprite.fill(SpriteCache.FLAT_COLORKEY)
+        sprite.set_colorkey(SpriteCache.FLAT_COLORKEY)
+        sprite.fill(color[:3], (glow_size, glow_size, width, height))
+        return sprite
+
+    @staticmethod
+    def _build_flat_trail(color, radius, step, steps, max_alpha):
+        fraction = (step + 1) / steps
+        sprite = SpriteCache._build_flat_circle(color, radius, circle_radius=int(radius * fraction))
+        sprite.set_alpha(int(fraction * max_alpha))
+        return sprite
+
+
+class TextCache(SpriteCache):
+    """Cache de superficies de texto y paneles semi-transparentes.
+
+    La clave incluye la fuente, el texto, el color y el antialias, así que un
+    cambio de marcador o de estado produce una clave nueva y la superficie
+    anterior deja de usarse hasta salir por LRU. En un frame estable no se
+    llama a font.render.
+    """
+
+    def __init__(self, max_entries=128):
+        super().__init__(max_entries)
+
+    def text(self, font, string, antialias, color):
+        """Equivalente cacheado de font.render(string, antialias, color)"""
+        key = ('text', font, string, tuple(color), antialias)
+        return self.get(key, lambda: font.render(string, antialias, color))
+
+    def panel(self, size, color, alpha):
+        """Rectángulo de color uniforme con transparencia (fondos de notificación, pausa)"""
+        key = ('panel', tuple(size), tuple(color), alpha)
+        return self.get(key, lambda: self._build_panel(size, color, alpha))
+
+    @staticmethod
+    def _build_panel(size, color, alpha):
+        panel = pygame.Surface(size, pygame.SRCALPHA)
+        panel.fill((*color[:3], alpha))
+        return panel
@@ -0,0 +1,303 @@
+"""Grabación y reproducción de partidas.
+
+Un replay guarda la semilla, la configuración de la simulación, un byte de
+entrada por tick (bits INPUT_* comprimidos por rachas) y los power-ups que
+aparecieron. Como la simulación es determinista, basta con eso para volver a
+jugar la partida exacta sin guardar video.
+
+Uso:
+    python replay.py partida.pongreplay                 # reproducir sin ventana y verificar
+    python replay.py partida.pongreplay --seek 3600     # estado en el tick 3600
+    python replay.py partida.pongreplay --ver --velocidad 4
+"""
+import argparse
+import json
+import struct
+import sys
+import time
+import zlib
+
+from simulation import PongSimulation
+from snapshot import SimSnapshot
+
+MAGIC = b'PONGRPL1'
+FORMAT_VERSION = 1
+
+# Atributos de la simulación que pueden cambiar entre partidas y afectan el resultado
+CONFIG_ATTRIBUTES = ['max_score', 'multi_ball_count', 'powerup_spawn_interval',
+                     'player_frozen_duration', 'cpu_frozen_duration', 'multi_ball_duration']
+
+
+def simulation_config(sim):
+    config = {name: getattr(sim, name) for name in CONFIG_ATTRIBUTES}
+    config['cpu_target_all_balls'] = sim.cpu_ai.target_all_balls
+    return config
+
+
+def create_simulation(seed, config):
+    """Simulación nueva con la semilla y configuración de un replay"""
+    sim = PongSimulation(seed)
+    for name in CONFIG_ATTRIBUTES:
+        if name in config:
+            setattr(sim, name, config[name])
+    sim.cpu_ai.target_all_balls = config.get('cpu_target_all_balls', False)
+    return sim
+
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    """Semilla, configuración, entradas por tick y eventos de una partida"""
+
+    def __init__(self, seed, config, runs, events):
+        self.seed = seed
+        self.config = config
+        self.runs = runs      # [(cantidad de ticks, byte de entrada), ...]
+        self.events = events  # [(tick, nombre, dato), ...]
+
+    @property
+    def length(self):
+        return sum(count for count, _ in self.runs)
+
+    def inputs(self):
+        """Entradas expandidas a un byte por tick"""
+        data = bytearray()
+        for count, action in self.runs:
+            data.extend(bytes((action,)) * count)
+        return data
+
+    def save(self, path):
+        payload = bytearray()
+        for count, action in self.runs:
+            encode_varint(count, payload)
+            payload.append(action)
+        header = json.dumps({
+            'version': FORMAT_VERSION,
+            'seed': self.seed,
+            'config': self.config,
+            'events': self.events,
+        }).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(zlib.compress(bytes(payload), 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} no es un replay de Pong Arcade")
+        offset = len(MAGIC)
+        (header_length,) = struct.unpack_from('<I', data, offset)
+        offset += 4
+        header = json.loads(data[offset:offset + header_length].decode('utf-8'))
+        if header['version'] != FORMAT_VERSION:
+            raise ValueError(f"Versión de replay no soportada: {header['version']}")
+        payload = zlib.decompress(data[offset + header_length:])
+
+        runs = []
+        pos = 0
+        while pos < len(payload):
+            count, pos = decode_varint(payload, pos)
+            runs.append((count, payload[pos]))
+            pos += 1
+        events = [tuple(event) for event in header['events']]
+        return cls(header['seed'], header['config'], runs, events)
+
+
+class ReplayRecorder:
+    """Graba las entradas de una simulación con costo O(1) por tick.
+
+    Las entradas se guardan por rachas (un tick igual al anterior solo
+    incrementa un contador), así que grabar siempre cuesta casi nada.
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.seed = sim.seed
+        self.config = None
+        self.runs = []
+        self.last_action = None
+        self.run_length = 0
+        self.tick = 0
+        self.events = []
+        sim.event_hook = self.on_event
+
+    def record(self, action):
+        """Registra la entrada del tick que está por simularse"""
+        if self.config is None:
+            self.config = simulation_config(self.sim)
+        if action == self.last_action:
+            self.run_length += 1
+        else:
+            if self.run_length:
+                self.runs.append((self.run_length, self.last_action))
+            self.last_action = action
+            self.run_length = 1
+        self.tick += 1
+
+    def on_event(self, name, data):
+        self.events.append((self.tick - 1, name, data))
+
+    def truncate(self, tick):
+        """Descarta lo grabado desde tick en adelante (al rebobinar la partida)"""
+        if tick >= self.tick:
+            return
+        remove = self.tick - tick
+        while self.run_length and remove >= self.run_length:
+            remove -= self.run_length
+            if self.runs:
+                self.run_length, self.last_action = self.runs.pop()
+            else:
+                self.run_length = 0
+                self.last_action = None
+        self.run_length -= remove
+        self.tick = tick
+        while self.events and self.events[-1][0] >= tick:
+            self.events.pop()
+
+    def to_replay(self):
+        runs = list(self.runs)
+        if self.run_length:
+            runs.append((self.run_length, self.last_action))
+        config = self.config or simulation_config(self.sim)
+        return Replay(self.seed, config, runs, list(self.events))
+
+
+class ReplayPlayer:
+    """Reproduce un replay de forma determinista y permite saltar a cualquier tick.
+
+    Mientras avanza guarda una instantánea compacta de la simulación (ver
+    snapshot.py) cada keyframe_interval ticks; para retroceder se restaura la
+    anterior más cercana y se vuelve a simular desde ahí.
+    """
+
+    def __init__(self, replay, keyframe_interval=600):
+        self.replay = replay
+        self.inputs = replay.inputs()
+        self.keyframe_interval = keyframe_interval
+        self.sim = create_simulation(replay.seed, replay.config)
+        self.sim.event_hook = self.on_event
+        self.tick = 0
+        self.events = []
+        self.keyframes = {}
+        self.save_keyframe()
+
+    @property
+    def length(self):
+        return len(self.inputs)
+
+    def on_event(self, name, data):
+        self.events.append((self.tick, name, data))
+
+    def save_keyframe(self):
+        self.keyframes[self.tick] = (SimSnapshot().capture(self.sim), len(self.events))
+
+    def step(self):
+        """Simula el siguiente tick; devuelve False al llegar al final"""
+        if self.tick >= len(self.inputs):
+            return False
+        self.sim.step(self.inputs[self.tick])
+        self.tick += 1
+        if self.tick % self.keyframe_interval == 0 and self.tick not in self.keyframes:
+            self.save_keyframe()
+        return True
+
+    def run_to(self, tick):
+        tick = min(tick, len(self.inputs))
+        while self.tick < tick:
+            self.step()
+
+    def seek(self, tick):
+        """Deja la simulación en el estado del tick indicado"""
+        tick = max(0, min(tick, len(self.inputs)))
+        if tick < self.tick:
+            start = max(t for t in self.keyframes if t <= tick)
+            keyframe, event_count = self.keyframes[start]
+            keyframe.restore(self.sim)
+            self.events = self.events[:event_count]
+            self.tick = start
+        self.run_to(tick)
+
+    def verify(self):
+        """True si los power-ups reproducidos coinciden con los grabados (sin desincronización)"""
+        recorded = [list(event) for event in self.replay.events]
+        played = [list(event) for event in self.events]
+        return played == recorded[:len(played)]
+
+
+def watch(replay, speed):
+    """Muestra el replay en una ventana a la velocidad indicada"""
+    import pygame
+    from pong_game import PongGame
+
+    game = PongGame(replay.seed)
+    player = ReplayPlayer(replay)
+    game.sim = player.sim
+    while player.tick < player.length:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return
+        game.save_previous_state()
+        for _ in range(speed):
+            if not player.step():
+                break
+        game.sim = player.sim
+        game.render()
+        game.present()
+        game.clock.tick(game.TICK_RATE)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproduce un replay de Pong Arcade")
+    parser.add_argument('path')
+    parser.add_argument('--seek', type=int, help="tick al que saltar")
+    parser.add_argument('--ver', action='store_true', help="mostrar el replay en una ventana")
+    parser.add_argument('--velocidad', type=int, default=1, help="ticks simulados por frame al mostrar")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    if args.ver:
+        watch(replay, max(1, args.velocidad))
+        return 0
+
+    player = ReplayPlayer(replay)
+    start = time.perf_counter()
+    if args.seek is not None:
+        player.seek(args.seek)
+    else:
+        player.run_to(player.length)
+    elapsed = time.perf_counter() - start
+
+    sim = player.sim
+    realtime = player.tick / 60
+    print(f"Tick {player.tick}/{player.length} ({realtime:.1f} s de juego en {elapsed:.2f} s, "
+          f"{realtime / elapsed if elapsed else float('inf'):.0f}x)")
+    print(f"Estado: {sim.game_state}  Jugador {sim.player_score} - CPU {sim.cpu_score}")
+    if not player.verify():
+        print("¡Desincronización! Los power-ups reproducidos no coinciden con los grabados")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+import random
+
+import numpy as np
+
+from ball_pool import BallPool, MAIN_BALL
+from cpu_ai import CpuController
+from paddle import Paddle
+from powerups import POWERUP_TYPES, REFRESH, STACK, SPAWN_PRIORITY, Scheduler
+from spatial_hash import SpatialHash
+
+# Clave del próximo spawn automático en el planificador de power-ups
+SPAWN_KEY = 'spawn'
+
+# Bits de entrada del jugador para step()
+INPUT_NONE = 0
+INPUT_UP = 1
+INPUT_DOWN = 2
+INPUT_PAUSE = 4   # Pausar/reanudar (o empezar desde "waiting")
+INPUT_RESET = 8   # Reiniciar la partida
+INPUT_SELECT_SHIFT = 4  # Bits 4-5: dificultad elegida en el menú (1 + índice en DIFFICULTIES)
+INPUT_SELECT_MASK = 0x30
+INPUT_MOVE_MASK = INPUT_UP | INPUT_DOWN
+
+DIFFICULTIES = ['easy', 'medium', 'hard']
+GAME_STATES = ['difficulty_menu', 'waiting', 'playing', 'paused', 'game_over']
+
+
+def move_paddle_y(y, action, speed, paddle_height, field_height):
+    """Altura de una paleta tras un tick con los bits de movimiento de action"""
+    if action & INPUT_UP and y > 0:
+        y -= speed
+    if action & INPUT_DOWN and y < field_height - paddle_height:
+        y += speed
+    return y
+
+
+def select_difficulty_input(index):
+    """Bits de entrada que eligen la dificultad DIFFICULTIES[index] en el menú"""
+    return (index + 1) << INPUT_SELECT_SHIFT
+
+
+class PongSimulation:
+    """Núcleo de la simulación de Pong sin ventana ni teclado.
+
+    Contiene la física, la IA de la CPU, los power-ups y el marcador. Avanza un
+    frame por cada llamada a step() y no depende del display de SDL, así que
+    puede ejecutarse tan rápido como permita la CPU para pruebas y balanceo.
+    """
+
+    def __init__(self, seed=None):
+        # Tamaño del campo de juego
+        self.FIELD_WIDTH = 800
+        self.FIELD_HEIGHT = 400
+
+        # Generador aleatorio propio para poder reproducir partidas (la semilla
+        # siempre se conoce, aunque se elija al azar, para poder grabar replays)
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Función opcional event_hook(nombre, dato) para grabar eventos de la partida
+        self.event_hook = None
+
+        # Estado del juego
+        self.game_state = "difficulty_menu"  # Uno de GAME_STATES
+        self.player_score = 0
+        self.cpu_score = 0
+        self.max_score = 5
+        self.frame = 0
+        self.paddle_hits = 0  # Golpes de paleta acumulados (estadísticas de peloteo)
+        self.wall_bounces = 0  # Rebotes en los bordes acumulados (el frontend los usa para el sonido)
+
+        # Dificultad
+        self.difficulty = None  # 'easy', 'medium', 'hard'
+
+        # IA de la CPU (predicción cacheada por trayectoria)
+        self.cpu_ai = CpuController()
+
+        # Modo versus: la paleta derecha la mueve un segundo jugador (opponent_action en step)
+        self.versus = False
+
+        # Puntos de estela guardados por pelota (solo visual; hasta cientos sin costo extra por punto)
+        self._trail_length = 10
+
+        # Inicializar objetos del juego
+        self.init_game_objects()
+
+        # Power-ups: los vencimientos y el próximo spawn viven en un planificador por frame
+        self.pickups = SpatialHash(self.FIELD_WIDTH, self.FIELD_HEIGHT, margin=self.ball_radius)
+        self.scheduler = Scheduler()
+        self.last_spawn_frame = 0
+        self.powerup_spawn_interval = 600  # MODIFICAR AQUÍ: Cada cuántos frames aparece un power-up (600 = 10 segundos a 60 FPS)
+
+        # Duraciones de los power-ups (ver POWERUP_TYPES)
+        self.player_frozen_duration = 180  # MODIFICAR AQUÍ: Duración del congelamiento en frames (180 = 3 segundos a 60 FPS)
+        self.cpu_frozen_duration = 180  # MODIFICAR AQUÍ: Duración del congelamiento en frames (180 = 3 segundos a 60 FPS)
+        self.multi_ball_duration = 600  # MODIFICAR AQUÍ: Duración de pelotas múltiples en frames (600 = 10 segundos a 60 FPS)
+        self.multi_ball_count = 2  # MODIFICAR AQUÍ: Número de pelotas adicionales (2 o 3; cientos en modo caos)
+
+    @property
+    def powerup_spawn_interval(self):
+        return self._powerup_spawn_interval
+
+    @powerup_spawn_interval.setter
+    def powerup_spawn_interval(self, interval):
+        # Reprogramar el próximo spawn contando desde el anterior
+        self._powerup_spawn_interval = interval
+        self.scheduler.schedule(SPAWN_KEY, self.last_spawn_frame + interval, SPAWN_PRIORITY)
+
+    @property
+    def trail_length(self):
+        return self._trail_length
+
+    @trail_length.setter
+    def trail_length(self, length):
+        self._trail_length = length
+        self.balls.trails.resize(length)
+
+    def powerup_active(self, powerup_type):
+        return powerup_type in self.scheduler
+
+    @property
+    def player_frozen(self):
+        return 'freeze_player' in self.scheduler
+
+    @property
+    def cpu_frozen(self):
+        return 'freeze_cpu' in self.scheduler
+
+    @property
+    def multi_ball_active(self):
+        return 'multi_ball' in self.scheduler
+
+    def set_difficulty(self, difficulty):
+        """Configura la dificultad del juego"""
+        self.difficulty = difficulty
+
+        cpu = self.cpu
+        if difficulty == 'easy':
+            cpu.speed = 6
+            cpu.reaction_delay = 10
+            cpu.prediction = 1
+        elif difficulty == 'medium':
+            cpu.speed = 9
+            cpu.reaction_delay = 5
+            cpu.prediction = 2
+        elif difficulty == 'hard':
+            cpu.speed = 12
+            cpu.reaction_delay = 1
+            cpu.prediction = 4
+
+    def choose_difficulty(self, difficulty):
+        """Sale del menú con la dificultad elegida y espera el saque"""
+        self.set_difficulty(difficulty)
+        self.game_state = "waiting"
+
+    def init_game_objects(self):
+        # Paleta del jugador
+        self.player = Paddle(x=20, y=self.FIELD_HEIGHT // 2 - 50, width=10, height=100,
+                             speed=5, direction=1)
+
+        # Paleta de la CPU
+        self.cpu = Paddle(x=self.FIELD_WIDTH - 30, y=self.FIELD_HEIGHT // 2 - 50, width=10, height=100,
+                          speed=3, direction=-1, reaction_delay=10, prediction=0.5)
+
+        # Pelotas: la principal (índice MAIN_BALL) y las adicionales del power-up
+        self.ball_radius = 8
+        self.ball_max_speed = 12
+        self.balls = BallPool(trail_length=self._trail_length)
+        self.balls.spawn(self.FIELD_WIDTH // 2, self.FIELD_HEIGHT // 2, 5, 4,
+                         self.ball_radius, self.ball_max_speed)
+
+        self.reset_ball()
+
+    def reset_ball(self):
+        balls = self.balls
+        balls.x[MAIN_BALL] = self.FIELD_WIDTH // 2
+        balls.y[MAIN_BALL] = self.FIELD_HEIGHT // 2
+        balls.vx[MAIN_BALL] = self.rng.choice([5, -5])
+        balls.vy[MAIN_BALL] = self.rng.uniform(-4, 4)
+        balls.trails.clear(MAIN_BALL)
+        self.cpu_ai.invalidate()
+
+    def spawn_powerup(self):
+        """Activa un power-up aleatorio automáticamente"""
+        powerup_types = list(POWERUP_TYPES)
+
+        # Seleccionar y activar un power-up aleatorio
+        selected_powerup = self.rng.choice(powerup_types)
+        if self.event_hook:
+            self.event_hook('powerup', selected_powerup)
+        self.activate_powerup(selected_powerup)
+
+    def activate_powerup(self, powerup_type):
+        """Activa un power-up específico según su regla si ya estaba activo"""
+        kind = POWERUP_TYPES[powerup_type]
+        duration = getattr(self, kind.duration)
+        expires = self.scheduler.deadline(powerup_type)
+        if expires is None:
+            self.scheduler.schedule(powerup_type, self.frame + duration)
+            if kind.on_start:
+                getattr(self, kind.on_start)()
+        elif kind.rule == REFRESH:
+            self.scheduler.schedule(powerup_type, self.frame + duration)
+        elif kind.rule == STACK:
+            self.scheduler.schedule(powerup_type, expires + duration)
+
+    def expire_powerup(self, powerup_type):
+        kind = POWERUP_TYPES[powerup_type]
+        if kind.on_end:
+            getattr(self, kind.on_end)()
+
+    def start_multi_ball(self):
+        """Crea pelotas adicionales en la posición de la principal"""
+        balls = self.balls
+        balls.kill_extras()
+        x = balls.x[MAIN_BALL]
+        y = balls.y[MAIN_BALL]
+        for i in range(self.multi_ball_count):
+            speed_x = self.rng.choice([5, -5]) * self.rng.uniform(0.8, 1.2)
+            speed_y = self.rng.uniform(-5, 5)
+            balls.spawn(x, y, speed_x, speed_y, self.ball_radius)
+
+    def end_multi_ball(self):
+        self.balls.kill_extras()
+
+    def add_pickup(self, powerup_type, x, y, radius=15):
+        """Coloca en el campo un power-up que se activa al tocarlo cualquier pelota; devuelve su id"""
+        return self.pickups.insert(x, y, radius, powerup_type)
+
+    def check_powerup_collision(self):
+        """Activa los power-ups que toca alguna pelota (principal o adicional)"""
+        if not len(self.pickups):
+            return
+        balls = self.balls
+        n = balls.size
+        for _, pickup_id in self.pickups.query_circles(balls.x[:n], balls.y[:n], balls.radius[:n]):
+            # Dos pelotas pueden tocar el mismo power-up en el mismo frame
+            if pickup_id in self.pickups:
+                self.activate_powerup(self.pickups.remove(pickup_id))
+
+    def apply_commands(self, player_action):
+        """Aplica los comandos (reinicio, elección de dificultad, pausa) incluidos en la entrada"""
+        if player_action & INPUT_RESET:
+            self.reset_game()
+        selection = (player_action & INPUT_SELECT_MASK) >> INPUT_SELECT_SHIFT
+        if selection and self.game_state == "difficulty_menu":
+            self.choose_difficulty(DIFFICULTIES[selection - 1])
+        if player_action & INPUT_PAUSE:
+            self.toggle_pause()
+
+    def step(self, player_action=INPUT_NONE, opponent_action=INPUT_NONE):
+        """Avanza la simulación un frame con la entrada del jugador (bits INPUT_*).
+
+        opponent_action solo se usa en modo versus y mueve la paleta derecha.
+        """
+        if player_action & ~INPUT_MOVE_MASK:
+            self.apply_commands(player_action)
+
+        if self.game_state != "playing":
+            return
+
+        self.frame += 1
+
+        # Vencimientos de power-ups y spawn automático programados para este frame
+        for key in self.scheduler.pop_due(self.frame):
+            if key == SPAWN_KEY:
+                self.spawn_powerup()
+                self.last_spawn_frame = self.frame
+                self.scheduler.schedule(SPAWN_KEY, self.frame + self.powerup_spawn_interval, SPAWN_PRIORITY)
+            else:
+                self.expire_powerup(key)
+
+        # Movimiento del jugador (solo si no está congelado)
+        player = self.player
+        if not self.player_frozen:
+            player.y = move_paddle_y(player.y, player_action, player.speed, player.height, self.FIELD_HEIGHT)
+
+        # IA de la CPU con predicción, o el segundo jugador en modo versus (solo si no está congelado)
+        cpu = self.cpu
+        if not self.cpu_frozen:
+            if self.versus:
+                cpu.y = move_paddle_y(cpu.y, opponent_action, player.speed, cpu.height, self.FIELD_HEIGHT)
+            else:
+                self.cpu_ai.update(self)
+
+        # Mantener CPU en pantalla
+        if cpu.y < 0:
+            cpu.y = 0
+        if cpu.y > self.FIELD_HEIGHT - cpu.height:
+            cpu.y = self.FIELD_HEIGHT - cpu.height
+
+        # Movimiento de todas las pelotas en bloque, con colisiones continuas contra paletas y bordes
+        balls = self.balls
+        hits, bounces = balls.advance((player.box, cpu.box), self.FIELD_HEIGHT)
+        self.paddle_hits += hits
+        self.wall_bounces += bounces
+        balls.record_trails()
+        self.check_powerup_collision()
+
+        # Verificar puntos: las pelotas extra desaparecen, la principal vuelve al centro
+        out = balls.out_of_field(self.FIELD_WIDTH)
+        if out is not None:
+            out_left, out_right = out
+            self.cpu_score += int(np.count_nonzero(out_left))
+            self.player_score += int(np.count_nonzero(out_right))
+
+            main_scored = out_left[MAIN_BALL] or out_right[MAIN_BALL]
+            scored = out_left | out_right
+            scored[MAIN_BALL] = False
+            balls.kill(scored)
+            if main_scored:
+                self.reset_ball()
+
+        # Verificar fin de juego
+        if self.player_score >= self.max_score or self.cpu_score >= self.max_score:
+            self.game_state = "game_over"
+
+    def toggle_pause(self):
+        if self.game_state == "waiting":
+            self.game_state = "playing"
+        elif self.game_state == "playing":
+            self.game_state = "paused"
+        elif self.game_state == "paused":
+            self.game_state = "playing"
+
+    def reset_game(self):
+        self.player_score = 0
+        self.cpu_score = 0
+        self.frame = 0
+        self.paddle_hits = 0
+        self.wall_bounces = 0
+        self.init_game_objects()
+        if self.difficulty:
+            self.set_difficulty(self.difficulty)
+        self.game_state = "difficulty_menu"
+        # Resetear power-ups
+        self.pickups.clear()
+        self.scheduler.clear()
+        self.last_spawn_frame = 0
+        self.powerup_spawn_interval = self.powerup_spawn_interval  # Reprograma el primer spawn
+
+    def run(self, player_policy, max_frames=None):
+        """Juega hasta game_over (o max_frames) sin ventana; player_policy(sim) devuelve los bits de entrada"""
+        if self.game_state == "waiting":
+            self.toggle_pause()
+
+        frames = 0
+        while self.game_state == "playing":
+            if max_frames is not None and frames >= max_frames:
+                break
+            self.step(player_policy(self))
+            frames += 1
+        return frames
+
+
+def track_ball_policy(sim):
+    """Jugador scriptado que sigue la altura de la pelota"""
+    center = sim.player.center
+    ball_y = sim.balls.y[MAIN_BALL]
+    if ball_y < center - 10:
+        return INPUT_UP
+    if ball_y > center + 10:
+        return INPUT_DOWN
+    return INPUT_NONE
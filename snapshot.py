@@ -0,0 +1,280 @@
+"""Instantáneas compactas del estado de la simulación y anillo de instantáneas.
+
+Una instantánea guarda todo lo que step() lee o escribe (marcador, paletas,
+pelotas con sus estelas, power-ups, pickups, caché de la IA y el estado del
+generador aleatorio) en arreglos NumPy de forma fija. Capturar y restaurar
+son copias entre arreglos, sin deepcopy ni objetos nuevos, así que un
+anillo de instantáneas preasignadas permite retroceder, corregir entradas
+(rollback) o guardar checkpoints de simulaciones largas a un costo de
+microsegundos. La configuración (puntaje máximo, duraciones, etc.) no es
+parte del estado: se asume la misma al capturar y al restaurar.
+"""
+import numpy as np
+
+from powerups import POWERUP_TYPES, EXPIRE_PRIORITY, SPAWN_PRIORITY
+from simulation import DIFFICULTIES, GAME_STATES, SPAWN_KEY
+
+# Estado de Mersenne Twister: 624 palabras de 32 bits y la posición
+RNG_STATE_BYTES = 625 * 4
+
+# Claves posibles del planificador, en orden fijo
+SCHEDULER_KEYS = [SPAWN_KEY] + list(POWERUP_TYPES)
+
+# Posiciones de los valores sueltos en SimSnapshot.scalars
+(S_GAME_STATE, S_DIFFICULTY, S_PLAYER_SCORE, S_CPU_SCORE, S_FRAME, S_PADDLE_HITS, S_WALL_BOUNCES,
+ S_PLAYER_Y, S_CPU_Y, S_CPU_SPEED, S_CPU_REACTION, S_CPU_PREDICTION,
+ S_LAST_SPAWN, S_BALL_SIZE, S_TRAIL_HEAD, S_PICKUP_COUNT, S_PICKUP_NEXT_ID,
+ S_AI_BASE_Y, S_AI_DRIFT, S_AI_START, S_AI_RECOMPUTES,
+ S_AI_VALID, S_AI_INDEX, S_AI_VX, S_AI_VY, S_AI_CPU_X, S_AI_PREDICTION) = range(27)
+SCALAR_COUNT = 27
+
+# Filas de SimSnapshot.balls
+BALL_FIELDS = ('x', 'y', 'vx', 'vy', 'radius', 'max_speed', 'alive')
+ROW_X, ROW_Y, ROW_ALIVE = (BALL_FIELDS.index(name) for name in ('x', 'y', 'alive'))
+
+MAX_PICKUPS = 32  # Pickups en el campo que entran en una instantánea
+
+
+def _number(value):
+    """int si el valor es entero (como lo deja la simulación), si no float"""
+    return int(value) if value.is_integer() else value
+
+
+class SimSnapshot:
+    """Estado completo de una PongSimulation en arreglos de forma fija.
+
+    El estado del generador aleatorio se guarda como la tupla que devuelve
+    getstate(): ya es inmutable, así que no hace falta copiarla a un arreglo.
+    Con trails=False no se guardan las estelas (solo se dibujan, la simulación
+    no las lee): restaurar deja las de sim como estaban y quien restaura las
+    rearma (ver SnapshotRing.rebuild_trails).
+    """
+
+    def __init__(self, ball_capacity=16, trail_length=10, trails=True):
+        self.scalars = np.zeros(SCALAR_COUNT)
+        self.deadlines = np.zeros((len(SCHEDULER_KEYS), 2), dtype=np.int64)  # (tick, orden); tick -1 = sin programar
+        self.pickups = np.zeros((MAX_PICKUPS, 5))  # (x, y, radio, tipo, id)
+        self.rng_state = None
+        self.keep_trails = trails
+        self.allocate(ball_capacity, trail_length)
+
+    def allocate(self, ball_capacity, trail_length):
+        self.balls = np.zeros((len(BALL_FIELDS), ball_capacity))
+        self.trails = np.zeros((2, ball_capacity, trail_length)) if self.keep_trails else None
+
+    @property
+    def nbytes(self):
+        arrays = (self.scalars, self.deadlines, self.pickups, self.balls, self.trails)
+        return sum(array.nbytes for array in arrays if array is not None) + RNG_STATE_BYTES
+
+    @property
+    def frame(self):
+        return int(self.scalars[S_FRAME])
+
+    @property
+    def game_state(self):
+        return GAME_STATES[int(self.scalars[S_GAME_STATE])]
+
+    def capture(self, sim):
+        """Copia el estado de sim en esta instantánea"""
+        balls = sim.balls
+        n = balls.size
+        trails = balls.trails
+        pickups = sim.pickups
+        objects = pickups.objects
+        if len(objects) > MAX_PICKUPS:
+            raise ValueError(f"Más de {MAX_PICKUPS} pickups en el campo")
+        cpu = sim.cpu
+        ai = sim.cpu_ai
+
+        # Trayectoria cacheada de la IA: con otra caché la CPU se movería distinto
+        trajectory = ai.trajectory
+        self.scalars[:S_AI_VALID + 1 + (5 if trajectory else 0)] = [
+            GAME_STATES.index(sim.game_state),
+            DIFFICULTIES.index(sim.difficulty) if sim.difficulty else -1,
+            sim.player_score, sim.cpu_score, sim.frame, sim.paddle_hits, sim.wall_bounces,
+            sim.player.y, cpu.y, cpu.speed, cpu.reaction_delay, cpu.prediction,
+            sim.last_spawn_frame, n, trails.head, len(objects), pickups.next_id,
+            ai.base_y, ai.drift, ai.start_frame, ai.recomputes,
+            trajectory is not None, *(trajectory or ()),
+        ]
+
+        # Pelotas y estelas (solo las posiciones en uso)
+        keep_trails = self.keep_trails
+        if balls.capacity > self.balls.shape[1] or (keep_trails and trails.length != self.trails.shape[2]):
+            self.allocate(balls.capacity, trails.length)
+        for row, name in enumerate(BALL_FIELDS):
+            self.balls[row, :n] = getattr(balls, name)[:n]
+        if keep_trails:
+            self.trails[0, :n] = trails.x[:n]
+            self.trails[1, :n] = trails.y[:n]
+
+        # Planificador: vencimiento y orden de inserción de cada clave
+        deadlines = sim.scheduler.deadlines
+        self.deadlines[:] = [deadlines.get(key, (-1, 0)) for key in SCHEDULER_KEYS]
+
+        for row, (object_id, (x, y, radius, powerup_type)) in enumerate(objects.items()):
+            self.pickups[row] = (x, y, radius, SCHEDULER_KEYS.index(powerup_type), object_id)
+
+        self.rng_state = sim.rng.getstate()
+        return self
+
+    def restore(self, sim):
+        """Deja sim exactamente en el estado capturado"""
+        (game_state, difficulty, player_score, cpu_score, frame, paddle_hits, wall_bounces,
+         player_y, cpu_y, cpu_speed, cpu_reaction, cpu_prediction,
+         last_spawn, n, trail_head, pickup_count, pickup_next_id,
+         ai_base_y, ai_drift, ai_start, ai_recomputes,
+         ai_valid, ai_index, ai_vx, ai_vy, ai_cpu_x, ai_prediction) = self.scalars.tolist()
+
+        sim.game_state = GAME_STATES[int(game_state)]
+        sim.difficulty = DIFFICULTIES[int(difficulty)] if difficulty >= 0 else None
+        sim.player_score = int(player_score)
+        sim.cpu_score = int(cpu_score)
+        sim.frame = int(frame)
+        sim.paddle_hits = int(paddle_hits)
+        sim.wall_bounces = int(wall_bounces)
+        sim.player.y = _number(player_y)
+        cpu = sim.cpu
+        cpu.y = _number(cpu_y)
+        cpu.speed = _number(cpu_speed)
+        cpu.reaction_delay = _number(cpu_reaction)
+        cpu.prediction = _number(cpu_prediction)
+        sim.last_spawn_frame = int(last_spawn)
+
+        balls = sim.balls
+        n = int(n)
+        if self.keep_trails and sim.trail_length != self.trails.shape[2]:
+            sim.trail_length = self.trails.shape[2]
+        balls.reserve(n)
+        for row, name in enumerate(BALL_FIELDS):
+            getattr(balls, name)[:n] = self.balls[row, :n]
+        # Las posiciones que se usaron después de la captura quedan muertas
+        balls.truncate(n)
+        if self.keep_trails:
+            trails = balls.trails
+            trails.x[:n] = self.trails[0, :n]
+            trails.y[:n] = self.trails[1, :n]
+            trails.head = int(trail_head)
+
+        # El heap se reconstruye respetando el orden de inserción original
+        scheduler = sim.scheduler
+        scheduler.clear()
+        pending = sorted((number, row, tick) for row, (tick, number) in enumerate(self.deadlines.tolist())
+                         if tick >= 0)
+        for _, row, tick in pending:
+            key = SCHEDULER_KEYS[row]
+            scheduler.schedule(key, tick, SPAWN_PRIORITY if key == SPAWN_KEY else EXPIRE_PRIORITY)
+
+        pickups = sim.pickups
+        pickups.clear()
+        for x, y, radius, kind, object_id in self.pickups[:int(pickup_count)].tolist():
+            pickups.insert(x, y, radius, SCHEDULER_KEYS[int(kind)], object_id=int(object_id))
+        pickups.next_id = int(pickup_next_id)
+
+        ai = sim.cpu_ai
+        ai.trajectory = (int(ai_index), ai_vx, ai_vy, ai_cpu_x, ai_prediction) if ai_valid else None
+        ai.base_y = ai_base_y
+        ai.drift = ai_drift
+        ai.start_frame = int(ai_start)
+        ai.recomputes = int(ai_recomputes)
+
+        sim.rng.setstate(self.rng_state)
+
+
+class SnapshotRing:
+    """Anillo preasignado con las últimas capacity instantáneas, indexadas por tick.
+
+    Guardar sobrescribe la instantánea más vieja, así que en régimen no se
+    asigna memoria. Restaurar un tick descarta las instantáneas posteriores:
+    desde ahí la historia vuelve a escribirse.
+
+    Con trails=False las instantáneas no guardan estelas: cada una ocupa
+    capacidad × largo de estela, y con cientos de pelotas y estelas largas el
+    anillo pasaría de cientos de MB. restore() las rearma con las posiciones
+    de los ticks anteriores, que ya están en el anillo.
+    """
+
+    def __init__(self, capacity, ball_capacity=16, trail_length=10, trails=True):
+        self.capacity = capacity
+        self.slots = [SimSnapshot(ball_capacity, trail_length, trails) for _ in range(capacity)]
+        self.ticks = [None] * capacity
+        self.latest = None  # Tick de la última instantánea guardada
+
+    def __len__(self):
+        return sum(tick is not None for tick in self.ticks)
+
+    def __contains__(self, tick):
+        return self.ticks[tick % self.capacity] == tick
+
+    @property
+    def oldest(self):
+        return min((tick for tick in self.ticks if tick is not None), default=None)
+
+    def save(self, tick, sim):
+        """Guarda el estado de sim como el del tick indicado"""
+        slot = tick % self.capacity
+        self.slots[slot].capture(sim)
+        self.ticks[slot] = tick
+        self.latest = tick
+
+    def get(self, tick):
+        """Instantánea del tick (sin copiar), o None si ya se sobrescribió"""
+        slot = tick % self.capacity
+        return self.slots[slot] if self.ticks[slot] == tick else None
+
+    def restore(self, tick, sim):
+        """Restaura el tick en sim; devuelve False si ya no está en el anillo"""
+        snapshot = self.get(tick)
+        if snapshot is None:
+            return False
+        snapshot.restore(sim)
+        if not snapshot.keep_trails:
+            self.rebuild_trails(tick, sim)
+        self.discard_after(tick)
+        return True
+
+    def rebuild_trails(self, tick, sim):
+        """Rearma las estelas de sim con las posiciones de las pelotas en tick y los anteriores.
+
+        Se toma un punto por frame jugado (en pausa el frame no avanza ni la
+        estela crece) y la estela de una posición se corta donde estaba muerta,
+        para no heredar la de otra pelota. Lo que ya salió del anillo queda en NaN.
+        """
+        balls = sim.balls
+        n = balls.size
+        trails = balls.trails
+        length = trails.length
+        x = np.full((n, length), np.nan)
+        y = np.full((n, length), np.nan)
+        valid = np.ones(n, dtype=bool)
+        column = length - 1
+        last_frame = None
+        while column >= 0 and valid.any():
+            snapshot = self.get(tick)
+            if snapshot is None:
+                break
+            tick -= 1
+            if snapshot.frame == last_frame:
+                continue
+            last_frame = snapshot.frame
+            count = min(n, int(snapshot.scalars[S_BALL_SIZE]))
+            valid[count:] = False
+            valid[:count] &= snapshot.balls[ROW_ALIVE, :count] > 0
+            rows = valid.nonzero()[0]
+            x[rows, column] = snapshot.balls[ROW_X, rows]
+            y[rows, column] = snapshot.balls[ROW_Y, rows]
+            column -= 1
+        trails.x[:n] = x
+        trails.y[:n] = y
+        trails.head = 0
+
+    def discard_after(self, tick):
+        for slot, saved in enumerate(self.ticks):
+            if saved is not None and saved > tick:
+                self.ticks[slot] = None
+        self.latest = tick
+
+    def clear(self):
+        self.ticks = [None] * self.capacity
+        self.latest = None
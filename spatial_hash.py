@@ -0,0 +1,107 @@
+import math
+
+import numpy as np
+
+
+class SpatialHash:
+    """Grilla uniforme sobre el campo con objetos circulares fijos (pickups, obstáculos).
+
+    Cada objeto se registra en todas las celdas que toca su círculo agrandado
+    por margin (el radio máximo de las pelotas), así que para encontrar con
+    qué puede chocar una pelota basta mirar la celda de su centro. Las
+    pelotas no se insertan: se consultan todas juntas con NumPy en cada
+    frame, y solo las que caen en celdas ocupadas pasan a la prueba exacta
+    con distancias al cuadrado. Quitar un objeto no copia ninguna lista.
+    """
+
+    def __init__(self, width, height, cell_size=50, margin=0):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.margin = margin
+        self.cols = math.ceil(width / cell_size)
+        self.rows = math.ceil(height / cell_size)
+
+        self.cells = [set() for _ in range(self.cols * self.rows)]
+        self.occupancy = np.zeros(self.cols * self.rows, dtype=np.int32)  # Objetos por celda
+        self.objects = {}  # id -> (x, y, radio, dato)
+        self.object_cells = {}  # id -> celdas donde está registrado
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __contains__(self, object_id):
+        return object_id in self.objects
+
+    def cell_range(self, x, y, extent):
+        """Índices de las celdas que toca el cuadrado de lado 2*extent centrado en (x, y)"""
+        size = self.cell_size
+        first_col = max(0, int((x - extent) // size))
+        last_col = min(self.cols - 1, int((x + extent) // size))
+        first_row = max(0, int((y - extent) // size))
+        last_row = min(self.rows - 1, int((y + extent) // size))
+        return [row * self.cols + col
+                for row in range(first_row, last_row + 1)
+                for col in range(first_col, last_col + 1)]
+
+    def insert(self, x, y, radius, data, object_id=None):
+        """Registra un objeto y devuelve su id (object_id fuerza uno, para restaurar estados)"""
+        if object_id is None:
+            object_id = self.next_id
+        self.next_id = max(self.next_id, object_id + 1)
+        cells = self.cell_range(x, y, radius + self.margin)
+        for cell in cells:
+            self.cells[cell].add(object_id)
+        self.occupancy[cells] += 1
+        self.objects[object_id] = (x, y, radius, data)
+        self.object_cells[object_id] = cells
+        return object_id
+
+    def remove(self, object_id):
+        """Quita un objeto y devuelve su dato"""
+        cells = self.object_cells.pop(object_id)
+        for cell in cells:
+            self.cells[cell].discard(object_id)
+        self.occupancy[cells] -= 1
+        return self.objects.pop(object_id)[3]
+
+    def clear(self):
+        # Solo las celdas ocupadas: vaciar un campo ya vacío no cuesta nada
+        for cells in self.object_cells.values():
+            for cell in cells:
+                self.cells[cell].clear()
+        self.occupancy[:] = 0
+        self.objects.clear()
+        self.object_cells.clear()
+
+    def query_circles(self, x, y, radius):
+        """Pares (índice de círculo, id de objeto) que se superponen.
+
+        x, y y radius son arreglos con los círculos a consultar (las pelotas);
+        los que tienen posición NaN o están fuera del campo se ignoran.
+        """
+        if not self.objects:
+            return []
+
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        indices = inside.nonzero()[0]
+        if not len(indices):
+            return []
+        size = self.cell_size
+        cells = (y[indices] // size).astype(np.intp) * self.cols + (x[indices] // size).astype(np.intp)
+        occupied = self.occupancy[cells] > 0
+        if not np.count_nonzero(occupied):
+            return []
+
+        pairs = []
+        for index, cell in zip(indices[occupied].tolist(), cells[occupied].tolist()):
+            cx = float(x[index])
+            cy = float(y[index])
+            r = float(radius[index])
+            for object_id in self.cells[cell]:
+                ox, oy, object_radius, _ = self.objects[object_id]
+                reach = r + object_radius
+                if (cx - ox) ** 2 + (cy - oy) ** 2 < reach * reach:
+                    pairs.append((index, object_id))
+        return pairs